@@ -0,0 +1,29 @@
+"""reindex_media_references_for_testimonials
+
+Revision ID: 2d8f6a1c9e47
+Revises: 9c4e1f7a2b68
+Create Date: 2026-10-18 09:41:27.305118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2d8f6a1c9e47"
+down_revision: Union[str, None] = "9c4e1f7a2b68"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # El índice no tenía Testimonial.client_photo: se vacía para que el
+    # recolector lo reconstruya entero antes de su siguiente ejecución
+    # (o con: python gc_media.py --reindex)
+    op.execute("DELETE FROM media_references")
+
+
+def downgrade() -> None:
+    # Las referencias de más no hacen daño (solo conservan archivos)
+    pass
@@ -4,7 +4,9 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
+from ..core.config import settings
 from ..core.database import get_db
+from ..core.principal import Principal, principal_cache
 from ..core.security import decode_access_token
 from ..models.user import User
 from ..services.user_service import UserService
@@ -12,27 +14,56 @@ from ..services.user_service import UserService
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 
-def get_current_user(
+def get_current_principal(
     db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-) -> User:
+) -> Principal:
+    """Identidad y permisos del token (de la caché si es posible)."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    payload = decode_access_token(token)
+    # Se decodifica siempre: también comprueba que no esté revocado
+    payload = decode_access_token(token, db)
     if payload is None:
+        principal_cache.discard(token)
         raise credentials_exception
 
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
     username: Optional[str] = payload.get("sub")
     if username is None:
         raise credentials_exception
 
-    user = UserService.get_user_by_username(db, username=username)
-    if user is None:
+    principal = None
+    if settings.JWT_AUTHZ_CLAIMS and "pv" in payload:
+        # Claims del token, válidos mientras no cambie la versión global
+        if payload["pv"] == UserService.get_permission_stamp(db):
+            principal = Principal.from_claims(payload)
+    if principal is None:
+        principal = UserService.get_principal(db, username=username)
+    if principal is None:
         raise credentials_exception
 
+    principal_cache.put(token, principal, token_exp=payload.get("exp"))
+    return principal
+
+
+def get_current_user(
+    db: Session = Depends(get_db),
+    principal: Principal = Depends(get_current_principal),
+) -> User:
+    # Búsqueda por clave primaria (del identity map si se acaba de cargar)
+    user = db.get(User, principal.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 
@@ -42,17 +73,21 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
     return current_user
 
 
+def get_current_active_principal(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    """Principal de un usuario activo (flag ``act`` del token o de la caché)."""
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+
 def get_current_admin_user(
-    current_user: User = Depends(get_current_active_user),
-) -> User:
+    principal: Principal = Depends(get_current_active_principal),
+) -> Principal:
     """Verificar que el usuario es administrador o superusuario."""
-    if current_user.is_superuser:
-        return current_user
-
-    # Verificar si tiene rol de Administrador
-    admin_roles = ["Administrador", "Admin"]
-    if any(role.name in admin_roles for role in current_user.roles):
-        return current_user
+    if principal.is_admin:
+        return principal
 
     raise HTTPException(
         status_code=status.HTTP_403_FORBIDDEN,
@@ -68,33 +103,23 @@ def check_permission(resource: str, action: str):
     2. El usuario tiene rol Administrador
     3. El usuario tiene el permiso específico (resource.action)
 
+    Los permisos del usuario están compilados en el principal (un
+    ``frozenset`` de códigos y el flag ``is_admin`` para los casos 1 y 2):
+    la comprobación es una búsqueda en el conjunto y no carga la fila del
+    usuario. Devuelve el principal; las rutas que necesitan el ``User``
+    dependen además de ``get_current_user``.
+
     Args:
         resource: Recurso (ej: 'cms_pages', 'services', 'projects')
         action: Acción (ej: 'create', 'read', 'update', 'delete')
     """
+    required_code = f"{resource}.{action}"
 
     def _check_permission(
-        current_user: User = Depends(get_current_active_user),
-    ) -> User:
-        # Superusuario tiene todos los permisos
-        if current_user.is_superuser:
-            return current_user
-
-        # Administrador tiene todos los permisos
-        admin_roles = ["Administrador", "Admin"]
-        if any(role.name in admin_roles for role in current_user.roles):
-            return current_user
-
-        # Verificar permiso específico
-        required_code = f"{resource}.{action}"
-
-        # Buscar en los roles del usuario
-        for role in current_user.roles:
-            if not role.is_active:
-                continue
-            for permission in role.permissions:
-                if permission.is_active and permission.code == required_code:
-                    return current_user
+        principal: Principal = Depends(get_current_active_principal),
+    ) -> Principal:
+        if principal.has_permission(required_code):
+            return principal
 
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -12,6 +12,13 @@ from ..deps import get_current_active_user
 router = APIRouter()
 
 
+def _small_avatar(user: Optional[User]) -> Optional[str]:
+    """32px avatar for table rows (falls back to legacy single-file avatars)"""
+    if user is None:
+        return None
+    return user.avatar_urls.get("32") or user.avatar_url  # type: ignore[return-value]
+
+
 @router.get("/", response_model=AuditLogListResponse)
 def get_audit_logs(
     page: int = Query(1, ge=1, description="Page number"),
@@ -57,6 +64,7 @@ def get_audit_logs(
             "created_at": log.created_at,
             "user_username": log.user.username if log.user else None,
             "user_email": log.user.email if log.user else None,
+            "user_avatar_url": _small_avatar(log.user),
         }
         enriched_items.append(log_dict)
 
@@ -92,6 +100,7 @@ def get_recent_logs(
             "created_at": log.created_at,
             "user_username": log.user.username if log.user else None,
             "user_email": log.user.email if log.user else None,
+            "user_avatar_url": _small_avatar(log.user),
         }
         enriched_logs.append(log_dict)
 
@@ -123,6 +132,7 @@ def get_my_activity(
             "created_at": log.created_at,
             "user_username": current_user.username,
             "user_email": current_user.email,
+            "user_avatar_url": _small_avatar(current_user),
         }
         enriched_logs.append(log_dict)
 
@@ -1,31 +1,54 @@
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from ...core.config import settings
 from ...core.database import get_db
-from ...core.security import create_access_token
+from ...core.password_executor import PasswordExecutorBusyError
+from ...core.principal import principal_cache
+from ...core.security import create_access_token, decode_access_token
+from ...core.token_revocation import revocation_list
+from ...models.user import User
 from ...schemas.token import Token
 from ...schemas.user import UserResponse
 from ...services.user_service import UserService
 from ...utils.audit import AuditAction, AuditResource, log_action
-from ..deps import get_current_active_user
+from ..deps import get_current_active_user, get_current_user, oauth2_scheme
 
 router = APIRouter()
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     request: Request,
     db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
 ):
-    user = UserService.authenticate_user(db, form_data.username, form_data.password)
+    """
+    Issue an access token
+
+    bcrypt runs on the bounded password executor instead of the shared
+    threadpool; when it is saturated the login fails fast with 503. The
+    database work (lookup, claims, audit log) runs in the threadpool so it
+    never blocks the event loop.
+    """
+    try:
+        user = await UserService.authenticate_user_async(
+            db, form_data.username, form_data.password
+        )
+    except PasswordExecutorBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     if not user:
         # Log failed login attempt
-        log_action(
+        await run_in_threadpool(
+            log_action,
             db=db,
             request=request,
             user_id=None,
@@ -39,13 +62,18 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    claims = {"sub": user.username}
+    if settings.JWT_AUTHZ_CLAIMS:
+        claims.update(
+            await run_in_threadpool(UserService.authorization_claims, db, user)
+        )
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
+    access_token = create_access_token(data=claims, expires_delta=access_token_expires)
 
     # Log successful login
-    log_action(
+    await run_in_threadpool(
+        log_action,
         db=db,
         request=request,
         user_id=user.id,  # type: ignore[arg-type]
@@ -60,3 +88,36 @@ def login(
 @router.get("/me", response_model=UserResponse)
 def read_users_me(current_user=Depends(get_current_active_user)):
     return current_user
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    request: Request,
+    db: Session = Depends(get_db),
+    token: str = Depends(oauth2_scheme),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Revoke the current token
+
+    It stops being accepted right away in this process and within
+    TOKEN_REVOCATION_REFRESH_SECONDS in the others.
+    """
+    payload = decode_access_token(token, db)
+    if payload and payload.get("jti"):
+        revocation_list.revoke(
+            db,
+            payload["jti"],
+            expires_at=datetime.fromtimestamp(payload["exp"], tz=timezone.utc),
+            user_id=current_user.id,  # type: ignore[arg-type]
+        )
+    principal_cache.discard(token)
+
+    log_action(
+        db=db,
+        request=request,
+        user_id=current_user.id,  # type: ignore[arg-type]
+        action=AuditAction.LOGOUT,
+        resource=AuditResource.AUTH,
+        details={"username": current_user.username},
+    )
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import check_permission, get_db
-from app.models.user import User
+from app.core.principal import Principal
 from app.schemas.cms_page import CMSPage, CMSPageCreate, CMSPageUpdate
 from app.services.cms_page_service import CMSPageService
 
@@ -53,7 +53,7 @@ def get_page_by_slug(slug: str, db: Session = Depends(get_db)):
 def create_page(
     page: CMSPageCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("cms_pages", "create")),
+    current_user: Principal = Depends(check_permission("cms_pages", "create")),
 ):
     """Crear una nueva página (requiere permiso cms_pages.create)"""
     # Verificar si el slug ya existe
@@ -69,7 +69,7 @@ def update_page(
     page_id: int,
     page: CMSPageUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("cms_pages", "update")),
+    current_user: Principal = Depends(check_permission("cms_pages", "update")),
 ):
     """Actualizar una página (requiere permiso cms_pages.update)"""
     db_page = CMSPageService.update_page(db, page_id, page)
@@ -82,7 +82,7 @@ def update_page(
 def delete_page(
     page_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("cms_pages", "delete")),
+    current_user: Principal = Depends(check_permission("cms_pages", "delete")),
 ):
     """Eliminar una página (requiere permiso cms_pages.delete)"""
     if not CMSPageService.delete_page(db, page_id):
@@ -4,8 +4,8 @@ from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from app.api.deps import check_permission, get_db
+from app.core.principal import Principal
 from app.models.contact_lead import LeadStatus
-from app.models.user import User
 from app.schemas.contact_lead import ContactLead, ContactLeadCreate, ContactLeadUpdate
 from app.services.contact_lead_service import ContactLeadService
 
@@ -32,7 +32,7 @@ def get_contact_leads(
     status: Optional[LeadStatus] = None,
     unread_only: bool = False,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("contact_leads", "manage")),
+    current_user: Principal = Depends(check_permission("contact_leads", "manage")),
 ):
     """Obtener todos los leads (requiere permiso contact_leads.manage)"""
     return ContactLeadService.get_leads(db, skip, limit, status, unread_only)
@@ -41,7 +41,7 @@ def get_contact_leads(
 @router.get("/unread-count", response_model=dict)
 def get_unread_count(
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("contact_leads", "manage")),
+    current_user: Principal = Depends(check_permission("contact_leads", "manage")),
 ):
     """Obtener el número de leads no leídos (requiere permiso contact_leads.manage)"""
     count = ContactLeadService.get_unread_count(db)
@@ -52,7 +52,7 @@ def get_unread_count(
 def get_contact_lead(
     lead_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("contact_leads", "manage")),
+    current_user: Principal = Depends(check_permission("contact_leads", "manage")),
 ):
     """Obtener un lead por ID (requiere permiso contact_leads.manage)"""
     lead = ContactLeadService.get_lead(db, lead_id)
@@ -66,7 +66,7 @@ def update_contact_lead(
     lead_id: int,
     lead: ContactLeadUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("contact_leads", "manage")),
+    current_user: Principal = Depends(check_permission("contact_leads", "manage")),
 ):
     """Actualizar un lead (requiere permiso contact_leads.manage)"""
     db_lead = ContactLeadService.update_lead(db, lead_id, lead)
@@ -79,7 +79,7 @@ def update_contact_lead(
 def mark_lead_as_read(
     lead_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("contact_leads", "manage")),
+    current_user: Principal = Depends(check_permission("contact_leads", "manage")),
 ):
     """Marcar un lead como leído (requiere permiso contact_leads.manage)"""
     db_lead = ContactLeadService.mark_as_read(db, lead_id)
@@ -92,7 +92,7 @@ def mark_lead_as_read(
 def delete_contact_lead(
     lead_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("contact_leads", "manage")),
+    current_user: Principal = Depends(check_permission("contact_leads", "manage")),
 ):
     """Eliminar un lead (requiere permiso contact_leads.manage)"""
     if not ContactLeadService.delete_lead(db, lead_id):
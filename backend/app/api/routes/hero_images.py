@@ -8,7 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import check_permission, get_db
-from app.models.user import User
+from app.core.principal import Principal
 from app.schemas.hero_image import HeroImage, HeroImageCreate, HeroImageUpdate
 from app.services.hero_image_service import HeroImageService
 
@@ -44,7 +44,7 @@ def get_hero_image(image_id: int, db: Session = Depends(get_db)):
 def create_hero_image(
     image: HeroImageCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("hero_images", "create")),
+    current_user: Principal = Depends(check_permission("hero_images", "create")),
 ):
     """Crear una nueva imagen del hero (requiere permiso hero_images.create)"""
     return HeroImageService.create(db, image)
@@ -55,7 +55,7 @@ def update_hero_image(
     image_id: int,
     image: HeroImageUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("hero_images", "update")),
+    current_user: Principal = Depends(check_permission("hero_images", "update")),
 ):
     """Actualizar una imagen del hero (requiere permiso hero_images.update)"""
     updated_image = HeroImageService.update(db, image_id, image)
@@ -70,7 +70,7 @@ def update_hero_image(
 def delete_hero_image(
     image_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("hero_images", "delete")),
+    current_user: Principal = Depends(check_permission("hero_images", "delete")),
 ):
     """Eliminar una imagen del hero (requiere permiso hero_images.delete)"""
     if not HeroImageService.delete(db, image_id):
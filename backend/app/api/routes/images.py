@@ -0,0 +1,101 @@
+"""
+Rutas API para variantes de imagen bajo demanda
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db
+from app.api.routes.media import (
+    IMMUTABLE_CACHE_CONTROL,
+    MediaFileResponse,
+    etag_matches,
+)
+from app.core.image_executor import ImageExecutorBusyError
+from app.core.rate_limit import RateLimitExceeded
+from app.services.image_transform_service import ImageTransformService
+from app.utils.images import RENDITION_FORMATS
+
+router = APIRouter()
+
+
+@router.get("/{file_id}")
+async def get_image(
+    file_id: int,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=ImageTransformService.MAX_DIMENSION),
+    h: Optional[int] = Query(None, ge=1, le=ImageTransformService.MAX_DIMENSION),
+    fit: str = Query("cover", pattern="^(cover|contain|fill)$"),
+    output_format: Optional[str] = Query(
+        None, alias="format", pattern="^(jpeg|png|webp|avif)$"
+    ),
+    db: Session = Depends(get_db),
+) -> Response:
+    """
+    Obtener una variante de una imagen subida (público)
+
+    Parámetros:
+    - w / h: Ancho y alto en px (con uno solo se conserva la proporción).
+      Se redondean al siguiente tamaño de IMAGE_VARIANT_SIZES; con ambos se
+      conserva la relación de aspecto pedida
+    - fit: cover (recorte centrado), contain (cabe dentro) o fill (estira)
+    - format: jpeg/png/webp/avif; si se omite se negocia con Accept
+
+    Las variantes se generan desde el original y se guardan en una caché en
+    disco; nunca se amplía la imagen por encima de su tamaño original. Las
+    variantes que no están en caché están limitadas por IP (429).
+    """
+    service = ImageTransformService(db)
+    db_file = service.get_image(file_id)
+    if not db_file:
+        raise HTTPException(status_code=404, detail="Imagen no encontrada")
+
+    try:
+        pillow_format, negotiated = service.choose_format(
+            output_format,
+            request.headers.get("accept", ""),
+            str(db_file.mime_type),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    w, h = service.snap_size(w, h)
+    key = service.variant_key(db_file, w, h, fit, pillow_format)
+    headers = {"etag": f'"{key.rsplit(".", 1)[0]}"'}
+    if negotiated:
+        headers["vary"] = "Accept"
+    # Un ID siempre apunta al mismo contenido: la variante es inmutable
+    headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, headers["etag"]):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        path = await service.render_variant(
+            db_file,
+            w,
+            h,
+            fit,
+            pillow_format,
+            client=request.client.host if request.client else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImageExecutorBusyError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
+    except RateLimitExceeded as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    size = path.stat().st_size
+    headers["content-type"] = RENDITION_FORMATS[pillow_format][0]
+    headers["content-length"] = str(size)
+    return MediaFileResponse(path, headers, count=size)
@@ -0,0 +1,276 @@
+"""
+Servicio de archivos subidos (/uploads)
+
+Sustituye al ``StaticFiles`` genérico con una política de caché adecuada
+para los nombres por contenido que genera ``UploadService``:
+
+- ``hero/<sha256>.jpg`` o ``hero/<sha256>-480w.webp`` nunca cambian, así que
+  se sirven con ``Cache-Control: immutable`` y un ETag fuerte derivado del
+  hash del nombre (sin ``stat`` ni lectura del archivo para calcularlo).
+- El resto (avatares, nombres antiguos) usa un ETag débil de mtime/tamaño y
+  se revalida siempre.
+- Rangos ``bytes=`` con respuestas 206/416 correctas para el scrubbing de
+  vídeo, e ``If-Range`` para no mezclar versiones.
+- Si el servidor ASGI anuncia las extensiones ``http.response.pathsend`` o
+  ``http.response.zerocopy`` el cuerpo se envía sin pasar por Python
+  (sendfile); si no, se lee por bloques en un hilo.
+"""
+
+import os
+import re
+import stat
+from email.utils import formatdate
+from mimetypes import guess_type
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import anyio
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import RedirectResponse
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from app.core.storage import get_storage
+from app.services.upload_service import UploadService
+
+router = APIRouter()
+
+# Un año: el máximo recomendado para recursos inmutables
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+# Nombres por contenido: sha256 completo (o los 12 caracteres de la versión
+# anterior) con sufijos opcionales de versión del spec ``-1a2b3c4d`` (re-render)
+# y de rendition ``-480w`` o miniatura ``-thumb``
+HASHED_NAME_RE = re.compile(
+    r"^(?:[0-9a-f]{64}|[0-9a-f]{12})(?:-[0-9a-f]{8})?(?:-\d+w|-thumb)?$"
+)
+
+# Tamaño de bloque cuando no hay sendfile disponible
+READ_CHUNK_SIZE = 256 * 1024
+
+
+def is_content_hashed(path: Path) -> bool:
+    """Indicar si el nombre del archivo deriva de su contenido"""
+    return HASHED_NAME_RE.match(path.stem) is not None
+
+
+def build_etag(path: Path, st: os.stat_result) -> str:
+    """ETag fuerte para nombres por contenido, débil (mtime-tamaño) para el resto"""
+    if is_content_hashed(path):
+        return f'"{path.stem}"'
+    return f'W/"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Comparación débil de ``If-None-Match`` (RFC 9110 §13.1.2)"""
+    if header.strip() == "*":
+        return True
+    target = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == target for tag in header.split(","))
+
+
+def parse_range(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Interpretar una cabecera ``Range: bytes=...``
+
+    Retorna la lista de rangos [inicio, fin] satisfacibles (puede estar
+    vacía → 416) o None si la cabecera no es válida y debe ignorarse.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+
+    ranges: List[Tuple[int, int]] = []
+    for part in spec.split(","):
+        start_text, sep, end_text = part.strip().partition("-")
+        if not sep:
+            return None
+        try:
+            if not start_text:
+                # Sufijo: los últimos N bytes
+                length = int(end_text)
+                if length <= 0:
+                    continue
+                start, end = max(0, size - length), size - 1
+            else:
+                start = int(start_text)
+                end = int(end_text) if end_text else size - 1
+        except ValueError:
+            return None
+        if start >= size:
+            continue
+        if end < start:
+            return None
+        ranges.append((start, min(end, size - 1)))
+    return ranges
+
+
+class MediaFileResponse(Response):
+    """
+    Respuesta de archivo con soporte de rango y envío zero-copy
+
+    Se construye con las cabeceras ya calculadas; solo envía el tramo
+    [offset, offset + count) del archivo.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        headers: Dict[str, str],
+        status_code: int = 200,
+        offset: int = 0,
+        count: int = 0,
+        send_body: bool = True,
+    ):
+        self.path = path
+        self.status_code = status_code
+        self.media_type = None
+        self.background = None
+        self.offset = offset
+        self.count = count
+        self.send_body = send_body
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if not self.send_body or self.count <= 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        extensions = scope.get("extensions") or {}
+        whole_file = self.status_code == 200 and self.offset == 0
+        if whole_file and "http.response.pathsend" in extensions:
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+            return
+
+        f = await anyio.to_thread.run_sync(open, self.path, "rb")
+        try:
+            if "http.response.zerocopy" in extensions:
+                await send(
+                    {
+                        "type": "http.response.zerocopy",
+                        "file": f,
+                        "offset": self.offset,
+                        "count": self.count,
+                        "more_body": False,
+                    }
+                )
+                return
+
+            await anyio.to_thread.run_sync(f.seek, self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await anyio.to_thread.run_sync(
+                    f.read, min(READ_CHUNK_SIZE, remaining)
+                )
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": remaining > 0,
+                    }
+                )
+            if remaining > 0:
+                # El archivo se truncó durante el envío: cerrar el cuerpo
+                await send({"type": "http.response.body", "body": b""})
+        finally:
+            await anyio.to_thread.run_sync(f.close)
+
+
+def is_private_key(key: str) -> bool:
+    """
+    Claves que nunca se sirven
+
+    Directorios internos (.tmp, .sessions, .cache, .originals) y los
+    originales guardados en la ubicación anterior (``originals/``), que
+    conservan EXIF y GPS.
+    """
+    parts = key.split("/")
+    return parts[0] == UploadService.LEGACY_ORIGINALS_FOLDER or any(
+        not part or part.startswith(".") for part in parts
+    )
+
+
+def _resolve(key: str) -> Tuple[Path, os.stat_result]:
+    """Ruta en disco y ``stat`` de ``key`` o 404"""
+    if is_private_key(key):
+        raise HTTPException(status_code=404, detail="Archivo no encontrado")
+    try:
+        path = get_storage().local_path(key)
+        st = path.stat() if path is not None else None
+    except (ValueError, OSError):
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
+        raise HTTPException(status_code=404, detail="Archivo no encontrado")
+    return path, st
+
+
+@router.api_route("/{file_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def serve_media(file_path: str, request: Request) -> Response:
+    """
+    Servir un archivo subido
+
+    Con almacenamiento remoto redirige a la URL pública del backend.
+    """
+    storage = get_storage()
+    if storage.local_path("") is None:
+        if is_private_key(file_path):
+            raise HTTPException(status_code=404, detail="Archivo no encontrado")
+        return RedirectResponse(storage.url(file_path), status_code=307)
+
+    path, st = await anyio.to_thread.run_sync(_resolve, file_path)
+    etag = build_etag(path, st)
+    headers = {
+        "etag": etag,
+        "last-modified": formatdate(st.st_mtime, usegmt=True),
+        "cache-control": (
+            IMMUTABLE_CACHE_CONTROL
+            if is_content_hashed(path)
+            else REVALIDATE_CACHE_CONTROL
+        ),
+        "accept-ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    headers["content-type"] = guess_type(path.name)[0] or "application/octet-stream"
+    send_body = request.method != "HEAD"
+    size = st.st_size
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # If-Range solo admite ETags fuertes: si no coincide se envía el archivo completo
+    if range_header and (if_range is None or if_range.strip() == etag):
+        ranges = parse_range(range_header, size)
+        if ranges is not None and not ranges:
+            headers["content-range"] = f"bytes */{size}"
+            headers["content-length"] = "0"
+            return Response(status_code=416, headers=headers)
+        if ranges is not None and len(ranges) == 1:
+            start, end = ranges[0]
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+            headers["content-length"] = str(end - start + 1)
+            return MediaFileResponse(
+                path,
+                headers,
+                status_code=206,
+                offset=start,
+                count=end - start + 1,
+                send_body=send_body,
+            )
+        # Varios rangos (multipart/byteranges) no se usan en navegadores: 200 completo
+
+    headers["content-length"] = str(size)
+    return MediaFileResponse(path, headers, count=size, send_body=send_body)
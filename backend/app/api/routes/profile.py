@@ -1,14 +1,11 @@
-import os
-import uuid
-from pathlib import Path
-from typing import Optional
-
 from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status
 from sqlalchemy.orm import Session
 
 from ...core.database import get_db
+from ...core.image_executor import ImageExecutorBusyError
 from ...models.user import User
 from ...schemas.user import ProfileUpdate, UserResponse
+from ...services.avatar_service import AvatarService
 from ...services.user_service import UserService
 from ...utils.audit import AuditAction, AuditResource, log_action
 from ..deps import get_current_active_user
@@ -71,53 +68,21 @@ async def upload_avatar(
 ):
     """
     Upload user avatar
-    In production, this should upload to cloud storage (S3, Cloudinary, etc.)
-    For now, we'll just return a placeholder URL
+    Streamed to disk once (max 5MB), converted to square 32/64/256px WebP
+    renditions named by content hash; the previous avatar files are removed
     """
-    # Validate file type
-    allowed_types = ["image/jpeg", "image/png", "image/gif", "image/webp"]
-    if file.content_type not in allowed_types:
+    old_avatar = current_user.avatar_url
+    try:
+        avatar_url = await AvatarService(db).save_avatar(file, current_user)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ImageExecutorBusyError as e:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Tipo de archivo no permitido. Use JPEG, PNG, GIF o WebP.",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
         )
 
-    # Validate file size (max 5MB)
-    file_size = 0
-    chunk_size = 1024 * 1024  # 1MB
-    while chunk := await file.read(chunk_size):
-        file_size += len(chunk)
-        if file_size > 5 * 1024 * 1024:  # 5MB
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="El archivo es demasiado grande. Máximo 5MB.",
-            )
-
-    # Reset file position
-    await file.seek(0)
-
-    # Create uploads directory if it doesn't exist
-    uploads_dir = Path("uploads/avatars")
-    uploads_dir.mkdir(parents=True, exist_ok=True)
-
-    # Generate unique filename
-    file_extension = file.filename.split(".")[-1]
-    unique_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = uploads_dir / unique_filename
-
-    # Save file
-    with open(file_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
-
-    # Generate URL (in production, this would be S3/Cloudinary URL)
-    avatar_url = f"/uploads/avatars/{unique_filename}"
-
-    # Update user avatar
-    old_avatar = current_user.avatar_url
-    current_user.avatar_url = avatar_url  # type: ignore[assignment]
-    db.commit()
-
     # Log the change
     log_action(
         db=db,
@@ -133,11 +98,15 @@ async def upload_avatar(
         },
     )
 
-    return {"message": "Avatar actualizado exitosamente", "avatar_url": avatar_url}
+    return {
+        "message": "Avatar actualizado exitosamente",
+        "avatar_url": avatar_url,
+        "avatar_urls": current_user.avatar_urls,
+    }
 
 
 @router.delete("/avatar")
-def delete_avatar(
+async def delete_avatar(
     request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
@@ -145,15 +114,8 @@ def delete_avatar(
     """Delete user avatar"""
     old_avatar = current_user.avatar_url
 
-    # Delete file if exists
-    if old_avatar and old_avatar.startswith("/uploads/"):
-        file_path = Path(old_avatar.lstrip("/"))
-        if file_path.exists():
-            file_path.unlink()
-
-    # Update database
-    current_user.avatar_url = None
-    db.commit()
+    # Delete the files too unless another user shares the same image
+    await AvatarService(db).remove_avatar(current_user)
 
     # Log the change
     log_action(
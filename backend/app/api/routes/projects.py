@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import check_permission, get_db
-from app.models.user import User
+from app.core.principal import Principal
 from app.schemas.project import Project, ProjectCreate, ProjectUpdate
 from app.services.project_service import ProjectService
 
@@ -48,7 +48,7 @@ def get_project_by_slug(slug: str, db: Session = Depends(get_db)):
 def create_project(
     project: ProjectCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("projects", "create")),
+    current_user: Principal = Depends(check_permission("projects", "create")),
 ):
     """Crear un nuevo proyecto (requiere permiso projects.create)"""
     # Verificar si el slug ya existe
@@ -64,7 +64,7 @@ def update_project(
     project_id: int,
     project: ProjectUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("projects", "update")),
+    current_user: Principal = Depends(check_permission("projects", "update")),
 ):
     """Actualizar un proyecto (requiere permiso projects.update)"""
     db_project = ProjectService.update_project(db, project_id, project)
@@ -77,7 +77,7 @@ def update_project(
 def delete_project(
     project_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("projects", "delete")),
+    current_user: Principal = Depends(check_permission("projects", "delete")),
 ):
     """Eliminar un proyecto (requiere permiso projects.delete)"""
     if not ProjectService.delete_project(db, project_id):
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import check_permission, get_db
-from app.models.user import User
+from app.core.principal import Principal
 from app.schemas.service import Service, ServiceCreate, ServiceUpdate
 from app.services.service_service import ServiceService
 
@@ -45,7 +45,7 @@ def get_service_by_slug(slug: str, db: Session = Depends(get_db)):
 def create_service(
     service: ServiceCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("services", "create")),
+    current_user: Principal = Depends(check_permission("services", "create")),
 ):
     """Crear un nuevo servicio (requiere permiso services.create)"""
     # Verificar si el slug ya existe
@@ -61,7 +61,7 @@ def update_service(
     service_id: int,
     service: ServiceUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("services", "update")),
+    current_user: Principal = Depends(check_permission("services", "update")),
 ):
     """Actualizar un servicio (requiere permiso services.update)"""
     db_service = ServiceService.update_service(db, service_id, service)
@@ -74,7 +74,7 @@ def update_service(
 def delete_service(
     service_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("services", "delete")),
+    current_user: Principal = Depends(check_permission("services", "delete")),
 ):
     """Eliminar un servicio (requiere permiso services.delete)"""
     if not ServiceService.delete_service(db, service_id):
@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.api.deps import check_permission, get_db
-from app.models.user import User
+from app.core.principal import Principal
 from app.schemas.site_config import SiteConfig, SiteConfigUpdate
 from app.services.site_config_service import SiteConfigService
 
@@ -22,7 +22,7 @@ def get_site_config(db: Session = Depends(get_db)):
 def update_site_config(
     config: SiteConfigUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("site_config", "update")),
+    current_user: Principal = Depends(check_permission("site_config", "update")),
 ):
     """Actualizar la configuración del sitio (requiere permiso site_config.update)"""
     return SiteConfigService.create_or_update_config(db, config)
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import check_permission, get_db
-from app.models.user import User
+from app.core.principal import Principal
 from app.schemas.testimonial import Testimonial, TestimonialCreate, TestimonialUpdate
 from app.services.testimonial_service import TestimonialService
 
@@ -38,7 +38,7 @@ def get_testimonial(testimonial_id: int, db: Session = Depends(get_db)):
 def create_testimonial(
     testimonial: TestimonialCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("testimonials", "create")),
+    current_user: Principal = Depends(check_permission("testimonials", "create")),
 ):
     """Crear un nuevo testimonio (requiere permiso testimonials.create)"""
     return TestimonialService.create_testimonial(db, testimonial)
@@ -49,7 +49,7 @@ def update_testimonial(
     testimonial_id: int,
     testimonial: TestimonialUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("testimonials", "update")),
+    current_user: Principal = Depends(check_permission("testimonials", "update")),
 ):
     """Actualizar un testimonio (requiere permiso testimonials.update)"""
     db_testimonial = TestimonialService.update_testimonial(
@@ -64,7 +64,7 @@ def update_testimonial(
 def delete_testimonial(
     testimonial_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(check_permission("testimonials", "delete")),
+    current_user: Principal = Depends(check_permission("testimonials", "delete")),
 ):
     """Eliminar un testimonio (requiere permiso testimonials.delete)"""
     if not TestimonialService.delete_testimonial(db, testimonial_id):
@@ -2,13 +2,47 @@
 Rutas API para gestión de archivos subidos
 """
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from typing import List, Optional
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
 from sqlalchemy.orm import Session
 
-from app.api.deps import check_permission, get_current_user, get_db
-from app.models.user import User
+from app.api.deps import check_permission, get_current_principal, get_db
+from app.core.image_cache import get_image_cache
+from app.core.image_executor import ImageExecutorBusyError, get_image_executor
+from app.core.principal import Principal
+from app.schemas.upload_session import DirectUpload as DirectUploadSchema
+from app.schemas.upload_session import UploadSession as UploadSessionSchema
+from app.schemas.upload_session import UploadSessionCreate
+from app.schemas.uploaded_file import (
+    BatchUploadResponse,
+    MediaGCReport,
+    RenditionJob,
+    RenditionManifest,
+    StorageUsageReport,
+)
 from app.schemas.uploaded_file import UploadedFile as UploadedFileSchema
+from app.schemas.uploaded_file import UploadedFileListItem
+from app.services.media_gc_service import MediaGCService, last_run_summary
+from app.services.rerender_service import RerenderService, run_job
+from app.services.storage_usage_service import StorageQuotaError, StorageUsageService
 from app.services.upload_service import UploadService
+from app.services.upload_session_service import (
+    UploadOffsetError,
+    UploadSessionService,
+)
 
 router = APIRouter()
 
@@ -18,7 +52,7 @@ async def upload_file(
     folder: str,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     _: bool = Depends(check_permission("uploads", "create")),
 ) -> UploadedFileSchema:
     """
@@ -38,19 +72,432 @@ async def upload_file(
             user_id=current_user.id,  # type: ignore[arg-type]
         )
         return uploaded_file
+    except StorageQuotaError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ImageExecutorBusyError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al subir archivo: {str(e)}")
 
 
+@router.post("/batch", response_model=BatchUploadResponse)
+async def upload_files_batch(
+    folder: str,
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    _: bool = Depends(check_permission("uploads", "create")),
+) -> BatchUploadResponse:
+    """
+    Subir varios archivos en una sola petición
+
+    Parámetros:
+    - folder: Carpeta destino (hero/services/projects)
+    - files: Archivos a subir (máximo 50)
+
+    Los archivos se procesan en paralelo y se registran en una única
+    transacción. Retorna un resultado por archivo (created, duplicate o
+    error); un archivo inválido no impide guardar el resto.
+    """
+    try:
+        results = await UploadService(db).save_files(
+            files=files,
+            folder=folder,
+            user_id=current_user.id,  # type: ignore[arg-type]
+        )
+    except StorageQuotaError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    statuses = [result["status"] for result in results]
+    return BatchUploadResponse(
+        results=results,  # type: ignore[arg-type]
+        created=statuses.count("created"),
+        duplicates=statuses.count("duplicate"),
+        failed=statuses.count("error"),
+    )
+
+
+@router.get("/metrics", response_model=dict)
+async def get_upload_metrics(
+    _current_user: Principal = Depends(get_current_principal),
+    __: bool = Depends(check_permission("uploads", "read")),
+) -> dict:
+    """
+    Métricas del pool de procesamiento de imágenes
+
+    Retorna profundidad de cola, trabajos en curso y latencia (ms), el uso
+    de la caché de variantes de /api/images y la última ejecución del GC
+    """
+    return {
+        "image_executor": get_image_executor().metrics(),
+        "image_cache": get_image_cache().metrics(),
+        "media_gc": last_run_summary(),
+    }
+
+
+@router.get("/usage", response_model=StorageUsageReport)
+async def get_storage_usage(
+    db: Session = Depends(get_db),
+    _current_user: Principal = Depends(get_current_principal),
+    __: bool = Depends(check_permission("uploads", "read")),
+) -> StorageUsageReport:
+    """
+    Uso de almacenamiento: total, por folder (y tipo) y por usuario
+
+    Lee los contadores incrementales (no recorre `uploaded_files` ni el
+    disco). Incluye la cuota configurada de cada folder y usuario, si la hay.
+    """
+    return StorageUsageService(db).report()  # type: ignore[return-value]
+
+
+@router.post("/usage/rebuild", response_model=StorageUsageReport)
+async def rebuild_storage_usage(
+    db: Session = Depends(get_db),
+    _current_user: Principal = Depends(get_current_principal),
+    __: bool = Depends(check_permission("uploads", "delete")),
+) -> StorageUsageReport:
+    """
+    Recalcular los contadores de uso desde `uploaded_files`
+
+    Solo es necesario tras escrituras que no pasan por el ORM.
+    """
+    service = StorageUsageService(db)
+    service.rebuild()
+    return service.report()  # type: ignore[return-value]
+
+
+@router.post("/gc", response_model=MediaGCReport)
+async def collect_orphaned_files(
+    dry_run: bool = True,
+    grace_hours: Optional[int] = Query(None, ge=0),
+    batch_size: Optional[int] = Query(None, ge=1, le=1000),
+    reindex: bool = False,
+    db: Session = Depends(get_db),
+    _current_user: Principal = Depends(get_current_principal),
+    __: bool = Depends(check_permission("uploads", "delete")),
+) -> MediaGCReport:
+    """
+    Purgar archivos que ningún contenido referencia
+
+    Parámetros:
+    - dry_run: Solo informar (por defecto). False para borrar de verdad
+    - grace_hours: Antigüedad mínima (por defecto MEDIA_GC_GRACE_HOURS)
+    - batch_size: Archivos por lote/commit (por defecto MEDIA_GC_BATCH_SIZE)
+    - reindex: Reconstruir antes el índice de referencias
+    """
+    gc_service = MediaGCService(db)
+    reindexed = gc_service.rebuild_index() if reindex else None
+    report = await gc_service.collect(
+        grace_hours=grace_hours, batch_size=batch_size, dry_run=dry_run
+    )
+    return MediaGCReport(**report, reindexed=reindexed)
+
+
+@router.post(
+    "/rerender", response_model=RenditionJob, status_code=status.HTTP_202_ACCEPTED
+)
+async def start_rendition_job(
+    folder: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    __: bool = Depends(check_permission("uploads", "delete")),
+) -> RenditionJob:
+    """
+    Re-renderizar las imágenes de un folder con el spec vigente
+
+    Se ejecuta en segundo plano; el progreso se consulta con
+    GET /rerender/{job_id}. Los archivos anteriores se borran al terminar
+    cada lote (por eso requiere ``uploads.delete``).
+    """
+    service = RerenderService(db)
+    active = service.active_job(folder)
+    if active is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"El folder ya tiene un trabajo en curso (#{active.id})",
+        )
+    try:
+        job = service.create_job(folder, current_user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    background_tasks.add_task(run_job, db.get_bind(), job.id)
+    return RenditionJob.model_validate(job)
+
+
+@router.get("/rerender/{job_id}", response_model=RenditionJob)
+async def get_rendition_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    _current_user: Principal = Depends(get_current_principal),
+    __: bool = Depends(check_permission("uploads", "read")),
+) -> RenditionJob:
+    """Estado de un trabajo de re-render"""
+    job = RerenderService(db).get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return RenditionJob.model_validate(job)
+
+
+@router.post(
+    "/rerender/{job_id}/resume",
+    response_model=RenditionJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def resume_rendition_job(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    _current_user: Principal = Depends(get_current_principal),
+    __: bool = Depends(check_permission("uploads", "delete")),
+) -> RenditionJob:
+    """
+    Reanudar un trabajo interrumpido desde su último checkpoint
+
+    Un trabajo "running" (o "pending") solo se reanuda si su ejecutor no
+    ha confirmado ningún lote en RERENDER_LEASE_SECONDS (el proceso que lo
+    ejecutaba se detuvo); si no, 409.
+    """
+    service = RerenderService(db)
+    job = service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    if job.status == "completed":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="El trabajo ya terminó"
+        )
+    if not service.claim_for_resume(job):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"El trabajo #{job.id} sigue en curso",
+        )
+
+    background_tasks.add_task(run_job, db.get_bind(), job.id)
+    return RenditionJob.model_validate(job)
+
+
+def _get_session_or_404(
+    service: UploadSessionService, session_id: str, user: Principal
+):
+    session = service.get_session(session_id, user.id)  # type: ignore[arg-type]
+    if not session:
+        raise HTTPException(status_code=404, detail="Sesión de subida no encontrada")
+    return session
+
+
+def _offset_conflict(e: UploadOffsetError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=str(e),
+        headers={"Upload-Offset": str(e.offset)},
+    )
+
+
+@router.post(
+    "/sessions",
+    response_model=UploadSessionSchema,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_upload_session(
+    data: UploadSessionCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    _: bool = Depends(check_permission("uploads", "create")),
+) -> UploadSessionSchema:
+    """
+    Crear una sesión de subida reanudable
+
+    Parámetros:
+    - folder, filename, mime_type, total_size (bytes)
+
+    Los bloques se envían con PATCH `/sessions/{id}` y la cabecera
+    `Upload-Offset`; al terminar se llama a POST `/sessions/{id}/complete`
+    """
+    try:
+        service = UploadSessionService(db)
+        return service.create_session(data, user_id=current_user.id)  # type: ignore[arg-type]
+    except StorageQuotaError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/sessions/{session_id}", response_model=UploadSessionSchema)
+async def get_upload_session(
+    session_id: str,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    _: bool = Depends(check_permission("uploads", "create")),
+) -> UploadSessionSchema:
+    """
+    Consultar el progreso de una sesión (offset desde el que reanudar)
+    """
+    session = _get_session_or_404(UploadSessionService(db), session_id, current_user)
+    response.headers["Upload-Offset"] = str(session.received_size)
+    return session
+
+
+@router.patch("/sessions/{session_id}", response_model=UploadSessionSchema)
+async def upload_session_chunk(
+    session_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(..., alias="Upload-Offset", ge=0),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    _: bool = Depends(check_permission("uploads", "create")),
+) -> UploadSessionSchema:
+    """
+    Enviar un bloque de la sesión
+
+    El cuerpo son los bytes crudos del bloque; `Upload-Offset` indica su
+    posición. Si no coincide con lo recibido se responde 409 con el offset
+    correcto en la cabecera `Upload-Offset`.
+    """
+    service = UploadSessionService(db)
+    session = _get_session_or_404(service, session_id, current_user)
+
+    try:
+        offset = await service.append_chunk(session, upload_offset, request.stream())
+    except UploadOffsetError as e:
+        raise _offset_conflict(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    response.headers["Upload-Offset"] = str(offset)
+    return session
+
+
+@router.post("/sessions/{session_id}/complete", response_model=UploadedFileSchema)
+async def complete_upload_session(
+    session_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    _: bool = Depends(check_permission("uploads", "create")),
+) -> UploadedFileSchema:
+    """
+    Finalizar la sesión: valida el archivo completo y crea el UploadedFile
+
+    Retorna el archivo subido (o existente si es duplicado)
+    """
+    service = UploadSessionService(db)
+    session = _get_session_or_404(service, session_id, current_user)
+
+    try:
+        return await service.finalize(session)
+    except UploadOffsetError as e:
+        raise _offset_conflict(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImageExecutorBusyError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
+
+
+@router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload_session(
+    session_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    _: bool = Depends(check_permission("uploads", "create")),
+) -> None:
+    """Cancelar una sesión de subida y descartar los bytes recibidos"""
+    service = UploadSessionService(db)
+    await service.abort(_get_session_or_404(service, session_id, current_user))
+
+
+@router.post(
+    "/direct",
+    response_model=DirectUploadSchema,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_direct_upload(
+    data: UploadSessionCreate,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    _: bool = Depends(check_permission("uploads", "create")),
+) -> DirectUploadSchema:
+    """
+    Crear una subida directa al almacenamiento
+
+    Parámetros:
+    - folder, filename, mime_type, total_size (bytes)
+
+    `upload` describe la petición que el cliente envía sin pasar por la API:
+    con S3 un POST multipart al bucket (`fields` primero y el archivo en el
+    campo `file`); con almacenamiento local un PUT firmado con el cuerpo
+    crudo. Después se llama a POST `/sessions/{id}/complete`.
+    """
+    service = UploadSessionService(db)
+    try:
+        session, target = service.create_direct_upload(
+            data, user_id=current_user.id  # type: ignore[arg-type]
+        )
+    except StorageQuotaError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if target is None:
+        url = request.url_for("receive_direct_upload", session_id=session.id)
+        target = {
+            "method": "PUT",
+            "url": str(url.include_query_params(**service.signed_params(session.id))),
+            "headers": {"Content-Type": session.mime_type},
+        }
+    return DirectUploadSchema.model_validate(
+        {**UploadSessionSchema.model_validate(session).model_dump(), "upload": target}
+    )
+
+
+@router.put("/direct/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def receive_direct_upload(
+    session_id: str,
+    request: Request,
+    expires: int = Query(...),
+    signature: str = Query(...),
+    db: Session = Depends(get_db),
+) -> None:
+    """
+    Recibir una subida directa con almacenamiento local
+
+    La URL firmada es la credencial (sin token): el cuerpo son los bytes
+    crudos del archivo y se escribe a disco a medida que llega.
+    """
+    if not UploadSessionService.verify_signature(session_id, expires, signature):
+        raise HTTPException(status_code=403, detail="Firma inválida o caducada")
+
+    service = UploadSessionService(db)
+    session = service.get_direct_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Sesión de subida no encontrada")
+
+    try:
+        await service.receive_direct(session, request.stream())
+    except UploadOffsetError as e:
+        raise _offset_conflict(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/{folder}", response_model=dict)
 async def list_files_by_folder(
     folder: str,
     skip: int = 0,
     limit: int = 100,
+    compact: bool = False,
     db: Session = Depends(get_db),
-    _current_user: User = Depends(get_current_user),
+    _current_user: Principal = Depends(get_current_principal),
     __: bool = Depends(check_permission("uploads", "read")),
 ) -> dict:
     """
@@ -60,11 +507,21 @@ async def list_files_by_folder(
     - folder: Carpeta (hero/services/projects)
     - skip: Offset para paginación
     - limit: Cantidad de resultados
+    - compact: Solo los campos de una rejilla (URL y miniatura con sus
+      dimensiones, color dominante, tipo y tamaño)
     """
     try:
         upload_service = UploadService(db)
-        files, total = upload_service.get_files_by_folder(folder, skip, limit)
-        return {"files": files, "total": total, "skip": skip, "limit": limit}
+        files, total = upload_service.get_files_by_folder(
+            folder, skip, limit, compact=compact
+        )
+        schema = UploadedFileListItem if compact else UploadedFileSchema
+        return {
+            "files": [schema.model_validate(f) for f in files],
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+        }
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error al listar archivos: {str(e)}"
@@ -76,7 +533,7 @@ async def delete_file(
     file_id: int,
     permanent: bool = False,
     db: Session = Depends(get_db),
-    _current_user: User = Depends(get_current_user),
+    _current_user: Principal = Depends(get_current_principal),
     __: bool = Depends(check_permission("uploads", "delete")),
 ) -> dict:
     """
@@ -90,7 +547,7 @@ async def delete_file(
         upload_service = UploadService(db)
 
         if permanent:
-            success = upload_service.delete_file_permanent(file_id)
+            success = await upload_service.delete_file_permanent(file_id)
         else:
             success = upload_service.delete_file(file_id)
 
@@ -110,7 +567,7 @@ async def delete_file(
 async def get_file_info(
     file_id: int,
     db: Session = Depends(get_db),
-    _current_user: User = Depends(get_current_user),
+    _current_user: Principal = Depends(get_current_principal),
     __: bool = Depends(check_permission("uploads", "read")),
 ) -> UploadedFileSchema:
     """
@@ -126,3 +583,27 @@ async def get_file_info(
         raise HTTPException(status_code=404, detail="Archivo no encontrado")
 
     return file_info
+
+
+@router.get("/file/{file_id}/renditions", response_model=RenditionManifest)
+async def get_file_renditions(
+    file_id: int,
+    db: Session = Depends(get_db),
+    _current_user: Principal = Depends(get_current_principal),
+    __: bool = Depends(check_permission("uploads", "read")),
+) -> RenditionManifest:
+    """
+    Obtener el manifest responsive de una imagen
+
+    Retorna `src` (archivo principal) y un `sources` por formato, ordenados
+    por preferencia (AVIF, WebP, original), listos para `<picture>`/`srcset`.
+    """
+    upload_service = UploadService(db)
+    file_info = upload_service.get_file_by_id(file_id)
+
+    if not file_info:
+        raise HTTPException(status_code=404, detail="Archivo no encontrado")
+
+    return RenditionManifest(
+        id=file_info.id, src=file_info.url, sources=file_info.sources
+    )
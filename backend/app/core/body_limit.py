@@ -0,0 +1,153 @@
+"""
+Límite de tamaño del cuerpo de las peticiones (middleware ASGI)
+
+Rechaza con 413 los cuerpos que superan el límite de la ruta antes de que
+``python-multipart`` los vuelque a disco o el servicio los lea: por
+``Content-Length`` sin leer nada, o cortando el stream en cuanto los bytes
+recibidos lo superan (cuerpos chunked o con una cabecera falsa).
+
+Los límites se configuran en ``REQUEST_BODY_LIMITS`` por prefijo de ruta
+(gana el prefijo más largo); el resto usa ``REQUEST_BODY_MAX_SIZE``, que
+por defecto no limita nada.
+"""
+
+import json
+from typing import Dict, Optional
+
+from starlette.exceptions import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+class RequestBodyTooLarge(HTTPException):
+    """
+    El cuerpo superó el límite mientras se leía
+
+    Es una ``HTTPException`` para que FastAPI la propague tal cual desde el
+    parser de formularios (en lugar de convertirla en un 400).
+    """
+
+    def __init__(self, limit: int):
+        super().__init__(
+            status_code=413,
+            detail=f"El cuerpo de la petición supera el límite de {limit} bytes",
+        )
+
+
+def body_limit_for(
+    path: str,
+    limits: Optional[Dict[str, int]] = None,
+    default: Optional[int] = None,
+) -> Optional[int]:
+    """
+    Límite en bytes para ``path`` (None = sin límite)
+
+    Gana el prefijo más largo de ``limits``; sin coincidencias, ``default``.
+    """
+    if limits is None:
+        limits = settings.REQUEST_BODY_LIMITS
+    if default is None:
+        default = settings.REQUEST_BODY_MAX_SIZE
+    matches = [prefix for prefix in limits if path.startswith(prefix)]
+    if matches:
+        return limits[max(matches, key=len)]
+    return default
+
+
+class BodySizeLimitMiddleware:
+    """
+    Middleware ASGI que aplica el límite de cuerpo de cada ruta
+
+    Los límites se leen de ``settings`` en cada petición salvo que se pasen
+    al registrar el middleware.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limits: Optional[Dict[str, int]] = None,
+        default: Optional[int] = None,
+    ):
+        self.app = app
+        self.limits = limits
+        self.default = default
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = body_limit_for(scope["path"], self.limits, self.default)
+        if limit is None or limit <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        if _declared_too_large(scope, limit):
+            await _send_too_large(send, limit)
+            return
+
+        response_started = False
+
+        async def tracked_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, _limited_receive(receive, limit), tracked_send)
+        except RequestBodyTooLarge:
+            # Si la app no la convirtió en respuesta, se responde aquí
+            if response_started:
+                raise
+            await _send_too_large(send, limit)
+
+
+def _declared_too_large(scope: Scope, limit: int) -> bool:
+    """Si el Content-Length ya supera el límite (sin leer el cuerpo)"""
+    content_length = _content_length(scope)
+    return content_length is not None and content_length > limit
+
+
+def _limited_receive(receive: Receive, limit: int) -> Receive:
+    """``receive`` que corta el stream en cuanto se recibe más de ``limit``"""
+    received = 0
+
+    async def limited_receive() -> Message:
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > limit:
+                raise RequestBodyTooLarge(limit)
+        return message
+
+    return limited_receive
+
+
+def _content_length(scope: Scope) -> Optional[int]:
+    """Valor de la cabecera Content-Length (None si falta o no es válida)"""
+    for name, value in scope.get("headers", []):
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+async def _send_too_large(send: Send, limit: int) -> None:
+    body = json.dumps({"detail": RequestBodyTooLarge(limit).detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
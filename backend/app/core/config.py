@@ -1,3 +1,5 @@
+from typing import Dict, List, Optional, Tuple
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,6 +8,95 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Per-process cache of the authenticated user's roles and permissions
+    # (0 disables it). Changes made through the services invalidate it.
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    # Embed roles/permissions and the global permission version in access
+    # tokens so requests can be authorized without the database. Tokens whose
+    # version is stale fall back to the database. The current version is
+    # re-read at most every PERMISSION_STAMP_TTL_SECONDS per process.
+    JWT_AUTHZ_CLAIMS: bool = False
+    PERMISSION_STAMP_TTL_SECONDS: int = 5
+    # Revoked tokens (logout): per-process Bloom filter over revoked_tokens,
+    # rebuilt at most every TOKEN_REVOCATION_REFRESH_SECONDS. Only a filter
+    # hit queries the database.
+    TOKEN_REVOCATION_REFRESH_SECONDS: int = 10
+    TOKEN_REVOCATION_CAPACITY: int = 100000
+    TOKEN_REVOCATION_ERROR_RATE: float = 0.001
+    # bcrypt cost factor (4-31). Passwords hashed with another cost are
+    # rehashed on the next successful login.
+    BCRYPT_ROUNDS: int = 12
+    # Login hashes passwords on a dedicated pool: at most PASSWORD_WORKERS
+    # hashes at once and PASSWORD_QUEUE_SIZE waiting; beyond that it is 503.
+    PASSWORD_WORKERS: int = 2
+    PASSWORD_QUEUE_SIZE: int = 16
+
+    # Uploads
+    UPLOAD_DIR: str = "uploads"
+    UPLOAD_SESSION_TTL_HOURS: int = 24
+    # Lifetime of signed direct-to-storage upload URLs
+    DIRECT_UPLOAD_EXPIRE_SECONDS: int = 900
+    # Storage quotas in bytes (stored size: main file + renditions)
+    UPLOAD_FOLDER_QUOTAS: Dict[str, int] = {}  # {"hero": 524288000}
+    UPLOAD_USER_QUOTA: Optional[int] = None  # per uploader, all folders
+
+    # Request body limits in bytes, enforced before the body is parsed (413).
+    # The longest matching path prefix wins; other requests use
+    # REQUEST_BODY_MAX_SIZE (None = unlimited, opt-in). Large files should use
+    # resumable sessions.
+    REQUEST_BODY_MAX_SIZE: Optional[int] = None
+    REQUEST_BODY_LIMITS: Dict[str, int] = {
+        "/api/uploads/": 101 * 1024 * 1024,  # one file (100MB video) + multipart
+        "/api/uploads/batch": 500 * 1024 * 1024,
+        "/api/profile/upload-avatar": 6 * 1024 * 1024,  # 5MB avatar + multipart
+    }
+
+    # Storage backend for uploads ("local" or "s3")
+    STORAGE_BACKEND: str = "local"
+    S3_BUCKET: str = "uploads"
+    S3_ENDPOINT_URL: Optional[str] = None  # e.g. http://localhost:9000 (MinIO)
+    S3_ACCESS_KEY: Optional[str] = None
+    S3_SECRET_KEY: Optional[str] = None
+    S3_REGION: Optional[str] = None
+    S3_PUBLIC_URL: Optional[str] = None  # CDN/bucket URL used in file URLs
+
+    # Image processing pool ("process" or "thread")
+    IMAGE_EXECUTOR: str = "process"
+    IMAGE_WORKERS: int = 2
+    IMAGE_QUEUE_SIZE: int = 8
+
+    # Encoding quality of uploaded images: "fixed" (JPEG 85 / WebP 80),
+    # "ssim" (lowest quality reaching IMAGE_SSIM_TARGET) or "budget" (fixed
+    # quality, lowered only when over the folder byte budget). "ssim" costs
+    # about a third more CPU per upload; deployments opt in.
+    IMAGE_QUALITY_MODE: str = "fixed"
+    IMAGE_SSIM_TARGET: float = 0.98
+    IMAGE_CONVERT_OPAQUE_PNG: bool = False  # store opaque PNG photos as JPEG
+
+    # Rendition spec per folder. Changing it only affects new uploads until
+    # existing images are re-rendered (python rerender_media.py --folder ...)
+    IMAGE_FOLDER_SIZES: Dict[str, Tuple[int, int]] = {}  # {"hero": [1920, 800]}
+    IMAGE_RENDITION_WIDTHS: Optional[List[int]] = None  # default 480/768/1280/1920
+    IMAGE_RENDITION_FORMATS: List[str] = []  # extra formats; default WEBP (+AVIF)
+    RERENDER_BATCH_SIZE: int = 50  # files per commit/checkpoint
+    # A running job whose runner has not checkpointed for this long is
+    # considered abandoned and can be resumed
+    RERENDER_LEASE_SECONDS: int = 300
+
+    # On-demand image variants (/api/images): disk LRU cache
+    IMAGE_CACHE_DIR: Optional[str] = None  # default: <UPLOAD_DIR>/.cache/images
+    IMAGE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    # Requested w/h are rounded up to the next of these sizes, so each image
+    # has a bounded set of variants (default 32 ... 4096, see /api/images)
+    IMAGE_VARIANT_SIZES: Optional[List[int]] = None
+    # Variants rendered on a cache miss, per client IP (0 disables the limit)
+    IMAGE_VARIANT_MISSES_PER_MINUTE: int = 60
+    IMAGE_VARIANT_MISS_BURST: int = 20
+
+    # Orphaned media garbage collection
+    MEDIA_GC_GRACE_HOURS: int = 72  # keep unreferenced uploads at least this long
+    MEDIA_GC_BATCH_SIZE: int = 100
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,186 @@
+"""
+Caché en disco de variantes de imagen generadas bajo demanda
+
+Cada variante (``/api/images/{id}?w=...``) se guarda en un archivo cuyo
+nombre es su clave. El tamaño total está acotado por ``max_bytes``: al
+superarlo se eliminan las variantes usadas hace más tiempo (LRU). El orden
+de uso se mantiene en memoria y se persiste en el mtime de cada archivo,
+así que sobrevive a reinicios.
+
+Peticiones concurrentes de la misma variante se agrupan: solo la primera
+la genera y el resto espera su resultado. La agrupación es por proceso; con
+varios workers de uvicorn una variante puede generarse más de una vez, pero
+la escritura es atómica y el resultado es idéntico.
+"""
+
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import anyio
+
+from .config import settings
+
+
+class ImageCache:
+    """Caché LRU acotada por bytes con agrupación de peticiones en curso"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max(0, max_bytes)
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        # Métricas
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    def path_for(self, key: str) -> Path:
+        """Ruta de la variante (dos niveles para no saturar un directorio)"""
+        return self.directory / key[:2] / key
+
+    def _load(self) -> None:
+        """Reconstruir el índice a partir del disco (más antiguos primero)"""
+        entries = []
+        if self.directory.is_dir():
+            for path in self.directory.glob("*/*"):
+                if path.suffix in (".part", ".src") or not path.is_file():
+                    continue
+                st = path.stat()
+                entries.append((st.st_mtime, path.name, st.st_size))
+        entries.sort()
+        with self._lock:
+            for _, key, size in entries:
+                if key not in self._entries:
+                    self._entries[key] = size
+                    self._total_bytes += size
+            self._loaded = True
+
+    def _touch(self, key: str) -> Optional[Path]:
+        """Marcar ``key`` como usada; None si no está en caché"""
+        path = self.path_for(key)
+        with self._lock:
+            known = key in self._entries
+            if known:
+                self._entries.move_to_end(key)
+        try:
+            # Persistir el orden LRU en el mtime
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                size = self._entries.pop(key, None)
+                if size is not None:
+                    self._total_bytes -= size
+            return None
+        if not known:
+            # Generada por otro proceso
+            self._register(key, path.stat().st_size)
+        return path
+
+    def _register(self, key: str, size: int) -> None:
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        """Eliminar variantes LRU hasta quedar por debajo de ``max_bytes``"""
+        while True:
+            with self._lock:
+                # La variante más reciente se conserva aunque supere el límite
+                if self._total_bytes <= self.max_bytes or len(self._entries) <= 1:
+                    return
+                key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                self._evictions += 1
+            self.path_for(key).unlink(missing_ok=True)
+
+    async def get_or_create(
+        self, key: str, render: Callable[[Path], Awaitable[Any]]
+    ) -> Path:
+        """
+        Obtener la variante ``key`` generándola con ``render`` si no existe
+
+        ``render(path)`` debe escribir la variante en ``path`` (de forma
+        atómica). Si ya hay una generación en curso para ``key`` se espera
+        a ella en lugar de repetirla.
+        """
+        if not self._loaded:
+            await anyio.to_thread.run_sync(self._load)
+
+        future = self._inflight.get(key)
+        if future is None:
+            path = await anyio.to_thread.run_sync(self._touch, key)
+            if path is not None:
+                self._hits += 1
+                return path
+            # Otra petición pudo empezar a generarla durante el await
+            future = self._inflight.get(key)
+
+        if future is not None:
+            self._coalesced += 1
+            return await asyncio.shield(future)
+
+        self._misses += 1
+        future = asyncio.get_running_loop().create_future()
+        # Evitar el aviso "exception was never retrieved" si nadie espera
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            path = self.path_for(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            await render(path)
+            size = (await anyio.to_thread.run_sync(path.stat)).st_size
+            await anyio.to_thread.run_sync(self._register, key, size)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(path)
+            return path
+        finally:
+            del self._inflight[key]
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot de uso de la caché"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "evictions": self._evictions,
+                "in_flight": len(self._inflight),
+            }
+
+
+_image_caches: Dict[tuple, ImageCache] = {}
+_image_caches_lock = threading.Lock()
+
+
+def get_image_cache() -> ImageCache:
+    """Obtener la caché de variantes configurada (una por directorio)"""
+    directory = settings.IMAGE_CACHE_DIR or os.path.join(
+        settings.UPLOAD_DIR, ".cache", "images"
+    )
+    config = (directory, settings.IMAGE_CACHE_MAX_BYTES)
+    with _image_caches_lock:
+        if config not in _image_caches:
+            _image_caches[config] = ImageCache(*config)
+        return _image_caches[config]
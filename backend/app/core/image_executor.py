@@ -0,0 +1,178 @@
+"""
+Pool de procesos para el procesamiento de imágenes
+
+Pillow (LANCZOS, crop, encode con optimize=True) es CPU-bound y bloquearía
+el event loop de uvicorn si se ejecutara dentro de una ruta async. Este
+módulo ofrece un executor acotado: como máximo ``max_workers`` trabajos en
+ejecución y ``max_queue`` esperando. Cuando la cola está llena se rechaza
+el trabajo inmediatamente (backpressure) en lugar de acumular memoria.
+
+``BoundedExecutor`` es la base genérica; también la usa el pool de bcrypt
+(``password_executor``).
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Type
+
+from .config import settings
+
+
+class ImageExecutorBusyError(RuntimeError):
+    """La cola del pool de imágenes está llena"""
+
+
+class BoundedExecutor:
+    """Executor acotado con métricas de cola y latencia"""
+
+    # Número de latencias recientes usadas para calcular percentiles
+    LATENCY_WINDOW = 256
+
+    # Error al rechazar un trabajo y prefijo de los hilos (por tipo de trabajo)
+    busy_error: Type[RuntimeError] = RuntimeError
+    busy_message = "El pool está saturado, reintente más tarde"
+    thread_name_prefix = "bounded"
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 8, kind: str = "process"):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.kind = kind
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+        # Métricas
+        self._pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._latencies: Deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+
+    def _get_pool(self) -> Executor:
+        """Crear el pool de forma perezosa (no en el import de la app)"""
+        if self._pool is None:
+            if self.kind == "thread":
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.thread_name_prefix,
+                )
+            else:
+                # "spawn" evita heredar locks de los hilos del servidor al hacer fork
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+        return self._pool
+
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Ejecutar ``fn(*args)`` en el pool y esperar el resultado
+
+        ``fn`` y sus argumentos deben ser serializables (funciones a nivel de
+        módulo, rutas en lugar de bytes grandes).
+
+        Raises:
+            busy_error: Si ya hay max_workers + max_queue trabajos
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise self.busy_error(self.busy_message)
+            self._pending += 1
+            self._submitted += 1
+            pool = self._get_pool()
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(pool, fn, *args)
+        except BaseException:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._latencies.append(time.perf_counter() - started)
+
+        with self._lock:
+            self._completed += 1
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot de métricas: profundidad de cola y latencia de trabajos"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            pending = self._pending
+            snapshot: Dict[str, Any] = {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": pending,
+                "queue_depth": max(0, pending - self.max_workers),
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            index = min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))
+            return round(latencies[index] * 1000, 2)
+
+        snapshot["latency_ms"] = {
+            "avg": (
+                round(sum(latencies) / len(latencies) * 1000, 2) if latencies else None
+            ),
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "max": round(latencies[-1] * 1000, 2) if latencies else None,
+        }
+        return snapshot
+
+    def shutdown(self) -> None:
+        """Cerrar el pool (los trabajos en curso terminan)"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+class ImageExecutor(BoundedExecutor):
+    """Executor del procesamiento de imágenes"""
+
+    busy_error = ImageExecutorBusyError
+    busy_message = "El procesamiento de imágenes está saturado, reintente más tarde"
+    thread_name_prefix = "image"
+
+
+_image_executor: Optional[ImageExecutor] = None
+_image_executor_lock = threading.Lock()
+
+
+def get_image_executor() -> ImageExecutor:
+    """Obtener el executor de imágenes compartido por el proceso"""
+    global _image_executor
+    with _image_executor_lock:
+        if _image_executor is None:
+            _image_executor = ImageExecutor(
+                max_workers=settings.IMAGE_WORKERS,
+                max_queue=settings.IMAGE_QUEUE_SIZE,
+                kind=settings.IMAGE_EXECUTOR,
+            )
+        return _image_executor
+
+
+def shutdown_image_executor() -> None:
+    """Cerrar el executor compartido (usado en el shutdown de la app)"""
+    global _image_executor
+    with _image_executor_lock:
+        executor, _image_executor = _image_executor, None
+    if executor is not None:
+        executor.shutdown()
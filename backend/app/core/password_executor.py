@@ -0,0 +1,56 @@
+"""
+Pool acotado para bcrypt
+
+``bcrypt.checkpw`` y ``bcrypt.hashpw`` tardan cientos de milisegundos con
+el coste por defecto. En una ruta sync ocupan durante todo ese tiempo un
+hilo del threadpool compartido de anyio, así que una ráfaga de logins deja
+sin hilos al resto de rutas sync. El login los ejecuta aquí: como máximo
+``PASSWORD_WORKERS`` a la vez y ``PASSWORD_QUEUE_SIZE`` esperando; el resto
+se rechaza al momento (503) en lugar de encolarse.
+
+bcrypt libera el GIL mientras calcula, por lo que basta con hilos.
+"""
+
+import threading
+from typing import Optional
+
+from .config import settings
+from .image_executor import BoundedExecutor
+
+
+class PasswordExecutorBusyError(RuntimeError):
+    """La cola del pool de contraseñas está llena"""
+
+
+class PasswordExecutor(BoundedExecutor):
+    """Executor de hashing y verificación de contraseñas"""
+
+    busy_error = PasswordExecutorBusyError
+    busy_message = "Demasiados inicios de sesión simultáneos, reintente más tarde"
+    thread_name_prefix = "bcrypt"
+
+
+_password_executor: Optional[PasswordExecutor] = None
+_password_executor_lock = threading.Lock()
+
+
+def get_password_executor() -> PasswordExecutor:
+    """Obtener el executor de contraseñas compartido por el proceso"""
+    global _password_executor
+    with _password_executor_lock:
+        if _password_executor is None:
+            _password_executor = PasswordExecutor(
+                max_workers=settings.PASSWORD_WORKERS,
+                max_queue=settings.PASSWORD_QUEUE_SIZE,
+                kind="thread",
+            )
+        return _password_executor
+
+
+def shutdown_password_executor() -> None:
+    """Cerrar el executor compartido (usado en el shutdown de la app)"""
+    global _password_executor
+    with _password_executor_lock:
+        executor, _password_executor = _password_executor, None
+    if executor is not None:
+        executor.shutdown()
@@ -0,0 +1,282 @@
+"""
+Caché de principals (identidad y permisos del usuario autenticado)
+
+Resolver el usuario de cada petición cargaba ``User`` con sus roles y los
+permisos de cada rol (un join cartesiano roles × permisos) en todas las
+llamadas a la API. El principal es una instantánea inmutable de lo que
+necesita la autorización (id, flags, nombres de roles y códigos de
+permiso) y se guarda por token durante ``PRINCIPAL_CACHE_TTL_SECONDS``.
+
+Los servicios que cambian algo relevante (usuarios, roles y permisos)
+invalidan las entradas afectadas explícitamente. La caché es de cada
+proceso: el TTL acota lo que tarda otro worker en ver el cambio.
+
+Los permisos efectivos de cada usuario se compilan una vez en un
+``frozenset`` de códigos más un flag de administrador y se guardan por
+``users.permissions_version``, que los servicios incrementan cuando cambian
+los roles del usuario o los permisos de sus roles. Al caducar un principal
+solo se relee el usuario; los roles y permisos se consultan de nuevo
+únicamente si su versión cambió.
+
+Con ``JWT_AUTHZ_CLAIMS`` los tokens llevan el propio principal en claims
+(``uid``, flags, roles, códigos de permiso) y la versión global de
+permisos (``pv``) con la que se emitieron. Mientras ``pv`` coincida con la
+versión vigente, que cada proceso relee como mucho cada
+``PERMISSION_STAMP_TTL_SECONDS``, el principal se obtiene del token sin
+consultar la base de datos; si no coincide se ignoran los claims.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from .config import settings
+
+# Roles con todos los permisos
+ADMIN_ROLES = frozenset({"Administrador", "Admin"})
+
+
+@dataclass(frozen=True)
+class CompiledPermissions:
+    """Permisos efectivos de los roles de un usuario"""
+
+    roles: FrozenSet[str]
+    codes: FrozenSet[str]
+    is_admin: bool  # tiene un rol de administrador
+
+
+def compile_permissions(roles: Iterable[Any]) -> CompiledPermissions:
+    """
+    Compilar los roles (con sus permisos cargados) de un usuario
+
+    Solo cuentan los permisos activos de roles activos.
+    """
+    roles = list(roles)
+    names = frozenset(role.name for role in roles)
+    return CompiledPermissions(
+        roles=names,
+        codes=frozenset(
+            permission.code
+            for role in roles
+            if role.is_active
+            for permission in role.permissions
+            if permission.is_active
+        ),
+        is_admin=bool(names & ADMIN_ROLES),
+    )
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Instantánea inmutable del usuario autenticado"""
+
+    id: int
+    username: str
+    is_active: bool
+    is_superuser: bool
+    is_admin: bool  # superusuario o rol de administrador: todos los permisos
+    roles: FrozenSet[str]
+    permissions: FrozenSet[str]
+    permissions_version: int = 0
+
+    @classmethod
+    def build(cls, user: Any, compiled: CompiledPermissions) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            is_active=bool(user.is_active),
+            is_superuser=bool(user.is_superuser),
+            is_admin=bool(user.is_superuser) or compiled.is_admin,
+            roles=compiled.roles,
+            permissions=compiled.codes,
+            permissions_version=user.permissions_version or 0,
+        )
+
+    @classmethod
+    def from_user(cls, user: Any) -> "Principal":
+        """Construir el principal de un ``User`` con roles y permisos cargados"""
+        return cls.build(user, compile_permissions(user.roles))
+
+    def has_permission(self, code: str) -> bool:
+        return self.is_admin or code in self.permissions
+
+    def claims(self) -> Dict[str, Any]:
+        """Claims de autorización para el JWT (sin ``sub`` ni ``pv``)"""
+        claims: Dict[str, Any] = {
+            "uid": self.id,
+            "act": self.is_active,
+            "su": self.is_superuser,
+            "adm": self.is_admin,
+            "roles": sorted(self.roles),
+        }
+        if not self.is_admin:
+            # Un administrador tiene todos los permisos: no hace falta listarlos
+            claims["perms"] = sorted(self.permissions)
+        return claims
+
+    @classmethod
+    def from_claims(cls, payload: Dict[str, Any]) -> Optional["Principal"]:
+        """Principal de un token con claims (None si faltan o no son válidos)"""
+        try:
+            uid, username = payload["uid"], payload["sub"]
+            flags = (payload["act"], payload["su"], payload["adm"])
+            roles, perms = payload["roles"], payload.get("perms", [])
+        except KeyError:
+            return None
+        if (
+            not isinstance(uid, int)
+            or not isinstance(username, str)
+            or not all(isinstance(flag, bool) for flag in flags)
+            or not isinstance(roles, list)
+            or not isinstance(perms, list)
+        ):
+            return None
+        return cls(
+            id=uid,
+            username=username,
+            is_active=flags[0],
+            is_superuser=flags[1],
+            is_admin=flags[2],
+            roles=frozenset(roles),
+            permissions=frozenset(perms),
+        )
+
+
+class PrincipalCache:
+    """Caché en memoria de principals por token, con TTL"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        # token -> (caduca, principal); índice user_id -> tokens
+        self._entries: Dict[str, Tuple[float, Principal]] = {}
+        self._tokens: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires, principal = entry
+            if expires <= time.monotonic():
+                self._remove(token)
+                return None
+            return principal
+
+    def put(
+        self, token: str, principal: Principal, token_exp: Optional[float] = None
+    ) -> None:
+        """
+        Guardar ``principal`` para ``token``
+
+        La entrada no dura más que el propio token (``token_exp``, timestamp
+        ``exp`` del JWT).
+        """
+        ttl = float(settings.PRINCIPAL_CACHE_TTL_SECONDS)
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._remove(token)
+            while len(self._entries) >= self.max_entries:
+                # Descartar la entrada más antigua (orden de inserción)
+                self._remove(next(iter(self._entries)))
+            self._entries[token] = (time.monotonic() + ttl, principal)
+            self._tokens.setdefault(principal.id, set()).add(token)
+
+    def discard(self, token: str) -> None:
+        """Descartar el principal de un token (revocado)"""
+        with self._lock:
+            self._remove(token)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Descartar los principals de un usuario (todos sus tokens)"""
+        self.invalidate_users([user_id])
+
+    def invalidate_users(self, user_ids: Iterable[int]) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                for token in self._tokens.pop(user_id, set()):
+                    self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens.clear()
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens.get(entry[1].id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens[entry[1].id]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CompiledPermissionCache:
+    """Permisos compilados por usuario, válidos para una versión"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: Dict[int, Tuple[int, CompiledPermissions]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, version: int) -> Optional[CompiledPermissions]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def put(self, user_id: int, version: int, compiled: CompiledPermissions) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            while len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[user_id] = (version, compiled)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PermissionStampCache:
+    """Versión global de permisos, releída como mucho cada TTL"""
+
+    def __init__(self):
+        self._version: Optional[int] = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, load: Callable[[], int]) -> int:
+        """Versión vigente (``load`` la lee de la base de datos al caducar)"""
+        with self._lock:
+            if self._version is not None and time.monotonic() < self._expires:
+                return self._version
+        version = load()
+        with self._lock:
+            self._version = version
+            self._expires = time.monotonic() + settings.PERMISSION_STAMP_TTL_SECONDS
+        return version
+
+    def expire(self) -> None:
+        """Forzar la relectura (tras cambiar la versión en este proceso)"""
+        with self._lock:
+            self._version = None
+
+
+permission_stamp = PermissionStampCache()
+compiled_permissions = CompiledPermissionCache(
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES
+)
+principal_cache = PrincipalCache(max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES)
@@ -0,0 +1,83 @@
+"""
+Limitador de frecuencia por cliente (token bucket en memoria)
+
+Cada cliente (normalmente la IP) tiene un cubo de ``burst`` fichas que se
+rellena a ``per_minute`` fichas por minuto; cada operación limitada gasta
+una. El estado es de cada proceso y el número de clientes está acotado
+(se olvidan los menos recientes), así que un atacante con muchas IPs no
+hace crecer la memoria.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from .config import settings
+
+
+class RateLimitExceeded(RuntimeError):
+    """El cliente superó su frecuencia permitida"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Token bucket por cliente"""
+
+    def __init__(self, per_minute: int, burst: int, max_clients: int = 10000):
+        self.per_minute = per_minute
+        self.burst = burst
+        self.max_clients = max_clients
+        # cliente -> (fichas, último relleno), del menos al más reciente
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.limited = 0
+
+    def hit(self, client: str) -> None:
+        """
+        Gastar una ficha de ``client``
+
+        Con ``per_minute <= 0`` no se limita nada.
+
+        Raises:
+            RateLimitExceeded: Si el cubo del cliente está vacío
+        """
+        if self.per_minute <= 0:
+            return
+        rate = self.per_minute / 60.0
+        capacity = float(max(1, self.burst))
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[client] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            if not allowed:
+                self.limited += 1
+        if not allowed:
+            raise RateLimitExceeded(
+                "Demasiadas peticiones, reintente más tarde",
+                retry_after=math.ceil((1 - tokens) / rate),
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+# Variantes de /api/images que no están en caché (cada una cuesta CPU del
+# pool de imágenes y espacio en la caché)
+variant_miss_limiter = RateLimiter(
+    per_minute=settings.IMAGE_VARIANT_MISSES_PER_MINUTE,
+    burst=settings.IMAGE_VARIANT_MISS_BURST,
+)
@@ -1,10 +1,15 @@
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 
 import bcrypt
 from jose import JWTError, jwt
+from sqlalchemy.orm import Session
 
 from .config import settings
+from .database import SessionLocal
+from .password_executor import get_password_executor
+from .token_revocation import revocation_list
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -16,11 +21,41 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     """Hash a password using bcrypt."""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
     return hashed.decode("utf-8")
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a bcrypt hash was made with a cost other than BCRYPT_ROUNDS."""
+    # Format: $2b$<cost>$<salt and hash>
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return False
+    return rounds != settings.BCRYPT_ROUNDS
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    verify_password on the bounded password executor.
+
+    Raises PasswordExecutorBusyError if the executor queue is full.
+    """
+    return await get_password_executor().submit(
+        verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    get_password_hash on the bounded password executor.
+
+    Raises PasswordExecutorBusyError if the executor queue is full.
+    """
+    return await get_password_executor().submit(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -28,17 +63,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
+    # Token id, needed to revoke it (logout)
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> Optional[dict]:
+def decode_access_token(token: str, db: Optional[Session] = None) -> Optional[dict]:
+    """
+    Decode and verify a token; None if it is invalid, expired or revoked.
+
+    ``db`` is used for the exact revocation lookup, which only runs when
+    the in-memory Bloom filter reports a possible match.
+    """
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        return payload
     except JWTError:
         return None
+
+    jti = payload.get("jti")
+    if jti is not None:
+        if db is None:
+            with SessionLocal() as session:
+                revoked = revocation_list.is_revoked(session, jti)
+        else:
+            revoked = revocation_list.is_revoked(db, jti)
+        if revoked:
+            return None
+    return payload
@@ -0,0 +1,417 @@
+"""
+Backends de almacenamiento para archivos subidos
+
+Las claves son rutas relativas con "/" (``hero/<hash>.jpg``), las mismas que
+se guardan en ``UploadedFile.file_path``. ``UploadService``, el avatar del
+perfil y el borrado permanente trabajan solo con esta interfaz, de modo que
+varios nodos de la API pueden compartir un bucket S3-compatible en lugar de
+un disco local.
+"""
+
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlparse
+
+import anyio
+
+from .config import settings
+
+# Tamaño de bloque por defecto al leer en streaming
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class StorageBackend(ABC):
+    """Interfaz común: put/get/stream/delete/exists/url"""
+
+    @abstractmethod
+    async def put(
+        self, key: str, data: bytes, content_type: Optional[str] = None
+    ) -> None:
+        """Guardar bytes en ``key`` (sobrescribe)"""
+
+    @abstractmethod
+    async def put_file(
+        self, key: str, path: Path, content_type: Optional[str] = None
+    ) -> None:
+        """
+        Guardar un archivo local en ``key``
+
+        El archivo de origen se consume: puede moverse o eliminarse.
+        """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        """Leer el contenido completo de ``key``"""
+
+    @abstractmethod
+    def stream(
+        self,
+        key: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        """Leer ``key`` por bloques, opcionalmente el rango [start, end]"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Eliminar ``key`` (no falla si no existe)"""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Indicar si ``key`` existe"""
+
+    @abstractmethod
+    async def size(self, key: str) -> Optional[int]:
+        """Tamaño en bytes de ``key`` o None si no existe"""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        """URL pública de ``key``"""
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """Ruta en disco si el backend es local (None en almacenamiento remoto)"""
+        return None
+
+    def presign_upload(
+        self, key: str, content_type: str, size: int, expires: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Destino firmado para que el cliente suba ``key`` sin pasar por la API
+
+        Retorna ``{"method", "url", "fields", "headers"}`` válido durante
+        ``expires`` segundos, o None si el backend no admite subidas directas.
+        """
+        return None
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        """Obtener la clave a partir de una URL generada por ``url``"""
+        prefix = self.url("")
+        if url.startswith(prefix):
+            return url[len(prefix) :] or None
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """Almacenamiento en el sistema de archivos local (servido en /uploads)"""
+
+    def __init__(self, base_dir: str, base_url: str = "/uploads"):
+        self.base_dir = Path(base_dir)
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, key: str) -> Path:
+        path = (self.base_dir / key).resolve()
+        if not path.is_relative_to(self.base_dir.resolve()):
+            raise ValueError(f"Clave de almacenamiento inválida: {key}")
+        return path
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self._path(key)
+
+    async def put(
+        self, key: str, data: bytes, content_type: Optional[str] = None
+    ) -> None:
+        path = self._path(key)
+
+        def write() -> None:
+            # Escritura atómica: temporal en el mismo directorio + rename
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(dir=path.parent, suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_name, path)
+            except BaseException:
+                Path(temp_name).unlink(missing_ok=True)
+                raise
+
+        await anyio.to_thread.run_sync(write)
+
+    async def put_file(
+        self, key: str, path: Path, content_type: Optional[str] = None
+    ) -> None:
+        target = self._path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            # Mismo sistema de archivos: rename atómico
+            os.replace(path, target)
+        except OSError:
+            await anyio.to_thread.run_sync(shutil.move, str(path), str(target))
+
+    async def get(self, key: str) -> bytes:
+        return await anyio.to_thread.run_sync(self._path(key).read_bytes)
+
+    async def stream(
+        self,
+        key: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        path = self._path(key)
+        f = await anyio.to_thread.run_sync(open, path, "rb")
+        try:
+            await anyio.to_thread.run_sync(f.seek, start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = chunk_size if remaining is None else min(chunk_size, remaining)
+                chunk = await anyio.to_thread.run_sync(f.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
+
+    async def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    async def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    async def size(self, key: str) -> Optional[int]:
+        path = self._path(key)
+        return path.stat().st_size if path.is_file() else None
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+class S3Storage(StorageBackend):
+    """
+    Almacenamiento S3-compatible (AWS S3, MinIO, R2...)
+
+    Requiere ``boto3`` (dependencia opcional). Las llamadas bloqueantes de
+    boto3 se ejecutan en hilos; los archivos grandes se suben en multipart
+    con varias partes en paralelo y memoria acotada a
+    ``S3_MULTIPART_CONCURRENCY * S3_MULTIPART_CHUNK_SIZE``.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        region: Optional[str] = None,
+        public_url: Optional[str] = None,
+        multipart_threshold: int = 8 * 1024 * 1024,
+        multipart_chunk_size: int = 8 * 1024 * 1024,
+        multipart_concurrency: int = 4,
+    ):
+        try:
+            import boto3
+        except ImportError as e:  # pragma: no cover - depende del entorno
+            raise RuntimeError(
+                "STORAGE_BACKEND=s3 requiere boto3 (pip install boto3)"
+            ) from e
+
+        self.bucket = bucket
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            region_name=region,
+        )
+        base = public_url or f"{(endpoint_url or '').rstrip('/')}/{bucket}"
+        self.public_url = base.rstrip("/")
+        self.multipart_threshold = multipart_threshold
+        # S3 exige partes de al menos 5MB (salvo la última)
+        self.multipart_chunk_size = max(multipart_chunk_size, 5 * 1024 * 1024)
+        self.multipart_concurrency = max(1, multipart_concurrency)
+
+    def _extra(self, content_type: Optional[str]) -> dict:
+        return {"ContentType": content_type} if content_type else {}
+
+    async def put(
+        self, key: str, data: bytes, content_type: Optional[str] = None
+    ) -> None:
+        await anyio.to_thread.run_sync(
+            lambda: self.client.put_object(
+                Bucket=self.bucket, Key=key, Body=data, **self._extra(content_type)
+            )
+        )
+
+    async def put_file(
+        self, key: str, path: Path, content_type: Optional[str] = None
+    ) -> None:
+        try:
+            if path.stat().st_size <= self.multipart_threshold:
+                await self.put(key, path.read_bytes(), content_type)
+            else:
+                await self._put_multipart(key, path, content_type)
+        finally:
+            path.unlink(missing_ok=True)
+
+    async def _put_multipart(
+        self, key: str, path: Path, content_type: Optional[str]
+    ) -> None:
+        """Subida multipart con partes en paralelo y memoria acotada"""
+        upload = await anyio.to_thread.run_sync(
+            lambda: self.client.create_multipart_upload(
+                Bucket=self.bucket, Key=key, **self._extra(content_type)
+            )
+        )
+        upload_id = upload["UploadId"]
+        file_size = path.stat().st_size
+        part_count = -(-file_size // self.multipart_chunk_size)
+        parts: dict = {}
+        limiter = anyio.CapacityLimiter(self.multipart_concurrency)
+
+        async def upload_part(part_number: int) -> None:
+            async with limiter:
+
+                def send() -> str:
+                    with open(path, "rb") as f:
+                        f.seek((part_number - 1) * self.multipart_chunk_size)
+                        body = f.read(self.multipart_chunk_size)
+                    response = self.client.upload_part(
+                        Bucket=self.bucket,
+                        Key=key,
+                        UploadId=upload_id,
+                        PartNumber=part_number,
+                        Body=body,
+                    )
+                    return response["ETag"]
+
+                parts[part_number] = await anyio.to_thread.run_sync(send)
+
+        try:
+            async with anyio.create_task_group() as tg:
+                for part_number in range(1, part_count + 1):
+                    tg.start_soon(upload_part, part_number)
+
+            await anyio.to_thread.run_sync(
+                lambda: self.client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    MultipartUpload={
+                        "Parts": [
+                            {"PartNumber": n, "ETag": parts[n]} for n in sorted(parts)
+                        ]
+                    },
+                )
+            )
+        except BaseException:
+            await anyio.to_thread.run_sync(
+                lambda: self.client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id
+                )
+            )
+            raise
+
+    async def get(self, key: str) -> bytes:
+        def read() -> bytes:
+            response = self.client.get_object(Bucket=self.bucket, Key=key)
+            return response["Body"].read()
+
+        return await anyio.to_thread.run_sync(read)
+
+    async def stream(
+        self,
+        key: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[bytes]:
+        byte_range = f"bytes={start}-{'' if end is None else end}"
+        response = await anyio.to_thread.run_sync(
+            lambda: self.client.get_object(
+                Bucket=self.bucket, Key=key, Range=byte_range
+            )
+        )
+        body = response["Body"]
+        try:
+            while chunk := await anyio.to_thread.run_sync(body.read, chunk_size):
+                yield chunk
+        finally:
+            body.close()
+
+    async def delete(self, key: str) -> None:
+        await anyio.to_thread.run_sync(
+            lambda: self.client.delete_object(Bucket=self.bucket, Key=key)
+        )
+
+    async def exists(self, key: str) -> bool:
+        return await self.size(key) is not None
+
+    async def size(self, key: str) -> Optional[int]:
+        from botocore.exceptions import ClientError
+
+        try:
+            response = await anyio.to_thread.run_sync(
+                lambda: self.client.head_object(Bucket=self.bucket, Key=key)
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return None
+            raise
+        return int(response["ContentLength"])
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    def presign_upload(
+        self, key: str, content_type: str, size: int, expires: int
+    ) -> Optional[Dict[str, Any]]:
+        # POST firmado en lugar de PUT: la política fija el tipo y el tamaño
+        # exacto, y S3 rechaza cualquier otro cuerpo sin tocar la API
+        post = self.client.generate_presigned_post(
+            Bucket=self.bucket,
+            Key=key,
+            Fields={"Content-Type": content_type},
+            Conditions=[
+                {"Content-Type": content_type},
+                ["content-length-range", size, size],
+            ],
+            ExpiresIn=expires,
+        )
+        return {
+            "method": "POST",
+            "url": post["url"],
+            "fields": post["fields"],
+            "headers": {},
+        }
+
+
+@lru_cache(maxsize=8)
+def _build_storage(backend: str, upload_dir: str, bucket: str) -> StorageBackend:
+    if backend == "s3":
+        return S3Storage(
+            bucket=bucket,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            access_key=settings.S3_ACCESS_KEY,
+            secret_key=settings.S3_SECRET_KEY,
+            region=settings.S3_REGION,
+            public_url=settings.S3_PUBLIC_URL,
+        )
+    if backend == "local":
+        return LocalStorage(upload_dir)
+    raise ValueError(f"STORAGE_BACKEND no soportado: {backend}")
+
+
+def get_storage() -> StorageBackend:
+    """Obtener el backend de almacenamiento configurado"""
+    return _build_storage(
+        settings.STORAGE_BACKEND, settings.UPLOAD_DIR, settings.S3_BUCKET
+    )
+
+
+def key_for_url(url: str) -> Optional[str]:
+    """
+    Clave de almacenamiento de una URL guardada en el contenido
+
+    Ignora query y fragmento (``?v=2``) y acepta URLs locales absolutas
+    (``http://host/uploads/...``). None si la URL es externa.
+    """
+    storage = get_storage()
+    url = url.split("#", 1)[0].split("?", 1)[0]
+    return storage.key_from_url(url) or storage.key_from_url(urlparse(url).path)
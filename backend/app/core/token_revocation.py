@@ -0,0 +1,168 @@
+"""
+Lista de tokens revocados con filtro de Bloom
+
+Los tokens revocados (logout) se guardan en ``revoked_tokens`` por su claim
+``jti`` hasta que caducan. Cada proceso mantiene un filtro de Bloom con los
+``jti`` vigentes de la tabla, reconstruido como mucho cada
+``TOKEN_REVOCATION_REFRESH_SECONDS``: la comprobación de cada petición es
+una consulta al filtro en memoria y solo un positivo (revocado o falso
+positivo, ``TOKEN_REVOCATION_ERROR_RATE``) consulta la base de datos.
+
+Las revocaciones hechas en este proceso entran en el filtro al momento; las
+de otros workers, en la siguiente reconstrucción.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+
+
+class BloomFilter:
+    """Filtro de Bloom de cadenas (sin falsos negativos)"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterator[int]:
+        # Doble hashing: h1 + i * h2 con las dos mitades de un solo digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class TokenRevocationList:
+    """Tokens revocados: filtro de Bloom en memoria y tabla en la base de datos"""
+
+    def __init__(self):
+        self._bloom: Optional[BloomFilter] = None
+        self._loaded_at = 0.0
+        # jti revocados en este proceso -> momento (monotonic) de la revocación
+        self._local: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.probes = 0
+        self.positives = 0
+        self.false_positives = 0
+
+    def is_revoked(self, db: Session, jti: str) -> bool:
+        """Comprobar ``jti``: filtro en memoria y, si da positivo, la tabla"""
+        from app.models.revoked_token import RevokedToken
+
+        bloom = self._current(db)
+        self.probes += 1
+        if jti not in bloom:
+            return False
+
+        self.positives += 1
+        revoked = (
+            db.query(RevokedToken.jti).filter(RevokedToken.jti == jti).first()
+            is not None
+        )
+        if not revoked:
+            self.false_positives += 1
+        return revoked
+
+    def revoke(
+        self,
+        db: Session,
+        jti: str,
+        expires_at: datetime,
+        user_id: Optional[int] = None,
+    ) -> None:
+        """Revocar ``jti`` hasta ``expires_at`` (y purgar las filas caducadas)"""
+        from app.models.revoked_token import RevokedToken
+
+        now = datetime.now(timezone.utc)
+        db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(
+            synchronize_session=False
+        )
+        db.merge(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+        db.commit()
+
+        with self._lock:
+            self._local[jti] = time.monotonic()
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def refresh(self, db: Session) -> BloomFilter:
+        """Reconstruir el filtro con los ``jti`` no caducados de la tabla"""
+        from app.models.revoked_token import RevokedToken
+
+        started = time.monotonic()
+        jtis = [
+            row[0]
+            for row in db.query(RevokedToken.jti).filter(
+                RevokedToken.expires_at > datetime.now(timezone.utc)
+            )
+        ]
+        bloom = BloomFilter(
+            max(settings.TOKEN_REVOCATION_CAPACITY, 2 * len(jtis)),
+            settings.TOKEN_REVOCATION_ERROR_RATE,
+        )
+        for jti in jtis:
+            bloom.add(jti)
+
+        with self._lock:
+            # Revocaciones locales que la consulta pudo no ver todavía
+            for jti in self._local:
+                bloom.add(jti)
+            self._local = {
+                jti: revoked_at
+                for jti, revoked_at in self._local.items()
+                if revoked_at >= started
+            }
+            self._bloom = bloom
+            self._loaded_at = started
+        return bloom
+
+    def _current(self, db: Session) -> BloomFilter:
+        bloom = self._bloom
+        if (
+            bloom is None
+            or time.monotonic() - self._loaded_at
+            >= settings.TOKEN_REVOCATION_REFRESH_SECONDS
+        ):
+            return self.refresh(db)
+        return bloom
+
+    def reset(self) -> None:
+        """Olvidar el filtro (se reconstruye en la siguiente comprobación)"""
+        with self._lock:
+            self._bloom = None
+            self._local.clear()
+
+    def metrics(self) -> Dict[str, int]:
+        bloom = self._bloom
+        return {
+            "revoked": bloom.count if bloom else 0,
+            "probes": self.probes,
+            "positives": self.positives,
+            "false_positives": self.false_positives,
+        }
+
+
+revocation_list = TokenRevocationList()
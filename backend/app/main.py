@@ -2,7 +2,6 @@ from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
 from .api.routes import (
     audit_logs,
@@ -10,6 +9,8 @@ from .api.routes import (
     cms_pages,
     contact,
     hero_images,
+    images,
+    media,
     permissions,
     profile,
     projects,
@@ -20,7 +21,11 @@ from .api.routes import (
     uploads,
     users,
 )
+from .core.body_limit import BodySizeLimitMiddleware
+from .core.config import settings
 from .core.database import Base, engine
+from .core.image_executor import shutdown_image_executor
+from .core.password_executor import shutdown_password_executor
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -31,6 +36,10 @@ app = FastAPI(
     version="2.0.0",
 )
 
+# Reject oversized request bodies before they are parsed. Added before CORS
+# so that 413 responses still carry the CORS headers.
+app.add_middleware(BodySizeLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -61,6 +70,13 @@ app.include_router(
 )
 app.include_router(hero_images.router, prefix="/api/hero-images", tags=["Hero Images"])
 app.include_router(uploads.router, prefix="/api/uploads", tags=["Uploads"])
+app.include_router(images.router, prefix="/api/images", tags=["Images"])
+
+
+@app.on_event("shutdown")
+def shutdown_executors():
+    shutdown_image_executor()
+    shutdown_password_executor()
 
 
 @app.get("/")
@@ -72,12 +88,14 @@ def root():
     }
 
 
-# Create uploads directory structure if it doesn't exist
-uploads_dir = Path("uploads")
-uploads_dir.mkdir(exist_ok=True)
-(uploads_dir / "hero").mkdir(exist_ok=True)
-(uploads_dir / "services").mkdir(exist_ok=True)
-(uploads_dir / "projects").mkdir(exist_ok=True)
+# Local storage: create the uploads directory structure if it doesn't exist
+if settings.STORAGE_BACKEND == "local":
+    uploads_dir = Path(settings.UPLOAD_DIR)
+    uploads_dir.mkdir(exist_ok=True)
+    (uploads_dir / "hero").mkdir(exist_ok=True)
+    (uploads_dir / "services").mkdir(exist_ok=True)
+    (uploads_dir / "projects").mkdir(exist_ok=True)
 
-# Mount static files AFTER all routers to avoid conflicts
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Uploaded media (immutable caching, ETags, byte ranges). Registered AFTER all
+# routers; with S3 storage it redirects to the bucket/CDN URL.
+app.include_router(media.router, prefix="/uploads", tags=["Media"])
@@ -2,13 +2,20 @@ from .audit_log import AuditLog
 from .cms_page import CMSPage
 from .contact_lead import ContactLead, LeadStatus
 from .hero_image import HeroImage
+from .image_rendition import ImageRendition
+from .media_reference import MediaReference, register_reference_listeners
 from .permission import Permission
+from .permission_stamp import PermissionStamp
 from .project import Project
+from .rendition_job import RenditionJob
+from .revoked_token import RevokedToken
 from .role import Role
 from .role_permission import role_permissions
 from .service import Service
 from .site_config import SiteConfig
+from .storage_usage import StorageUsage, register_usage_listeners
 from .testimonial import Testimonial
+from .upload_session import UploadSession
 from .uploaded_file import UploadedFile
 from .user import User
 from .user_role import user_roles
@@ -17,6 +24,7 @@ __all__ = [
     "User",
     "Role",
     "Permission",
+    "PermissionStamp",
     "user_roles",
     "role_permissions",
     "AuditLog",
@@ -29,4 +37,13 @@ __all__ = [
     "SiteConfig",
     "HeroImage",
     "UploadedFile",
+    "ImageRendition",
+    "RenditionJob",
+    "RevokedToken",
+    "UploadSession",
+    "MediaReference",
+    "StorageUsage",
 ]
+
+register_reference_listeners()
+register_usage_listeners()
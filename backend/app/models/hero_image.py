@@ -2,11 +2,15 @@
 Modelo para imágenes del Hero/Galería de la página principal
 """
 
+from typing import Optional
+
 from sqlalchemy import Boolean, Column, Integer, String, Text
+from sqlalchemy.orm import object_session
 from sqlalchemy.sql import func
 from sqlalchemy.types import DateTime
 
 from app.core.database import Base
+from app.models.uploaded_file import UploadedFile, files_by_url
 
 
 class HeroImage(Base):
@@ -22,5 +26,17 @@ class HeroImage(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    @property
+    def image(self) -> Optional[UploadedFile]:
+        """
+        Archivo subido de ``image_url`` (dimensiones y placeholders) o None
+        si es una URL externa
+        """
+        session = object_session(self)
+        if not self.image_url or session is None:
+            return None
+        url = str(self.image_url)
+        return files_by_url(session, [url], file_type="image").get(url)
+
     def __repr__(self):
         return f"<HeroImage(title='{self.title}', order={self.order})>"
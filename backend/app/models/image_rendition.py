@@ -0,0 +1,33 @@
+"""
+Modelo para renditions responsive de imágenes subidas
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class ImageRendition(Base):
+    __tablename__ = "image_renditions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    uploaded_file_id = Column(
+        Integer,
+        ForeignKey("uploaded_files.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    format = Column(String(10), nullable=False)  # jpeg, png, webp, avif
+    mime_type = Column(String(100), nullable=False)
+    file_path = Column(String(500), nullable=False, unique=True)
+    file_size = Column(BigInteger, nullable=False)  # bytes
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    uploaded_file = relationship("UploadedFile", back_populates="renditions")
+
+    def __repr__(self):
+        return f"<ImageRendition(file_path='{self.file_path}', width={self.width})>"
@@ -0,0 +1,241 @@
+"""
+Índice de referencias a archivos subidos
+
+Los modelos de contenido guardan las imágenes como URLs (``featured_image``,
+``gallery``, URLs dentro del HTML o del JSON de las páginas...). Esta tabla
+registra qué clave de almacenamiento usa cada campo de cada registro, de
+modo que el recolector de huérfanos puede saber con una consulta qué
+``UploadedFile`` ya no se usa en ninguna parte.
+
+El índice se mantiene con eventos de mapper al insertar, actualizar o
+borrar los modelos de ``tracked_fields()``. Las escrituras masivas que no
+pasan por el ORM (``query.update``, SQL directo) no disparan eventos: en
+ese caso hay que reconstruirlo (``MediaGCService.rebuild_index``).
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    String,
+    event,
+    inspect,
+    select,
+    update,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+from app.core.storage import key_for_url
+
+
+class MediaReference(Base):
+    __tablename__ = "media_references"
+
+    id = Column(Integer, primary_key=True, index=True)
+    file_path = Column(String(500), nullable=False, index=True)  # clave en storage
+    owner_type = Column(String(50), nullable=False)  # tabla del registro
+    owner_id = Column(Integer, nullable=False)
+    field = Column(String(50), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (Index("ix_media_references_owner", "owner_type", "owner_id"),)
+
+    def __repr__(self):
+        return (
+            f"<MediaReference({self.owner_type}#{self.owner_id}.{self.field} "
+            f"-> '{self.file_path}')>"
+        )
+
+
+# Variantes bajo demanda: /api/images/{id}?w=...
+IMAGE_VARIANT_RE = re.compile(r"/api/images/(\d+)(?:$|[/?])")
+
+
+def _url_key(url: str, connection: Connection) -> Optional[str]:
+    """Clave de almacenamiento de una URL (None si es externa)"""
+    match = IMAGE_VARIANT_RE.search(url)
+    if match:
+        from app.models.uploaded_file import UploadedFile
+
+        return connection.execute(
+            select(UploadedFile.file_path).where(UploadedFile.id == int(match.group(1)))
+        ).scalar()
+
+    return key_for_url(url)
+
+
+# URLs embebidas en texto libre (HTML/markdown de páginas del CMS)
+EMBEDDED_URL_RE = re.compile(r"""(?:https?://|/)[^\s"'<>()]+""")
+
+
+def _iter_urls(value: Any) -> Iterator[str]:
+    """URLs candidatas de un valor de columna (texto, lista o JSON anidado)"""
+    if isinstance(value, str):
+        if any(c.isspace() for c in value) or "<" in value:
+            for url in EMBEDDED_URL_RE.findall(value):
+                # Puntuación de la frase pegada al final de la URL
+                yield url.rstrip(".,;:!")
+        elif value:
+            yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _iter_urls(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_urls(item)
+
+
+def reference_rows(
+    target: Any, fields: Tuple[str, ...], connection: Connection
+) -> List[Dict[str, Any]]:
+    """Filas de ``media_references`` para los campos de ``target``"""
+    rows = []
+    for field in fields:
+        keys: Set[str] = set()
+        for url in _iter_urls(getattr(target, field)):
+            key = _url_key(url, connection)
+            if key:
+                keys.add(key)
+        rows.extend(
+            {
+                "file_path": key,
+                "owner_type": target.__tablename__,
+                "owner_id": target.id,
+                "field": field,
+            }
+            for key in sorted(keys)
+        )
+    return rows
+
+
+def _delete_references(connection: Connection, target: Any) -> None:
+    table = MediaReference.__table__
+    connection.execute(
+        table.delete().where(
+            table.c.owner_type == target.__tablename__,
+            table.c.owner_id == target.id,
+        )
+    )
+
+
+def _sync_references(
+    connection: Connection, target: Any, fields: Tuple[str, ...]
+) -> None:
+    """Reemplazar las referencias de ``target`` por las actuales"""
+    _delete_references(connection, target)
+    rows = reference_rows(target, fields, connection)
+    if rows:
+        connection.execute(MediaReference.__table__.insert(), rows)
+
+
+@lru_cache(maxsize=1)
+def tracked_fields() -> Dict[type, Tuple[str, ...]]:
+    """Modelos y campos con URLs de archivos subidos"""
+    from app.models.cms_page import CMSPage
+    from app.models.hero_image import HeroImage
+    from app.models.project import Project
+    from app.models.service import Service
+    from app.models.site_config import SiteConfig
+    from app.models.testimonial import Testimonial
+    from app.models.user import User
+
+    return {
+        Project: ("featured_image", "gallery", "video_url"),
+        Service: ("image", "gallery"),
+        HeroImage: ("image_url",),
+        CMSPage: ("og_image", "content", "sections"),
+        SiteConfig: ("logo", "logo_dark", "favicon", "default_og_image"),
+        Testimonial: ("client_photo",),
+        User: ("avatar_url",),
+    }
+
+
+def _replace_key(value: Any, old_key: str, new_key: str) -> Any:
+    """Copia de ``value`` con ``old_key`` sustituida dentro de sus URLs"""
+    if isinstance(value, str):
+        return value.replace(old_key, new_key)
+    if isinstance(value, dict):
+        return {k: _replace_key(v, old_key, new_key) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_replace_key(item, old_key, new_key) for item in value]
+    return value
+
+
+def rewrite_references(session: Session, old_key: str, new_key: str) -> int:
+    """
+    Apuntar a ``new_key`` todo el contenido que referencia ``old_key``
+
+    Reescribe los campos indexados (la URL contiene la clave tal cual) y
+    después el propio índice, que también cubre las referencias por ID
+    (``/api/images/{id}``). No confirma la transacción.
+
+    Returns:
+        int: Número de registros de contenido modificados
+    """
+    models = {model.__tablename__: model for model in tracked_fields()}
+    references = session.execute(
+        select(
+            MediaReference.owner_type, MediaReference.owner_id, MediaReference.field
+        ).where(MediaReference.file_path == old_key)
+    ).all()
+
+    owners = set()
+    for owner_type, owner_id, field in references:
+        owner = session.get(models[owner_type], owner_id)
+        if owner is None:
+            continue
+        value = getattr(owner, field)
+        # Valor nuevo (no mutado en sitio) para que el ORM detecte el cambio
+        rewritten = _replace_key(value, old_key, new_key)
+        if rewritten != value:
+            setattr(owner, field, rewritten)
+            owners.add((owner_type, owner_id))
+
+    session.flush()
+    session.execute(
+        update(MediaReference)
+        .where(MediaReference.file_path == old_key)
+        .values(file_path=new_key)
+    )
+    return len(owners)
+
+
+def register_reference_listeners() -> None:
+    """Mantener el índice al escribir los modelos de ``tracked_fields``"""
+    for model, fields in tracked_fields().items():
+        if event.contains(model, "after_insert", _on_insert):
+            continue
+        event.listen(model, "after_insert", _on_insert)
+        event.listen(model, "after_update", _on_update)
+        event.listen(model, "after_delete", _on_delete)
+
+
+def _fields_for(target: Any) -> Tuple[str, ...]:
+    for model, fields in tracked_fields().items():
+        if isinstance(target, model):
+            return fields
+    return ()
+
+
+def _on_insert(mapper, connection: Connection, target: Any) -> None:
+    _sync_references(connection, target, _fields_for(target))
+
+
+def _on_update(mapper, connection: Connection, target: Any) -> None:
+    fields = _fields_for(target)
+    # Solo si cambió algún campo con URLs (el resto de updates no cuesta nada)
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in fields):
+        _sync_references(connection, target, fields)
+
+
+def _on_delete(mapper, connection: Connection, target: Any) -> None:
+    _delete_references(connection, target)
@@ -0,0 +1,29 @@
+"""
+Versión global de permisos
+
+Una sola fila (``id = 1``) cuyo ``version`` se incrementa con cualquier
+cambio que afecte a lo que un usuario puede hacer (roles, permisos, flags o
+borrado). Los tokens con claims de autorización llevan la versión con la
+que se emitieron: si ya no coincide, los claims se ignoran y se consulta la
+base de datos.
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer
+from sqlalchemy.sql import func
+
+from ..core.database import Base
+
+
+class PermissionStamp(Base):
+    __tablename__ = "permission_stamp"
+
+    ROW_ID = 1
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return f"<PermissionStamp(version={self.version})>"
@@ -1,3 +1,5 @@
+from typing import Dict, Optional
+
 from sqlalchemy import (
     JSON,
     Boolean,
@@ -9,9 +11,11 @@ from sqlalchemy import (
     String,
     Text,
 )
+from sqlalchemy.orm import object_session
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.models.uploaded_file import UploadedFile, files_by_url
 
 
 class Project(Base):
@@ -56,5 +60,31 @@ class Project(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    @property
+    def video(self) -> Optional[UploadedFile]:
+        """
+        Archivo subido al que apunta ``video_url`` (con duración, tamaño y
+        códec) o None si es un vídeo externo (YouTube, Vimeo...)
+        """
+        session = object_session(self)
+        if not self.video_url or session is None:
+            return None
+        url = str(self.video_url)
+        return files_by_url(session, [url], file_type="video").get(url)
+
+    @property
+    def images(self) -> Dict[str, UploadedFile]:
+        """
+        Archivos subidos de ``featured_image`` y ``gallery`` por URL
+
+        Incluye dimensiones y placeholders para maquetar sin descargar las
+        imágenes. Las URLs externas no aparecen.
+        """
+        session = object_session(self)
+        if session is None:
+            return {}
+        urls = [self.featured_image, *(self.gallery or [])]
+        return files_by_url(session, urls, file_type="image")
+
     def __repr__(self):
         return f"<Project {self.title}>"
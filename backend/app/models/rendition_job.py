@@ -0,0 +1,39 @@
+"""
+Modelo para trabajos de re-render masivo de imágenes
+"""
+
+from sqlalchemy import JSON, Column, DateTime, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class RenditionJob(Base):
+    __tablename__ = "rendition_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    folder = Column(String(100), nullable=False)
+    spec = Column(JSON, nullable=False)  # {size, widths, formats}
+    spec_version = Column(String(8), nullable=False)
+    # pending, running, completed, failed
+    status = Column(String(20), nullable=False, default="pending")
+    total = Column(Integer, nullable=False, default=0)  # archivos a procesar
+    processed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    # Checkpoint: último UploadedFile.id confirmado (se reanuda desde aquí)
+    last_file_id = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    # Lease del ejecutor: se renueva en cada lote; sin renovar durante
+    # RERENDER_LEASE_SECONDS el trabajo se considera abandonado
+    runner_id = Column(String(32), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    started_by = Column(Integer, nullable=True)  # user_id
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return (
+            f"<RenditionJob(id={self.id}, folder='{self.folder}', "
+            f"status='{self.status}', {self.processed}/{self.total})>"
+        )
@@ -0,0 +1,23 @@
+"""
+Tokens de acceso revocados (logout)
+
+Se identifican por el claim ``jti``. Las filas solo hacen falta hasta que
+el token caduca (``expires_at``); después se purgan.
+"""
+
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from ..core.database import Base
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    user_id = Column(Integer, nullable=True, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<RevokedToken({self.jti}, user={self.user_id})>"
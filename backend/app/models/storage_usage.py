@@ -0,0 +1,208 @@
+"""
+Contadores de uso de almacenamiento por folder, usuario y tipo
+
+Cada fila acumula los archivos activos y los bytes que ocupan (archivo
+principal, renditions y miniatura; los originales se comparten entre
+folders y no se cuentan) para una combinación ``(folder, user_id, file_type)``. Las
+consultas por folder o por usuario suman unas pocas filas en lugar de
+recorrer ``uploaded_files`` o el disco.
+
+Los contadores se mantienen con eventos de mapper de ``UploadedFile`` en
+la misma transacción que el registro: subir, reactivar un duplicado,
+borrar (soft o permanente), el GC y el re-render los actualizan sin
+código adicional. Las escrituras masivas fuera del ORM no disparan
+eventos; en ese caso se recalculan con ``StorageUsageService.rebuild``.
+"""
+
+from typing import Any, Optional, Tuple
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Integer,
+    String,
+    UniqueConstraint,
+    event,
+    func,
+    inspect,
+    select,
+    update,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm.base import NO_VALUE
+
+from app.core.database import Base
+
+
+class StorageUsage(Base):
+    __tablename__ = "storage_usage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    folder = Column(String(100), nullable=False)
+    user_id = Column(Integer, nullable=False, default=0)  # 0 = sin usuario
+    file_type = Column(String(50), nullable=False)
+    file_count = Column(BigInteger, nullable=False, default=0)
+    total_bytes = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        UniqueConstraint("folder", "user_id", "file_type", name="uq_storage_usage"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<StorageUsage({self.folder}/{self.user_id}/{self.file_type}: "
+            f"{self.file_count} archivos, {self.total_bytes} bytes)>"
+        )
+
+
+# (folder, user_id, file_type)
+UsageKey = Tuple[str, int, str]
+
+
+def _add_usage(connection: Connection, key: UsageKey, files: int, size: int) -> None:
+    """Sumar ``files`` y ``size`` (pueden ser negativos) al contador de ``key``"""
+    folder, user_id, file_type = key
+    table = StorageUsage.__table__
+    values = {
+        "folder": folder,
+        "user_id": user_id,
+        "file_type": file_type,
+        "file_count": files,
+        "total_bytes": size,
+    }
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        # Upsert atómico: dos primeras subidas concurrentes no chocan
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        statement = insert(table).values(**values)
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=["folder", "user_id", "file_type"],
+                set_={
+                    "file_count": table.c.file_count + files,
+                    "total_bytes": table.c.total_bytes + size,
+                    "updated_at": func.now(),
+                },
+            )
+        )
+        return
+
+    result = connection.execute(
+        update(table)
+        .where(
+            table.c.folder == folder,
+            table.c.user_id == user_id,
+            table.c.file_type == file_type,
+        )
+        .values(
+            file_count=table.c.file_count + files,
+            total_bytes=table.c.total_bytes + size,
+        )
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(**values))
+
+
+def _previous(target: Any, field: str) -> Any:
+    """Valor de ``field`` antes del flush en curso"""
+    history = inspect(target).attrs[field].history
+    return history.deleted[0] if history.deleted else getattr(target, field)
+
+
+def _renditions_size(
+    target: Any, connection: Connection, previous: bool = False
+) -> int:
+    """Bytes de las renditions de ``target`` (antes o después del flush)"""
+    attr = inspect(target).attrs.renditions
+    history = attr.history
+    if attr.loaded_value is NO_VALUE and not history.has_changes():
+        # Colección sin cargar: las filas en DB no cambian en este flush
+        from app.models.image_rendition import ImageRendition
+
+        return int(
+            connection.execute(
+                select(func.coalesce(func.sum(ImageRendition.file_size), 0)).where(
+                    ImageRendition.uploaded_file_id == target.id
+                )
+            ).scalar()
+        )
+    renditions = (
+        list(history.unchanged) + list(history.deleted)
+        if previous
+        else list(history.unchanged) + list(history.added)
+    )
+    return sum(int(r.file_size or 0) for r in renditions)
+
+
+def _usage(
+    target: Any, connection: Connection, previous: bool = False
+) -> Optional[Tuple[UsageKey, int]]:
+    """Clave y bytes que ``target`` aporta al uso (None si no está activo)"""
+    value = _previous if previous else getattr
+    if value(target, "is_active") is False:
+        return None
+    key = (
+        str(value(target, "folder")),
+        int(value(target, "uploaded_by") or 0),
+        str(value(target, "file_type")),
+    )
+    size = int(value(target, "file_size") or 0)
+    size += int(value(target, "thumbnail_size") or 0)
+    return key, size + _renditions_size(target, connection, previous)
+
+
+# Atributos que cambian la clave o los bytes de un archivo
+TRACKED_ATTRIBUTES = (
+    "is_active",
+    "folder",
+    "uploaded_by",
+    "file_type",
+    "file_size",
+    "thumbnail_size",
+    "renditions",
+)
+
+
+def _on_insert(mapper, connection: Connection, target: Any) -> None:
+    usage = _usage(target, connection)
+    if usage:
+        _add_usage(connection, usage[0], 1, usage[1])
+
+
+def _on_update(mapper, connection: Connection, target: Any) -> None:
+    state = inspect(target)
+    if not any(state.attrs[attr].history.has_changes() for attr in TRACKED_ATTRIBUTES):
+        return
+    before = _usage(target, connection, previous=True)
+    after = _usage(target, connection)
+    if before == after:
+        return
+    if before:
+        _add_usage(connection, before[0], -1, -before[1])
+    if after:
+        _add_usage(connection, after[0], 1, after[1])
+
+
+def _on_delete(mapper, connection: Connection, target: Any) -> None:
+    usage = _usage(target, connection, previous=True)
+    if usage:
+        _add_usage(connection, usage[0], -1, -usage[1])
+
+
+def register_usage_listeners() -> None:
+    """Mantener los contadores al escribir ``UploadedFile``"""
+    from app.models.uploaded_file import UploadedFile
+
+    if event.contains(UploadedFile, "after_insert", _on_insert):
+        return
+    event.listen(UploadedFile, "after_insert", _on_insert)
+    event.listen(UploadedFile, "after_update", _on_update)
+    event.listen(UploadedFile, "after_delete", _on_delete)
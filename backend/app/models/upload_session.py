@@ -0,0 +1,30 @@
+"""
+Modelo para sesiones de subida reanudable (por bloques)
+"""
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    folder = Column(String(100), nullable=False)
+    filename = Column(String(255), nullable=False)
+    mime_type = Column(String(100), nullable=False)
+    total_size = Column(BigInteger, nullable=False)  # bytes declarados
+    received_size = Column(BigInteger, nullable=False, default=0)  # offset actual
+    status = Column(String(20), nullable=False, default="pending")  # completed
+    uploaded_by = Column(Integer, nullable=True, index=True)  # user_id
+    uploaded_file_id = Column(Integer, nullable=True)  # resultado al finalizar
+    # Clave temporal en el storage si el cliente sube directamente (S3)
+    storage_key = Column(String(500), nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<UploadSession(id='{self.id}', offset={self.received_size})>"
@@ -2,10 +2,23 @@
 Modelo para gestión de archivos subidos
 """
 
-from sqlalchemy import BigInteger, Boolean, Column, DateTime, Integer, String
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    Integer,
+    String,
+    Text,
+)
+from sqlalchemy.orm import Session, relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.core.storage import get_storage, key_for_url
 
 
 class UploadedFile(Base):
@@ -21,10 +34,109 @@ class UploadedFile(Base):
     folder = Column(
         String(100), nullable=False, index=True
     )  # hero, services, projects, etc.
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 original
+    original_path = Column(String(500), nullable=True)  # .originals/ab/cd/<hash>
+    # Dimensiones intrínsecas (imágenes y vídeos), calculadas al subir
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    # Metadatos de vídeo (leídos del moov al subir)
+    duration = Column(Float, nullable=True)  # segundos
+    codec = Column(String(50), nullable=True)  # p.ej. avc1.64001f
+    # Placeholders de imagen para reservar espacio mientras carga
+    dominant_color = Column(String(7), nullable=True)  # #rrggbb
+    blurhash = Column(String(100), nullable=True)
+    lqip = Column(Text, nullable=True)  # data:image/webp;base64,...
+    # Miniatura WebP para rejillas (lado máximo THUMBNAIL_SIZE)
+    thumbnail_path = Column(String(500), nullable=True)
+    thumbnail_width = Column(Integer, nullable=True)
+    thumbnail_height = Column(Integer, nullable=True)
+    thumbnail_size = Column(Integer, nullable=True)  # bytes (cuenta en el uso)
+    # RenditionSpec.version con que se derivó (None = spec por defecto antiguo)
+    rendition_version = Column(String(8), nullable=True)
     uploaded_by = Column(Integer, nullable=True)  # user_id
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    renditions = relationship(
+        "ImageRendition",
+        back_populates="uploaded_file",
+        cascade="all, delete-orphan",
+        order_by="ImageRendition.width",
+    )
+
+    # Orden de preferencia de formatos en el manifest (<picture> usa el primero)
+    SOURCE_FORMAT_ORDER = ["image/avif", "image/webp", "image/jpeg", "image/png"]
+
+    @property
+    def url(self) -> str:
+        return get_storage().url(str(self.file_path))
+
+    @property
+    def thumbnail_url(self) -> Optional[str]:
+        if not self.thumbnail_path:
+            return None
+        return get_storage().url(str(self.thumbnail_path))
+
+    @property
+    def sources(self) -> list:
+        """
+        Manifest listo para srcset agrupado por tipo MIME
+
+        Incluye el archivo principal dentro del set de su propio formato.
+        """
+        storage = get_storage()
+        by_type: dict = {}
+        for rendition in self.renditions:
+            by_type.setdefault(rendition.mime_type, []).append(
+                (rendition.width, storage.url(rendition.file_path))
+            )
+
+        if self.file_type == "image" and by_type:
+            # El archivo principal es el recorte completo: ancho máximo del set
+            main_width = max(r.width for r in self.renditions)
+            by_type.setdefault(self.mime_type, []).append((main_width, self.url))
+
+        ordered_types = sorted(
+            by_type,
+            key=lambda t: (
+                self.SOURCE_FORMAT_ORDER.index(t)
+                if t in self.SOURCE_FORMAT_ORDER
+                else len(self.SOURCE_FORMAT_ORDER)
+            ),
+        )
+        return [
+            {
+                "type": mime_type,
+                "srcset": ", ".join(
+                    f"{url} {width}w" for width, url in sorted(set(by_type[mime_type]))
+                ),
+            }
+            for mime_type in ordered_types
+        ]
+
     def __repr__(self):
         return f"<UploadedFile(filename='{self.filename}', folder='{self.folder}')>"
+
+
+def files_by_url(
+    session: Session, urls: Iterable[Optional[str]], file_type: Optional[str] = None
+) -> Dict[str, UploadedFile]:
+    """
+    Archivos subidos a los que apuntan ``urls`` (una sola consulta)
+
+    Returns:
+        dict: URL tal como se pasó -> UploadedFile; las URLs externas o sin
+        registro no aparecen
+    """
+    keys = {url: key_for_url(url) for url in set(urls) if url}
+    keys = {url: key for url, key in keys.items() if key}
+    if not keys:
+        return {}
+    query = session.query(UploadedFile).filter(
+        UploadedFile.file_path.in_(set(keys.values()))
+    )
+    if file_type is not None:
+        query = query.filter(UploadedFile.file_type == file_type)
+    by_path = {db_file.file_path: db_file for db_file in query}
+    return {url: by_path[key] for url, key in keys.items() if key in by_path}
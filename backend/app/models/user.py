@@ -1,8 +1,12 @@
+import re
+from typing import Dict, Optional
+
 from sqlalchemy import Boolean, Column, DateTime, Integer, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from ..core.database import Base
+from ..core.storage import get_storage, key_for_url
 from .user_role import user_roles
 
 
@@ -17,6 +21,8 @@ class User(Base):
     last_name = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
+    # Se incrementa al cambiar sus roles o los permisos de sus roles
+    permissions_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Professional Profile Fields
     phone = Column(String(20), nullable=True)
@@ -29,3 +35,36 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     roles = relationship("Role", secondary=user_roles, back_populates="users")
+
+    # Avatares: renditions cuadradas WebP nombradas por hash del original
+    AVATAR_FOLDER = "avatars"
+    AVATAR_SIZES = (32, 64, 256)
+    AVATAR_KEY_RE = re.compile(r"^avatars/([0-9a-f]{64})-\d+w\.webp$")
+
+    @classmethod
+    def avatar_key(cls, content_hash: str, size: int) -> str:
+        return f"{cls.AVATAR_FOLDER}/{content_hash}-{size}w.webp"
+
+    @classmethod
+    def avatar_hash(cls, avatar_url: Optional[str]) -> Optional[str]:
+        """Hash del original si ``avatar_url`` es un avatar con renditions"""
+        key = key_for_url(avatar_url) if avatar_url else None
+        match = cls.AVATAR_KEY_RE.match(key or "")
+        return match.group(1) if match else None
+
+    @property
+    def avatar_urls(self) -> Dict[str, str]:
+        """
+        URL de cada tamaño de avatar (``{"32": ..., "64": ..., "256": ...}``)
+
+        Vacío si no hay avatar o es uno antiguo sin renditions (usar
+        ``avatar_url``).
+        """
+        content_hash = self.avatar_hash(self.avatar_url)
+        if content_hash is None:
+            return {}
+        storage = get_storage()
+        return {
+            str(size): storage.url(self.avatar_key(content_hash, size))
+            for size in self.AVATAR_SIZES
+        }
@@ -8,6 +8,7 @@ from .service import Service, ServiceCreate, ServiceUpdate
 from .site_config import SiteConfig, SiteConfigCreate, SiteConfigUpdate
 from .testimonial import Testimonial, TestimonialCreate, TestimonialUpdate
 from .token import Token, TokenData
+from .upload_session import UploadSession, UploadSessionCreate
 from .uploaded_file import UploadedFile, UploadedFileCreate, UploadedFileUpdate
 from .user import UserCreate, UserLogin, UserResponse, UserUpdate
 
@@ -45,4 +46,6 @@ __all__ = [
     "UploadedFile",
     "UploadedFileCreate",
     "UploadedFileUpdate",
+    "UploadSession",
+    "UploadSessionCreate",
 ]
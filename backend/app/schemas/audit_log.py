@@ -25,6 +25,7 @@ class AuditLogResponse(AuditLogBase):
     # User info (optional, for frontend display)
     user_username: Optional[str] = None
     user_email: Optional[str] = None
+    user_avatar_url: Optional[str] = None  # avatar de 32px si existe
 
     class Config:
         from_attributes = True
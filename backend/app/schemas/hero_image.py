@@ -7,6 +7,8 @@ from typing import Optional
 
 from pydantic import BaseModel, Field
 
+from .uploaded_file import ImageMetadata
+
 
 class HeroImageBase(BaseModel):
     title: str = Field(..., max_length=200)
@@ -32,6 +34,7 @@ class HeroImageUpdate(BaseModel):
 
 class HeroImage(HeroImageBase):
     id: int
+    image: Optional[ImageMetadata] = None  # dimensiones y placeholder
     created_at: datetime
     updated_at: Optional[datetime] = None
 
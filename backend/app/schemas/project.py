@@ -1,8 +1,10 @@
 from datetime import date, datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
+from .uploaded_file import ImageMetadata, VideoMetadata
+
 
 class ProjectBase(BaseModel):
     title: str = Field(..., max_length=200)
@@ -58,6 +60,8 @@ class ProjectUpdate(BaseModel):
 
 class Project(ProjectBase):
     id: int
+    video: Optional[VideoMetadata] = None
+    images: Dict[str, ImageMetadata] = {}  # featured_image/gallery por URL
     created_at: datetime
     updated_at: Optional[datetime] = None
 
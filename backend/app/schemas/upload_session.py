@@ -0,0 +1,44 @@
+"""
+Schemas para subidas reanudables
+"""
+
+from datetime import datetime
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+class UploadSessionCreate(BaseModel):
+    folder: str
+    filename: str = Field(..., max_length=255)
+    mime_type: str = Field(..., max_length=100)
+    total_size: int = Field(..., gt=0)
+
+
+class UploadSession(BaseModel):
+    id: str
+    folder: str
+    filename: str
+    mime_type: str
+    total_size: int
+    received_size: int
+    status: str
+    uploaded_file_id: Optional[int] = None
+    expires_at: datetime
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class DirectUploadTarget(BaseModel):
+    """Petición que el cliente debe enviar para subir el archivo"""
+
+    method: str  # POST (formulario firmado de S3) o PUT (almacenamiento local)
+    url: str
+    fields: Dict[str, str] = {}  # campos del formulario, antes del archivo
+    headers: Dict[str, str] = {}
+
+
+class DirectUpload(UploadSession):
+    upload: DirectUploadTarget
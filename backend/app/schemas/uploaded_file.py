@@ -3,7 +3,7 @@ Schemas para gestión de archivos
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -19,6 +19,7 @@ class UploadedFileBase(BaseModel):
 
 
 class UploadedFileCreate(UploadedFileBase):
+    content_hash: Optional[str] = None
     uploaded_by: Optional[int] = None
 
 
@@ -27,12 +28,188 @@ class UploadedFileUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
+class ImageRendition(BaseModel):
+    width: int
+    height: int
+    format: str
+    mime_type: str
+    file_path: str
+    file_size: int
+
+    class Config:
+        from_attributes = True
+
+
+class RenditionSource(BaseModel):
+    """Entrada del manifest: un <source type=... srcset=...> por formato"""
+
+    type: str
+    srcset: str
+
+
+class RenditionManifest(BaseModel):
+    id: int
+    src: str
+    sources: List[RenditionSource] = []
+
+
+class VideoMetadata(BaseModel):
+    """Datos de reproducción de un vídeo subido (sin necesidad de sondearlo)"""
+
+    url: str
+    mime_type: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    duration: Optional[float] = None
+    codec: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ImageMetadata(BaseModel):
+    """Datos para maquetar una imagen subida antes de descargarla"""
+
+    url: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    dominant_color: Optional[str] = None
+    blurhash: Optional[str] = None
+    lqip: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
 class UploadedFile(UploadedFileBase):
     id: int
+    content_hash: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    duration: Optional[float] = None
+    codec: Optional[str] = None
+    dominant_color: Optional[str] = None
+    blurhash: Optional[str] = None
+    lqip: Optional[str] = None
+    rendition_version: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    thumbnail_width: Optional[int] = None
+    thumbnail_height: Optional[int] = None
     uploaded_by: Optional[int]
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime]
+    renditions: List[ImageRendition] = []
+    sources: List[RenditionSource] = []
+
+    class Config:
+        from_attributes = True
+
+
+class UploadedFileListItem(BaseModel):
+    """Archivo en el listado compacto (rejilla del selector de archivos)"""
+
+    id: int
+    original_filename: str
+    file_type: str
+    mime_type: str
+    file_size: int
+    url: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    dominant_color: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    thumbnail_width: Optional[int] = None
+    thumbnail_height: Optional[int] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class BatchUploadResult(BaseModel):
+    """Resultado de un archivo dentro de una subida múltiple"""
+
+    filename: str
+    status: str  # created, duplicate o error
+    file: Optional[UploadedFile] = None
+    error: Optional[str] = None
+
+
+class BatchUploadResponse(BaseModel):
+    results: List[BatchUploadResult]
+    created: int
+    duplicates: int
+    failed: int
+
+
+class MediaGCFile(BaseModel):
+    id: int
+    file_path: str
+    folder: str
+    is_active: bool
+    bytes: int
+
+
+class MediaGCError(BaseModel):
+    id: int
+    error: str
+
+
+class MediaGCReport(BaseModel):
+    """Informe del recolector de archivos huérfanos"""
+
+    dry_run: bool
+    grace_hours: int
+    candidates: int
+    purged: int
+    bytes_reclaimed: int
+    reindexed: Optional[int] = None  # referencias indexadas si se reconstruyó
+    files: List[MediaGCFile]
+    errors: List[MediaGCError]
+
+
+class UsageCounter(BaseModel):
+    files: int
+    bytes: int
+
+
+class FolderUsage(UsageCounter):
+    folder: str
+    quota: Optional[int] = None  # bytes
+    by_type: Dict[str, UsageCounter]  # image, video...
+
+
+class UserUsage(UsageCounter):
+    user_id: Optional[int] = None  # None = subidas sin usuario
+    username: Optional[str] = None
+    quota: Optional[int] = None  # bytes
+
+
+class StorageUsageReport(UsageCounter):
+    """Uso de almacenamiento (archivos activos: principal y renditions)"""
+
+    folders: List[FolderUsage]
+    users: List[UserUsage]
+
+
+class RenditionJob(BaseModel):
+    """Estado de un trabajo de re-render masivo"""
+
+    id: int
+    folder: str
+    spec: Dict[str, Any]  # size, widths, formats
+    spec_version: str
+    status: str  # pending, running, completed, failed
+    total: int
+    processed: int
+    failed: int
+    last_file_id: int  # checkpoint
+    error: Optional[str] = None
+    heartbeat_at: Optional[datetime] = None  # último lote del ejecutor
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
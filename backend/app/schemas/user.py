@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, EmailStr, field_validator
 
@@ -88,6 +88,7 @@ class RoleInUser(BaseModel):
 class UserResponse(UserBase):
     id: int
     is_superuser: bool
+    avatar_urls: Dict[str, str] = {}  # 32/64/256px WebP por lado
     created_at: datetime
     updated_at: Optional[datetime] = None
     roles: List[RoleInUser] = []
@@ -0,0 +1,121 @@
+"""
+Servicio de avatares de usuario
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+
+from app.core.image_executor import get_image_executor
+from app.core.storage import StorageBackend, key_for_url
+from app.models.user import User
+from app.services.upload_service import UploadService
+from app.utils.images import avatar_renditions
+
+
+class AvatarService:
+    """
+    Subida y borrado de avatares
+
+    La subida se copia a disco en una sola pasada (hash SHA-256 y límite
+    de tamaño en streaming) y se convierte en renditions cuadradas WebP
+    (``User.AVATAR_SIZES``) nombradas por el hash del original, que
+    ``/uploads`` sirve como inmutables. Al reemplazar o borrar un avatar se
+    eliminan sus archivos si ningún otro usuario los usa; solo se borran
+    archivos de ``avatars/``.
+    """
+
+    ALLOWED_TYPES = ["image/jpeg", "image/png", "image/gif", "image/webp"]
+    MAX_SIZE = 5 * 1024 * 1024  # 5MB
+
+    def __init__(self, db: Session, storage: Optional[StorageBackend] = None):
+        self.db = db
+        self.upload_service = UploadService(db, storage=storage)
+        self.storage = self.upload_service.storage
+
+    async def save_avatar(self, file: UploadFile, user: User) -> str:
+        """
+        Guardar un nuevo avatar para ``user``
+
+        Returns:
+            str: URL del avatar (rendition más grande)
+
+        Raises:
+            ValueError: Tipo no permitido, archivo demasiado grande o que no
+                es una imagen válida
+            ImageExecutorBusyError: Si el pool de imágenes está saturado
+        """
+        if file.content_type not in self.ALLOWED_TYPES:
+            raise ValueError("Tipo de archivo no permitido. Use JPEG, PNG, GIF o WebP.")
+
+        temp_path, content_hash, _ = await self.upload_service.stream_to_temp(
+            file, "image", self.MAX_SIZE
+        )
+        scratch_dir = Path(tempfile.mkdtemp(dir=temp_path.parent))
+        try:
+            largest = User.avatar_key(content_hash, max(User.AVATAR_SIZES))
+            # Mismo contenido ya subido (por este u otro usuario): reutilizar
+            if not await self.storage.exists(largest):
+                avatars = await get_image_executor().submit(
+                    avatar_renditions,
+                    str(temp_path),
+                    str(scratch_dir),
+                    content_hash,
+                    User.AVATAR_SIZES,
+                )
+                if not avatars:
+                    raise ValueError("El archivo no es una imagen válida")
+                # El más grande el último: su existencia marca el set completo
+                for avatar in sorted(avatars, key=lambda a: a["size"]):
+                    await self.storage.put_file(
+                        User.avatar_key(content_hash, avatar["size"]),
+                        scratch_dir / avatar["filename"],
+                        "image/webp",
+                    )
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+            temp_path.unlink(missing_ok=True)
+
+        old_avatar = user.avatar_url
+        user.avatar_url = self.storage.url(largest)  # type: ignore[assignment]
+        self.db.commit()
+        await self.delete_unused(old_avatar)
+        return str(user.avatar_url)
+
+    async def remove_avatar(self, user: User) -> None:
+        """Quitar el avatar de ``user`` y borrar sus archivos si no se comparten"""
+        old_avatar = user.avatar_url
+        user.avatar_url = None  # type: ignore[assignment]
+        self.db.commit()
+        await self.delete_unused(old_avatar)
+
+    def avatar_keys(self, avatar_url: Optional[str]) -> List[str]:
+        """Claves de almacenamiento de un avatar (todas sus renditions)"""
+        content_hash = User.avatar_hash(avatar_url)
+        if content_hash is not None:
+            return [User.avatar_key(content_hash, size) for size in User.AVATAR_SIZES]
+        # Avatar antiguo: un único archivo directamente en avatars/. Cualquier
+        # otra URL (externa, o de otro folder puesta con PUT /api/profile/me)
+        # no es un avatar subido y nunca se borra
+        key = key_for_url(avatar_url) if avatar_url else None
+        parts = key.split("/") if key else []
+        if (
+            len(parts) == 2
+            and parts[0] == User.AVATAR_FOLDER
+            and not parts[1].startswith(".")
+        ):
+            return [str(key)]
+        return []
+
+    async def delete_unused(self, avatar_url: Optional[str]) -> None:
+        """Borrar los archivos de ``avatar_url`` si ningún usuario lo usa ya"""
+        if not avatar_url:
+            return
+        if self.db.query(User.id).filter(User.avatar_url == avatar_url).first():
+            return
+        for key in self.avatar_keys(avatar_url):
+            await self.storage.delete(key)
@@ -0,0 +1,220 @@
+"""
+Servicio de variantes de imagen bajo demanda (/api/images)
+"""
+
+import bisect
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import anyio
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.image_cache import ImageCache, get_image_cache
+from app.core.image_executor import get_image_executor
+from app.core.rate_limit import variant_miss_limiter
+from app.core.storage import StorageBackend, get_storage
+from app.models.uploaded_file import UploadedFile
+from app.utils.images import (
+    FORMAT_MAP,
+    RENDITION_FORMATS,
+    RENDITION_WIDTHS,
+    TRANSFORM_FITS,
+    avif_supported,
+    transform_image,
+)
+
+
+def _write_temp(directory: Path, data: bytes) -> Path:
+    """Escribir ``data`` en un temporal de ``directory``"""
+    fd, name = tempfile.mkstemp(dir=directory, suffix=".src")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    return Path(name)
+
+
+class ImageTransformService:
+    """Genera variantes (ancho/alto/ajuste/formato) desde el original guardado"""
+
+    # Límite de ancho/alto de una variante
+    MAX_DIMENSION = 4096
+
+    # Tamaños a los que se redondean w/h (IMAGE_VARIANT_SIZES los sustituye):
+    # los anchos de las renditions más escalones para miniaturas y pantallas
+    VARIANT_SIZES = tuple(
+        sorted(RENDITION_WIDTHS + (32, 64, 128, 200, 320, 640, 1024, 1600, 2560, 4096))
+    )
+
+    # Con ancho y alto, el alto se redondea a múltiplos de este valor
+    HEIGHT_STEP = 8
+
+    # Formatos aceptados en ?format=
+    OUTPUT_FORMATS = {"jpeg": "JPEG", "png": "PNG", "webp": "WEBP", "avif": "AVIF"}
+
+    def __init__(
+        self,
+        db: Session,
+        storage: Optional[StorageBackend] = None,
+        cache: Optional[ImageCache] = None,
+    ):
+        self.db = db
+        self.storage = storage or get_storage()
+        self.cache = cache or get_image_cache()
+
+    def get_image(self, file_id: int) -> Optional[UploadedFile]:
+        """Obtener una imagen activa por ID"""
+        return (
+            self.db.query(UploadedFile)
+            .filter(
+                UploadedFile.id == file_id,
+                UploadedFile.file_type == "image",
+                UploadedFile.is_active.is_(True),
+            )
+            .first()
+        )
+
+    def choose_format(
+        self, requested: Optional[str], accept: str, mime_type: str
+    ) -> Tuple[str, bool]:
+        """
+        Elegir el formato de salida
+
+        Sin ``requested`` se negocia con la cabecera Accept: AVIF (si Pillow
+        lo soporta) > WebP > formato original.
+
+        Returns:
+            tuple: (formato de Pillow, si se negoció con Accept)
+
+        Raises:
+            ValueError: Si el formato pedido no está soportado
+        """
+        if requested:
+            output_format = self.OUTPUT_FORMATS.get(requested.lower())
+            if output_format is None or (
+                output_format == "AVIF" and not avif_supported()
+            ):
+                raise ValueError(f"Formato no soportado: {requested}")
+            return output_format, False
+
+        accept = accept.lower()
+        if "image/avif" in accept and avif_supported():
+            return "AVIF", True
+        if "image/webp" in accept:
+            return "WEBP", True
+        return FORMAT_MAP.get(mime_type, "JPEG"), True
+
+    def variant_sizes(self) -> List[int]:
+        return sorted(settings.IMAGE_VARIANT_SIZES or self.VARIANT_SIZES)
+
+    def snap_size(
+        self, width: Optional[int], height: Optional[int]
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Redondear el tamaño pedido para acotar las variantes de cada imagen
+
+        La dimensión principal (el ancho, o el alto si solo se pide el alto)
+        sube al siguiente tamaño de ``variant_sizes`` (o baja al mayor). Con
+        ambas, el alto se escala en la misma proporción, conservando la
+        relación de aspecto pedida, y se redondea a ``HEIGHT_STEP``.
+        """
+        sizes = self.variant_sizes()
+
+        def snap(value: int) -> int:
+            return sizes[min(bisect.bisect_left(sizes, value), len(sizes) - 1)]
+
+        if width is None:
+            return None, snap(height) if height is not None else None
+        snapped = snap(width)
+        if height is None:
+            return snapped, None
+        step = self.HEIGHT_STEP
+        snapped_height = round(height * snapped / width / step) * step
+        return snapped, min(max(step, snapped_height), self.MAX_DIMENSION)
+
+    def variant_key(
+        self,
+        db_file: UploadedFile,
+        width: Optional[int],
+        height: Optional[int],
+        fit: str,
+        output_format: str,
+    ) -> str:
+        """
+        Clave (y nombre de archivo) de la variante en la caché
+
+        Se basa en el hash del original, así que archivos deduplicados de
+        distintos folders comparten variantes.
+        """
+        if db_file.original_path and db_file.content_hash:
+            source_id = str(db_file.content_hash)
+        else:
+            source_id = hashlib.sha256(str(db_file.file_path).encode()).hexdigest()
+        if not (width and height):
+            fit = "auto"  # con una sola dimensión se conserva la proporción
+        extension = RENDITION_FORMATS[output_format][1]
+        return f"{source_id}-{width or 0}x{height or 0}-{fit}{extension}"
+
+    async def render_variant(
+        self,
+        db_file: UploadedFile,
+        width: Optional[int],
+        height: Optional[int],
+        fit: str,
+        output_format: str,
+        client: Optional[str] = None,
+    ) -> Path:
+        """
+        Obtener la ruta de la variante, generándola si no está en caché
+
+        Cada generación (fallo de caché) gasta una ficha de ``client`` en
+        ``variant_miss_limiter``; los aciertos no cuentan.
+
+        Raises:
+            ValueError: Si los parámetros no son válidos o la imagen no se
+                pudo procesar
+            ImageExecutorBusyError: Si la cola del pool de imágenes está llena
+            RateLimitExceeded: Si ``client`` generó demasiadas variantes
+        """
+        if fit not in TRANSFORM_FITS:
+            raise ValueError(f"Ajuste no válido: {fit}")
+        for dimension in (width, height):
+            if dimension is not None and not 1 <= dimension <= self.MAX_DIMENSION:
+                raise ValueError(
+                    f"Las dimensiones deben estar entre 1 y {self.MAX_DIMENSION}"
+                )
+
+        source_key = str(db_file.original_path or db_file.file_path)
+        key = self.variant_key(db_file, width, height, fit, output_format)
+
+        async def render(target: Path) -> None:
+            if client is not None:
+                variant_miss_limiter.hit(client)
+            source_path = self.storage.local_path(source_key)
+            downloaded = None
+            if source_path is None:
+                # Almacenamiento remoto: descargar el original a un temporal
+                data = await self.storage.get(source_key)
+                downloaded = await anyio.to_thread.run_sync(
+                    _write_temp, target.parent, data
+                )
+                source_path = downloaded
+            try:
+                result = await get_image_executor().submit(
+                    transform_image,
+                    str(source_path),
+                    str(target),
+                    width,
+                    height,
+                    fit,
+                    output_format,
+                )
+            finally:
+                if downloaded is not None:
+                    downloaded.unlink(missing_ok=True)
+            if result is None:
+                raise ValueError("No se pudo procesar la imagen")
+
+        return await self.cache.get_or_create(key, render)
@@ -0,0 +1,195 @@
+"""
+Recolector de archivos subidos huérfanos
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import exists, func, or_
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.core.storage import StorageBackend, get_storage
+from app.models.image_rendition import ImageRendition
+from app.models.media_reference import MediaReference, reference_rows, tracked_fields
+from app.models.uploaded_file import UploadedFile
+from app.services.upload_service import UploadService
+
+# Resumen de la última ejecución en este proceso (para /api/uploads/metrics)
+_last_run: Optional[Dict[str, Any]] = None
+
+
+def last_run_summary() -> Optional[Dict[str, Any]]:
+    return _last_run
+
+
+class MediaGCService:
+    """
+    Purga archivos subidos que nada referencia tras un periodo de gracia
+
+    Cubre tanto los soft-deleted (``delete_file`` solo marca ``is_active``)
+    como los activos que nunca llegaron a usarse o dejaron de usarse. Un
+    archivo soft-deleted que sigue referenciado se conserva: borrarlo
+    rompería la página que lo muestra.
+    """
+
+    def __init__(self, db: Session, storage: Optional[StorageBackend] = None):
+        self.db = db
+        self.storage = storage or get_storage()
+        self.upload_service = UploadService(db, storage=self.storage)
+
+    def rebuild_index(self) -> int:
+        """
+        Reconstruir ``media_references`` desde los modelos de contenido
+
+        Necesario tras migrar o tras escrituras que no pasan por el ORM.
+
+        Returns:
+            int: Número de referencias indexadas
+        """
+        connection = self.db.connection()
+        self.db.query(MediaReference).delete(synchronize_session=False)
+        total = 0
+        for model, fields in tracked_fields().items():
+            for target in self.db.query(model).yield_per(500):
+                rows = reference_rows(target, fields, connection)
+                if rows:
+                    connection.execute(MediaReference.__table__.insert(), rows)
+                    total += len(rows)
+        self.db.commit()
+        return total
+
+    def _candidates_query(self, grace_hours: int):
+        """
+        Archivos sin ninguna referencia y sin cambios en ``grace_hours``
+
+        Una referencia al archivo principal, a una rendition o al original
+        mantiene vivo el registro. Los soft-deleted cuentan desde su
+        borrado (``updated_at``); los activos desde su subida.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+        referenced = exists().where(
+            or_(
+                MediaReference.file_path == UploadedFile.file_path,
+                MediaReference.file_path == UploadedFile.original_path,
+            )
+        )
+        rendition_referenced = exists().where(
+            ImageRendition.uploaded_file_id == UploadedFile.id,
+            MediaReference.file_path == ImageRendition.file_path,
+        )
+        last_change = func.coalesce(UploadedFile.updated_at, UploadedFile.created_at)
+        return self.db.query(UploadedFile).filter(
+            ~referenced, ~rendition_referenced, last_change < cutoff
+        )
+
+    async def _bytes_freed(self, db_file: UploadedFile, keys: List[str]) -> int:
+        """Bytes liberados: tamaños conocidos en DB y el original vía storage"""
+        total = int(db_file.file_size) + sum(
+            int(r.file_size) for r in db_file.renditions
+        )
+        total += int(db_file.thumbnail_size or 0)
+        if db_file.original_path and str(db_file.original_path) in keys:
+            total += await self.storage.size(str(db_file.original_path)) or 0
+        return total
+
+    async def collect(
+        self,
+        grace_hours: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        dry_run: bool = True,
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Buscar y (si no es dry-run) purgar archivos huérfanos por lotes
+
+        Cada lote borra sus claves del storage en paralelo y elimina los
+        registros con un único commit. Un error de storage deja el registro
+        para la siguiente ejecución.
+
+        Returns:
+            dict: Informe con candidatos, purgados, bytes recuperados, el
+            detalle por archivo y los errores
+        """
+        global _last_run
+
+        # Recién migrado el índice está vacío y todo parecería huérfano
+        if self.db.query(MediaReference.id).first() is None:
+            self.rebuild_index()
+
+        grace_hours = (
+            settings.MEDIA_GC_GRACE_HOURS if grace_hours is None else grace_hours
+        )
+        batch_size = max(1, batch_size or settings.MEDIA_GC_BATCH_SIZE)
+        report: Dict[str, Any] = {
+            "dry_run": dry_run,
+            "grace_hours": grace_hours,
+            "candidates": 0,
+            "purged": 0,
+            "bytes_reclaimed": 0,
+            "files": [],
+            "errors": [],
+        }
+
+        last_id = 0
+        while limit is None or report["candidates"] < limit:
+            size = batch_size
+            if limit is not None:
+                size = min(batch_size, limit - report["candidates"])
+            # Paginación por clave: los fallos no hacen que se repita un lote
+            batch = (
+                self._candidates_query(grace_hours)
+                .filter(UploadedFile.id > last_id)
+                .options(selectinload(UploadedFile.renditions))
+                .order_by(UploadedFile.id)
+                .limit(size)
+                .all()
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            report["candidates"] += len(batch)
+
+            batch_ids = [db_file.id for db_file in batch]
+            planned = []
+            for db_file in batch:
+                keys = self.upload_service.storage_keys(db_file, batch_ids)
+                freed = await self._bytes_freed(db_file, keys)
+                planned.append((db_file, keys, freed))
+                report["files"].append(
+                    {
+                        "id": db_file.id,
+                        "file_path": db_file.file_path,
+                        "folder": db_file.folder,
+                        "is_active": db_file.is_active,
+                        "bytes": freed,
+                    }
+                )
+
+            if dry_run:
+                report["bytes_reclaimed"] += sum(freed for _, _, freed in planned)
+                continue
+
+            results = await asyncio.gather(
+                *(
+                    asyncio.gather(*(self.storage.delete(key) for key in keys))
+                    for _, keys, _ in planned
+                ),
+                return_exceptions=True,
+            )
+            for (db_file, _, freed), result in zip(planned, results):
+                if isinstance(result, Exception):
+                    report["errors"].append({"id": db_file.id, "error": str(result)})
+                    continue
+                self.db.delete(db_file)
+                report["purged"] += 1
+                report["bytes_reclaimed"] += freed
+            self.db.commit()
+
+        _last_run = {
+            key: report[key]
+            for key in ("dry_run", "candidates", "purged", "bytes_reclaimed")
+        }
+        _last_run["finished_at"] = datetime.now(timezone.utc).isoformat()
+        return report
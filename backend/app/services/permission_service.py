@@ -3,8 +3,12 @@ from typing import Any, Dict, List, Optional
 from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
+from ..core.principal import permission_stamp, principal_cache
 from ..models.permission import Permission
+from ..models.role_permission import role_permissions
+from ..models.user_role import user_roles
 from ..schemas.permission import PermissionCreate, PermissionUpdate
+from .user_service import UserService
 
 
 class PermissionService:
@@ -16,6 +20,18 @@ class PermissionService:
     def get_permission_by_code(db: Session, code: str) -> Optional[Permission]:
         return db.query(Permission).filter(Permission.code == code).first()
 
+    @staticmethod
+    def get_user_ids_with_permission(db: Session, permission_id: int) -> List[int]:
+        """Users holding the permission through any of their roles"""
+        rows = (
+            db.query(user_roles.c.user_id)
+            .join(role_permissions, role_permissions.c.role_id == user_roles.c.role_id)
+            .filter(role_permissions.c.permission_id == permission_id)
+            .distinct()
+            .all()
+        )
+        return [row[0] for row in rows]
+
     @staticmethod
     def get_permissions(
         db: Session,
@@ -104,10 +120,23 @@ class PermissionService:
             return None
 
         update_data = permission.model_dump(exclude_unset=True)
+        # Only the code and the status change what users are allowed to do
+        changed = any(
+            field in update_data and update_data[field] != getattr(db_permission, field)
+            for field in ("code", "is_active")
+        )
         for field, value in update_data.items():
             setattr(db_permission, field, value)
 
+        user_ids = (
+            PermissionService.get_user_ids_with_permission(db, permission_id)
+            if changed
+            else []
+        )
+        UserService.bump_permissions_version(db, user_ids)
         db.commit()
+        principal_cache.invalidate_users(user_ids)
+        permission_stamp.expire()
         db.refresh(db_permission)
         return db_permission
 
@@ -118,6 +147,10 @@ class PermissionService:
         )
         if not db_permission:
             return False
+        user_ids = PermissionService.get_user_ids_with_permission(db, permission_id)
+        UserService.bump_permissions_version(db, user_ids)
         db.delete(db_permission)
         db.commit()
+        principal_cache.invalidate_users(user_ids)
+        permission_stamp.expire()
         return True
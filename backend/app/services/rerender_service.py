@@ -0,0 +1,464 @@
+"""
+Servicio de re-render masivo de imágenes desde sus originales
+"""
+
+import asyncio
+import shutil
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import anyio
+from sqlalchemy import func, or_
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import settings
+from app.core.image_executor import ImageExecutorBusyError, get_image_executor
+from app.core.storage import StorageBackend, get_storage
+from app.models.media_reference import rewrite_references
+from app.models.rendition_job import RenditionJob
+from app.models.uploaded_file import UploadedFile
+from app.services.upload_service import UploadService
+from app.utils.images import (
+    THUMBNAIL_SUFFIX,
+    RenditionSpec,
+    make_thumbnail,
+    rerender_image,
+)
+
+# Columnas de la miniatura en UploadedFile
+THUMBNAIL_FIELDS = (
+    "thumbnail_path",
+    "thumbnail_width",
+    "thumbnail_height",
+    "thumbnail_size",
+)
+
+
+class RenditionJobLeaseLost(RuntimeError):
+    """Otro ejecutor tomó el trabajo (este dejó de renovar su lease)"""
+
+
+class RerenderService:
+    """
+    Vuelve a derivar las imágenes de un folder con el spec vigente
+
+    Cada imagen se re-renderiza desde su original (``.originals/``) en el
+    pool de procesos. Los archivos nuevos llevan la versión del spec en el
+    nombre (``<sha256>-<versión>.jpg``) para no chocar con las URLs
+    inmutables ya cacheadas; el contenido que usaba la URL anterior se
+    reescribe y los archivos antiguos se borran tras confirmar cada lote.
+    El progreso se guarda en ``RenditionJob`` (checkpoint por lote), de
+    modo que un trabajo interrumpido se reanuda donde quedó.
+
+    Cada ejecución renueva en cada lote un lease (``runner_id`` y
+    ``heartbeat_at``). Un trabajo en curso solo se puede reanudar cuando
+    su lease caduca, y el ejecutor que lo pierde se detiene sin tocar nada
+    más: nunca hay dos ejecutores procesando el mismo checkpoint.
+    """
+
+    # Espera antes de reintentar si el pool está saturado por subidas
+    BUSY_RETRY_SECONDS = 0.5
+
+    def __init__(self, db: Session, storage: Optional[StorageBackend] = None):
+        self.db = db
+        self.storage = storage or get_storage()
+        self.upload_service = UploadService(db, storage=self.storage)
+
+    def _stale_query(self, folder: str, version: str):
+        """Imágenes del folder derivadas con otro spec (y con original)"""
+        return self.db.query(UploadedFile).filter(
+            UploadedFile.folder == folder,
+            UploadedFile.file_type == "image",
+            UploadedFile.original_path.isnot(None),
+            or_(
+                UploadedFile.rendition_version.is_(None),
+                UploadedFile.rendition_version != version,
+            ),
+        )
+
+    def create_job(self, folder: str, user_id: Optional[int] = None) -> RenditionJob:
+        """
+        Registrar un trabajo para el spec vigente del folder
+
+        Raises:
+            ValueError: Si el folder no es válido
+        """
+        if folder not in UploadService.ALLOWED_FOLDERS:
+            raise ValueError(
+                f"Folder '{folder}' no permitido. Use: {UploadService.ALLOWED_FOLDERS}"
+            )
+        spec = UploadService.folder_spec(folder)
+        job = RenditionJob(
+            folder=folder,
+            spec=spec._asdict(),
+            spec_version=spec.version,
+            status="pending",
+            total=self._stale_query(folder, spec.version).count(),
+            processed=0,
+            failed=0,
+            last_file_id=0,
+            started_by=user_id,
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get_job(self, job_id: int) -> Optional[RenditionJob]:
+        return self.db.get(RenditionJob, job_id)
+
+    def active_job(self, folder: str) -> Optional[RenditionJob]:
+        """Trabajo pendiente o en curso del folder, si lo hay"""
+        return (
+            self.db.query(RenditionJob)
+            .filter(
+                RenditionJob.folder == folder,
+                RenditionJob.status.in_(("pending", "running")),
+            )
+            .first()
+        )
+
+    def claim_for_resume(self, job: RenditionJob) -> bool:
+        """
+        Tomar un trabajo para reanudarlo
+
+        Solo si falló o si su ejecutor no ha renovado el lease en
+        ``RERENDER_LEASE_SECONDS`` (el proceso se detuvo). La actualización
+        es condicional, así que de dos reanudaciones simultáneas solo una
+        lo consigue; el ejecutor anterior, si sigue vivo, pierde el lease.
+
+        Returns:
+            bool: False si el trabajo terminó o sigue en curso
+        """
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=settings.RERENDER_LEASE_SECONDS)
+        claimed = (
+            self.db.query(RenditionJob)
+            .filter(
+                RenditionJob.id == job.id,
+                or_(
+                    RenditionJob.status == "failed",
+                    RenditionJob.status.in_(("pending", "running"))
+                    & (
+                        func.coalesce(
+                            RenditionJob.heartbeat_at, RenditionJob.created_at
+                        )
+                        < cutoff
+                    ),
+                ),
+            )
+            .update(
+                {"status": "pending", "runner_id": None, "heartbeat_at": now},
+                synchronize_session=False,
+            )
+        )
+        self.db.commit()
+        self.db.refresh(job)
+        return bool(claimed)
+
+    def _renew_lease(self, job: RenditionJob, runner_id: str) -> None:
+        """
+        Renovar el lease de ``job`` en la transacción actual
+
+        Raises:
+            RenditionJobLeaseLost: Si otro ejecutor tomó el trabajo
+        """
+        renewed = (
+            self.db.query(RenditionJob)
+            .filter(RenditionJob.id == job.id, RenditionJob.runner_id == runner_id)
+            .update(
+                {"heartbeat_at": datetime.now(timezone.utc)},
+                synchronize_session=False,
+            )
+        )
+        if not renewed:
+            raise RenditionJobLeaseLost(f"El trabajo #{job.id} lo tomó otro ejecutor")
+
+    async def _source_path(self, key: str, directory: Path) -> Path:
+        """Ruta local de ``key`` (descargado si el storage es remoto)"""
+        local = self.storage.local_path(key)
+        if local is not None:
+            return local
+        data = await self.storage.get(key)
+        target = directory / f"source{Path(key).suffix}"
+        await anyio.to_thread.run_sync(target.write_bytes, data)
+        return target
+
+    async def _render(
+        self, db_file: UploadedFile, spec: RenditionSpec, directory: Path
+    ) -> Dict[str, Any]:
+        """
+        Re-renderizar en el pool de procesos y subir el resultado al storage
+
+        Raises:
+            ValueError: Si el original no se pudo procesar
+        """
+        source = await self._source_path(str(db_file.original_path), directory)
+        args = (
+            str(source),
+            str(directory),
+            f"{db_file.content_hash}-{spec.version}",
+            # Tipo del original (un PNG convertido vuelve a evaluarse)
+            _original_mime_type(db_file),
+            spec,
+            self.upload_service.encode_target(str(db_file.folder)),
+            settings.IMAGE_CONVERT_OPAQUE_PNG,
+        )
+        while True:
+            try:
+                result = await get_image_executor().submit(rerender_image, *args)
+                break
+            except ImageExecutorBusyError:
+                # Las subidas de los usuarios tienen prioridad sobre el trabajo
+                await asyncio.sleep(self.BUSY_RETRY_SECONDS)
+        if result is None:
+            raise ValueError("No se pudo procesar el original")
+
+        folder = str(db_file.folder)
+        await self.storage.put_file(
+            f"{folder}/{result['filename']}",
+            directory / result["filename"],
+            result["mime_type"],
+        )
+        result["renditions"] = await self.upload_service.store_renditions(
+            result["renditions"], directory, folder
+        )
+        result["thumbnail"] = await self.upload_service.store_thumbnail(
+            result["thumbnail"],
+            directory,
+            folder,
+            f"{Path(result['filename']).stem}{THUMBNAIL_SUFFIX}",
+        )
+        return result
+
+    def _apply(
+        self, db_file: UploadedFile, spec: RenditionSpec, result: Dict[str, Any]
+    ) -> List[str]:
+        """
+        Actualizar el registro y el contenido que lo referencia
+
+        Returns:
+            list: Claves antiguas a borrar tras el commit
+        """
+        old_keys = [str(db_file.file_path)] + [
+            str(r.file_path) for r in db_file.renditions
+        ]
+        if db_file.thumbnail_path:
+            old_keys.append(str(db_file.thumbnail_path))
+        new_key = f"{db_file.folder}/{result['filename']}"
+
+        db_file.filename = result["filename"]
+        db_file.file_path = new_key
+        db_file.mime_type = result["mime_type"]
+        db_file.file_size = result["file_size"]
+        db_file.rendition_version = spec.version
+        db_file.renditions = result["renditions"]
+        # Sin miniatura nueva se descarta la anterior (su clave se borra)
+        thumbnail = result["thumbnail"] or dict.fromkeys(THUMBNAIL_FIELDS)
+        for field, value in {**result["placeholder"], **thumbnail}.items():
+            setattr(db_file, field, value)
+
+        rewrite_references(self.db, old_keys[0], new_key)
+        return old_keys
+
+    def _apply_batch(
+        self,
+        job: RenditionJob,
+        spec: RenditionSpec,
+        results: List[Tuple[UploadedFile, Any]],
+    ) -> List[str]:
+        """
+        Aplicar los resultados de un lote y contarlos en el trabajo
+
+        Returns:
+            list: Claves antiguas a borrar tras el commit
+        """
+        obsolete: List[str] = []
+        for db_file, result in results:
+            if isinstance(result, Exception):
+                job.failed += 1
+                job.error = f"#{db_file.id}: {result}"
+                continue
+            obsolete.extend(self._apply(db_file, spec, result))
+            job.processed += 1
+        return obsolete
+
+    async def run(self, job: RenditionJob, batch_size: Optional[int] = None) -> None:
+        """
+        Procesar (o reanudar) un trabajo hasta completarlo
+
+        Los archivos se procesan por lotes en paralelo (tantos como workers
+        tenga el pool de imágenes). Cada lote se confirma con un único commit
+        que también guarda el checkpoint; un fallo en un archivo se cuenta y
+        no detiene el trabajo.
+        """
+        batch_size = max(1, batch_size or settings.RERENDER_BATCH_SIZE)
+        spec = RenditionSpec(
+            size=tuple(job.spec["size"]),
+            widths=tuple(job.spec["widths"]),
+            formats=tuple(job.spec["formats"]),
+        )
+        folder = str(job.folder)
+        runner_id = uuid.uuid4().hex
+        job.status = "running"
+        job.error = None
+        job.runner_id = runner_id
+        job.heartbeat_at = datetime.now(timezone.utc)
+        self.db.commit()
+
+        limiter = asyncio.Semaphore(get_image_executor().max_workers)
+        scratch_root = self.upload_service.upload_dir / UploadService.TEMP_FOLDER
+
+        async def process(db_file: UploadedFile) -> Tuple[UploadedFile, Any]:
+            directory = Path(tempfile.mkdtemp(dir=scratch_root))
+            try:
+                async with limiter:
+                    return db_file, await self._render(db_file, spec, directory)
+            except Exception as e:
+                return db_file, e
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+
+        try:
+            while True:
+                # Paginación por clave desde el checkpoint
+                batch = (
+                    self._stale_query(folder, spec.version)
+                    .filter(UploadedFile.id > job.last_file_id)
+                    .options(selectinload(UploadedFile.renditions))
+                    .order_by(UploadedFile.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                if not batch:
+                    break
+
+                results = await asyncio.gather(*(process(f) for f in batch))
+                # Antes de aplicar nada: otro ejecutor pudo tomar el trabajo
+                self._renew_lease(job, runner_id)
+                obsolete = self._apply_batch(job, spec, results)
+                job.last_file_id = batch[-1].id
+                self.db.commit()
+
+                await asyncio.gather(
+                    *(self.storage.delete(key) for key in obsolete),
+                    return_exceptions=True,
+                )
+
+            job.status = "completed"
+            job.finished_at = datetime.now(timezone.utc)
+            self.db.commit()
+        except RenditionJobLeaseLost:
+            # El trabajo es del otro ejecutor: no se toca su estado
+            self.db.rollback()
+            raise
+        except BaseException as e:
+            # El checkpoint del último lote confirmado sigue siendo válido
+            self.db.rollback()
+            job.status = "failed"
+            job.error = str(e) or e.__class__.__name__
+            self.db.commit()
+            raise
+
+    async def _render_thumbnail(
+        self, db_file: UploadedFile, directory: Path
+    ) -> Dict[str, Any]:
+        """Generar la miniatura desde el archivo principal y subirla al storage"""
+        source = await self._source_path(str(db_file.file_path), directory)
+        filename = f"{Path(str(db_file.file_path)).stem}{THUMBNAIL_SUFFIX}"
+        while True:
+            try:
+                thumbnail = await get_image_executor().submit(
+                    make_thumbnail, str(source), str(directory / filename)
+                )
+                break
+            except ImageExecutorBusyError:
+                # Las subidas de los usuarios tienen prioridad sobre el backfill
+                await asyncio.sleep(self.BUSY_RETRY_SECONDS)
+        return await self.upload_service.store_thumbnail(
+            thumbnail, directory, str(db_file.folder), filename
+        )
+
+    async def backfill_thumbnails(
+        self, batch_size: Optional[int] = None, folder: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """
+        Generar la miniatura de las imágenes subidas antes de existir
+
+        Parte del archivo principal (no del original) y no cambia su URL.
+        Procesa por lotes con un commit cada uno; como solo selecciona las
+        imágenes sin miniatura, un backfill interrumpido se reanuda
+        volviendo a ejecutarlo.
+
+        Returns:
+            tuple: (miniaturas generadas, imágenes que fallaron)
+        """
+        batch_size = max(1, batch_size or settings.RERENDER_BATCH_SIZE)
+        limiter = asyncio.Semaphore(get_image_executor().max_workers)
+        scratch_root = self.upload_service.upload_dir / UploadService.TEMP_FOLDER
+
+        async def process(db_file: UploadedFile) -> Dict[str, Any]:
+            directory = Path(tempfile.mkdtemp(dir=scratch_root))
+            try:
+                async with limiter:
+                    return await self._render_thumbnail(db_file, directory)
+            except Exception as e:
+                print(f"Error generating thumbnail for file {db_file.id}: {e}")
+                return {}
+            finally:
+                shutil.rmtree(directory, ignore_errors=True)
+
+        query = self.db.query(UploadedFile).filter(
+            UploadedFile.file_type == "image",
+            UploadedFile.thumbnail_path.is_(None),
+        )
+        if folder is not None:
+            query = query.filter(UploadedFile.folder == folder)
+
+        created = failed = 0
+        last_id = 0
+        while True:
+            # Paginación por clave: los fallidos no se vuelven a seleccionar
+            batch = (
+                query.filter(UploadedFile.id > last_id)
+                .order_by(UploadedFile.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not batch:
+                break
+            results = await asyncio.gather(*(process(f) for f in batch))
+            for db_file, thumbnail in zip(batch, results):
+                if not thumbnail:
+                    failed += 1
+                    continue
+                for field, value in thumbnail.items():
+                    setattr(db_file, field, value)
+                created += 1
+            last_id = batch[-1].id
+            self.db.commit()
+        return created, failed
+
+
+async def run_job(bind: Union[Engine, Connection], job_id: int) -> None:
+    """Ejecutar un trabajo en segundo plano con su propia sesión"""
+    with Session(bind) as db:
+        service = RerenderService(db)
+        job = service.get_job(job_id)
+        if job is None:
+            return
+        try:
+            await service.run(job)
+        except Exception as e:
+            # El estado y el error quedan en el trabajo (se puede reanudar)
+            print(f"Error in rendition job {job_id}: {e}")
+
+
+def _original_mime_type(db_file: UploadedFile) -> str:
+    """Tipo MIME del original guardado (por su extensión)"""
+    extension = Path(str(db_file.original_path)).suffix.lower()
+    return {".png": "image/png", ".webp": "image/webp"}.get(extension, "image/jpeg")
@@ -3,9 +3,11 @@ from typing import Any, Dict, List, Optional
 from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
+from ..core.principal import permission_stamp, principal_cache
 from ..models.permission import Permission
 from ..models.role import Role
 from ..schemas.role import RoleCreate, RoleUpdate
+from .user_service import UserService
 
 
 class RoleService:
@@ -95,6 +97,11 @@ class RoleService:
             return None
 
         update_data = role.model_dump(exclude_unset=True)
+        # Name (admin roles), status and permissions affect its users
+        changed = any(
+            field in update_data and update_data[field] != getattr(db_role, field)
+            for field in ("name", "is_active")
+        )
 
         # Handle permissions separately
         if "permission_ids" in update_data:
@@ -103,12 +110,19 @@ class RoleService:
                 permissions = (
                     db.query(Permission).filter(Permission.id.in_(permission_ids)).all()
                 )
+                changed |= {p.id for p in permissions} != {
+                    p.id for p in db_role.permissions
+                }
                 db_role.permissions = permissions
 
         for field, value in update_data.items():
             setattr(db_role, field, value)
 
+        user_ids = [user.id for user in db_role.users] if changed else []
+        UserService.bump_permissions_version(db, user_ids)
         db.commit()
+        principal_cache.invalidate_users(user_ids)
+        permission_stamp.expire()
         db.refresh(db_role)
         return db_role
 
@@ -117,6 +131,10 @@ class RoleService:
         db_role = db.query(Role).filter(Role.id == role_id).first()
         if not db_role:
             return False
+        user_ids = [user.id for user in db_role.users]
+        UserService.bump_permissions_version(db, user_ids)
         db.delete(db_role)
         db.commit()
+        principal_cache.invalidate_users(user_ids)
+        permission_stamp.expire()
         return True
@@ -0,0 +1,179 @@
+"""
+Servicio de uso de almacenamiento y cuotas
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.image_rendition import ImageRendition
+from app.models.storage_usage import StorageUsage
+from app.models.uploaded_file import UploadedFile
+from app.models.user import User
+
+
+class StorageQuotaError(ValueError):
+    """La subida superaría la cuota del folder o del usuario"""
+
+
+class StorageUsageService:
+    """
+    Consultas sobre los contadores de ``storage_usage`` y cuotas
+
+    Las cuotas (``UPLOAD_FOLDER_QUOTAS`` y ``UPLOAD_USER_QUOTA``, en bytes)
+    se comprueban con el tamaño recibido antes de procesar el archivo; el
+    uso contabiliza los bytes ya almacenados (principal, renditions y
+    miniatura).
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def usage(
+        self, folder: Optional[str] = None, user_id: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """
+        Archivos y bytes activos, opcionalmente de un folder y/o un usuario
+
+        Returns:
+            tuple: (archivos, bytes)
+        """
+        query = self.db.query(
+            func.coalesce(func.sum(StorageUsage.file_count), 0),
+            func.coalesce(func.sum(StorageUsage.total_bytes), 0),
+        )
+        if folder is not None:
+            query = query.filter(StorageUsage.folder == folder)
+        if user_id is not None:
+            query = query.filter(StorageUsage.user_id == user_id)
+        files, size = query.one()
+        return int(files), int(size)
+
+    def check_quota(
+        self, folder: str, user_id: Optional[int] = None, incoming: int = 0
+    ) -> None:
+        """
+        Comprobar que ``incoming`` bytes más caben en las cuotas
+
+        Raises:
+            StorageQuotaError: Si se superaría la cuota del folder o del usuario
+        """
+        folder_quota = settings.UPLOAD_FOLDER_QUOTAS.get(folder)
+        if folder_quota is not None:
+            _, used = self.usage(folder=folder)
+            if used + incoming > folder_quota:
+                raise StorageQuotaError(
+                    f"Cuota del folder '{folder}' superada "
+                    f"({used + incoming} de {folder_quota} bytes)"
+                )
+
+        user_quota = settings.UPLOAD_USER_QUOTA
+        if user_quota is not None and user_id is not None:
+            _, used = self.usage(user_id=user_id)
+            if used + incoming > user_quota:
+                raise StorageQuotaError(
+                    f"Cuota del usuario superada ({used + incoming} de "
+                    f"{user_quota} bytes)"
+                )
+
+    def report(self) -> Dict[str, Any]:
+        """Uso total, por folder (con desglose por tipo) y por usuario"""
+        rows = self.db.query(StorageUsage).all()
+
+        folders: Dict[str, Dict[str, Any]] = {}
+        users: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            folder = folders.setdefault(
+                row.folder,
+                {
+                    "folder": row.folder,
+                    "files": 0,
+                    "bytes": 0,
+                    "quota": settings.UPLOAD_FOLDER_QUOTAS.get(row.folder),
+                    "by_type": {},
+                },
+            )
+            by_type = folder["by_type"].setdefault(
+                row.file_type, {"files": 0, "bytes": 0}
+            )
+            user = users.setdefault(
+                row.user_id,
+                {
+                    "user_id": row.user_id or None,
+                    "username": None,
+                    "files": 0,
+                    "bytes": 0,
+                    "quota": settings.UPLOAD_USER_QUOTA if row.user_id else None,
+                },
+            )
+            for counter in (folder, by_type, user):
+                counter["files"] += row.file_count
+                counter["bytes"] += row.total_bytes
+
+        usernames = dict(
+            self.db.query(User.id, User.username).filter(User.id.in_(users)).all()
+        )
+        for user_id, user in users.items():
+            user["username"] = usernames.get(user_id)
+
+        return {
+            "files": sum(f["files"] for f in folders.values()),
+            "bytes": sum(f["bytes"] for f in folders.values()),
+            "folders": sorted(folders.values(), key=lambda f: f["folder"]),
+            "users": sorted(users.values(), key=lambda u: -u["bytes"]),
+        }
+
+    def rebuild(self) -> int:
+        """
+        Recalcular los contadores desde ``uploaded_files``
+
+        Necesario tras escrituras que no pasan por el ORM.
+
+        Returns:
+            int: Número de contadores escritos
+        """
+        rendition_bytes = (
+            select(
+                ImageRendition.uploaded_file_id,
+                func.sum(ImageRendition.file_size).label("bytes"),
+            )
+            .group_by(ImageRendition.uploaded_file_id)
+            .subquery()
+        )
+        user_id = func.coalesce(UploadedFile.uploaded_by, 0)
+        rows: List[Dict[str, Any]] = [
+            {
+                "folder": folder,
+                "user_id": user,
+                "file_type": file_type,
+                "file_count": files,
+                "total_bytes": int(size or 0),
+            }
+            for folder, user, file_type, files, size in self.db.execute(
+                select(
+                    UploadedFile.folder,
+                    user_id,
+                    UploadedFile.file_type,
+                    func.count(UploadedFile.id),
+                    func.sum(
+                        UploadedFile.file_size
+                        + func.coalesce(UploadedFile.thumbnail_size, 0)
+                        + func.coalesce(rendition_bytes.c.bytes, 0)
+                    ),
+                )
+                .outerjoin(
+                    rendition_bytes,
+                    rendition_bytes.c.uploaded_file_id == UploadedFile.id,
+                )
+                .where(UploadedFile.is_active.is_(True))
+                .group_by(UploadedFile.folder, user_id, UploadedFile.file_type)
+            )
+        ]
+
+        self.db.query(StorageUsage).delete(synchronize_session=False)
+        if rows:
+            self.db.execute(StorageUsage.__table__.insert(), rows)
+        self.db.commit()
+        return len(rows)
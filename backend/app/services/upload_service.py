@@ -2,16 +2,43 @@
 Servicio para gestión de archivos subidos
 """
 
+import asyncio
 import hashlib
-from io import BytesIO
+import os
+import shutil
+import tempfile
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Collection, Dict, List, Optional, Tuple
 
+import anyio
 from fastapi import UploadFile
-from PIL import Image
-from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, load_only, selectinload
 
+from app.core.config import settings
+from app.core.image_executor import get_image_executor
+from app.core.storage import LocalStorage, StorageBackend, get_storage
+from app.models.image_rendition import ImageRendition
 from app.models.uploaded_file import UploadedFile
+from app.services.storage_usage_service import StorageUsageService
+from app.utils.images import (
+    FOLDER_BYTE_BUDGETS,
+    FOLDER_TARGET_SIZES,
+    RENDITION_FORMATS,
+    RENDITION_WIDTHS,
+    THUMBNAIL_SUFFIX,
+    EncodeTarget,
+    RenditionSpec,
+    generate_renditions,
+    image_placeholder,
+    make_thumbnail,
+    resize_image,
+)
+from app.utils.mp4 import faststart, read_metadata
+
+# Archivo de un lote copiado a disco:
+# (ruta temporal, hash SHA-256, tamaño, tipo MIME, tipo de archivo)
+StagedFile = Tuple[Path, str, int, str, str]
 
 
 class UploadService:
@@ -28,20 +55,57 @@ class UploadService:
     MAX_IMAGE_SIZE = 20 * 1024 * 1024  # 20MB
     MAX_VIDEO_SIZE = 100 * 1024 * 1024  # 100MB
 
-    def __init__(self, db: Session, upload_dir: str = "uploads"):
+    # Tamaño de bloque para lectura en streaming (memoria acotada por subida)
+    CHUNK_SIZE = 1024 * 1024  # 1MB
+
+    # Directorio temporal local (dentro de upload_dir: con almacenamiento
+    # local el paso al destino final es un rename atómico)
+    TEMP_FOLDER = ".tmp"
+
+    # Almacén direccionado por contenido de los originales (SHA-256 completo).
+    # Es un directorio interno: los originales conservan EXIF/GPS y no se
+    # sirven en /uploads
+    ORIGINALS_FOLDER = ".originals"
+    # Ubicación anterior de los originales (filas existentes); tampoco se sirve
+    LEGACY_ORIGINALS_FOLDER = "originals"
+
+    # Máximo de archivos por subida múltiple
+    MAX_BATCH_FILES = 50
+
+    # Columnas del listado compacto (rejilla de miniaturas)
+    LIST_COLUMNS = (
+        "id",
+        "original_filename",
+        "file_type",
+        "mime_type",
+        "file_size",
+        "file_path",
+        "width",
+        "height",
+        "dominant_color",
+        "thumbnail_path",
+        "thumbnail_width",
+        "thumbnail_height",
+        "created_at",
+    )
+
+    def __init__(
+        self,
+        db: Session,
+        upload_dir: Optional[str] = None,
+        storage: Optional[StorageBackend] = None,
+    ):
         self.db = db
-        self.upload_dir = Path(upload_dir)
+        # Directorio local de trabajo (temporales y sesiones de subida)
+        self.upload_dir = Path(upload_dir or settings.UPLOAD_DIR)
+        if storage is None:
+            storage = LocalStorage(upload_dir) if upload_dir else get_storage()
+        self.storage = storage
         self._ensure_directories()
 
     def _ensure_directories(self) -> None:
         """Crear directorios necesarios"""
-        for folder in self.ALLOWED_FOLDERS:
-            folder_path = self.upload_dir / folder
-            folder_path.mkdir(parents=True, exist_ok=True)
-
-    def _calculate_file_hash(self, file_content: bytes) -> str:
-        """Calcular hash SHA-256 del contenido del archivo"""
-        return hashlib.sha256(file_content).hexdigest()
+        (self.upload_dir / self.TEMP_FOLDER).mkdir(parents=True, exist_ok=True)
 
     def _get_file_extension(self, filename: str) -> str:
         """Obtener extensión del archivo"""
@@ -54,105 +118,264 @@ class UploadService:
     ) -> str:
         """Generar nombre único para el archivo basado en hash"""
         extension = self._get_file_extension(original_filename)
-        # Usar los primeros 12 caracteres del hash + extensión original
-        return f"{file_hash[:12]}{extension}"
+        # Hash SHA-256 completo del original + extensión original
+        return f"{file_hash}{extension}"
+
+    def _original_relative_path(self, file_hash: str, extension: str) -> str:
+        """Ruta del original en el almacén: .originals/ab/cd/<sha256><ext>"""
+        return (
+            f"{self.ORIGINALS_FOLDER}/{file_hash[:2]}/{file_hash[2:4]}/"
+            f"{file_hash}{extension}"
+        )
 
-    def _check_duplicate(self, file_path: str) -> Optional[UploadedFile]:
-        """Verificar si ya existe un archivo con la misma ruta"""
+    def _find_by_hash(self, file_hash: str, folder: str) -> Optional[UploadedFile]:
+        """Buscar un archivo del folder con el mismo contenido original"""
         return (
             self.db.query(UploadedFile)
             .filter(
-                UploadedFile.file_path == file_path, UploadedFile.is_active.is_(True)
+                UploadedFile.content_hash == file_hash,
+                UploadedFile.folder == folder,
             )
             .first()
         )
 
-    def _resize_image(self, image_content: bytes, folder: str, mime_type: str) -> bytes:
+    async def _store_original(
+        self, temp_path: Path, relative_path: str, mime_type: str
+    ) -> None:
         """
-        Redimensionar imagen según el folder de destino
+        Guardar el original en el almacén direccionado por contenido
 
-        Args:
-            image_content: Contenido de la imagen
-            folder: Carpeta destino (hero/services/projects)
-            mime_type: Tipo MIME de la imagen
+        Si otro folder ya guardó el mismo contenido, se reutiliza ese archivo
+        y el temporal se descarta.
+        """
+        if not await self.storage.exists(relative_path):
+            await self.storage.put_file(relative_path, temp_path, mime_type)
+
+    @staticmethod
+    def folder_spec(folder: str) -> RenditionSpec:
+        """
+        Spec de renditions vigente para un folder
+
+        FOLDER_TARGET_SIZES con los cambios de IMAGE_FOLDER_SIZES,
+        IMAGE_RENDITION_WIDTHS e IMAGE_RENDITION_FORMATS (los formatos
+        desconocidos se ignoran).
+        """
+        size = settings.IMAGE_FOLDER_SIZES.get(folder) or FOLDER_TARGET_SIZES.get(
+            folder, (1920, 1080)
+        )
+        formats = tuple(
+            f.upper()
+            for f in settings.IMAGE_RENDITION_FORMATS
+            if f.upper() in RENDITION_FORMATS
+        )
+        return RenditionSpec(
+            size=(int(size[0]), int(size[1])),
+            widths=tuple(settings.IMAGE_RENDITION_WIDTHS or RENDITION_WIDTHS),
+            formats=formats,
+        )
+
+    def encode_target(self, folder: str) -> Optional[EncodeTarget]:
+        """Objetivo de calidad según IMAGE_QUALITY_MODE (None = calidad fija)"""
+        mode = settings.IMAGE_QUALITY_MODE
+        if mode == "ssim":
+            return EncodeTarget(ssim=settings.IMAGE_SSIM_TARGET)
+        if mode == "budget" and folder in FOLDER_BYTE_BUDGETS:
+            return EncodeTarget(max_bytes=FOLDER_BYTE_BUDGETS[folder])
+        return None
+
+    async def _resize_image(
+        self, source_path: Path, folder: str, mime_type: str
+    ) -> Optional[Tuple[bytes, str]]:
+        """
+        Redimensionar imagen en el pool de procesos (sin bloquear el event loop)
 
         Returns:
-            bytes: Contenido de la imagen redimensionada
+            tuple: (contenido, tipo MIME); un PNG opaco puede salir como JPEG
+
+        Raises:
+            ImageExecutorBusyError: Si la cola del pool está llena
         """
-        # Definir tamaños objetivo por folder
-        target_sizes = {
-            "hero": (1920, 1080),  # 16:9 para hero images
-            "services": (800, 600),  # 4:3 para servicios
-            "projects": (1200, 800),  # 3:2 para proyectos
-        }
+        return await get_image_executor().submit(
+            resize_image,
+            str(source_path),
+            folder,
+            mime_type,
+            self.encode_target(folder),
+            settings.IMAGE_CONVERT_OPAQUE_PNG,
+            self.folder_spec(folder).size,
+        )
 
-        target_size = target_sizes.get(folder, (1920, 1080))
+    async def _image_placeholder(self, path: Path) -> Dict[str, Any]:
+        """
+        Dimensiones, color dominante, BlurHash y LQIP del archivo principal
 
-        try:
-            # Abrir imagen
-            img = Image.open(BytesIO(image_content))
-
-            # Convertir a RGB si es necesario (para JPG)
-            if img.mode in ("RGBA", "LA", "P"):
-                # Crear fondo blanco para transparencias
-                background = Image.new("RGB", img.size, (255, 255, 255))
-                if img.mode == "P":
-                    img = img.convert("RGBA")
-                background.paste(
-                    img, mask=img.split()[-1] if img.mode == "RGBA" else None
+        Raises:
+            ImageExecutorBusyError: Si la cola del pool está llena
+        """
+        return await get_image_executor().submit(image_placeholder, str(path)) or {}
+
+    async def _prepare_mp4(self, path: Path) -> Dict[str, Any]:
+        """
+        Mover el moov delante del mdat (faststart) y leer duración/tamaño/códec
+
+        Se ejecuta en un hilo: es E/S de disco, no CPU.
+        """
+
+        def process() -> Dict[str, Any]:
+            faststart(str(path))
+            return read_metadata(str(path)) or {}
+
+        return await anyio.to_thread.run_sync(process)
+
+    async def _create_renditions(
+        self, main_path: Path, folder: str, mime_type: str
+    ) -> List[ImageRendition]:
+        """
+        Generar el set responsive (varios anchos, formato original + WebP/AVIF)
+
+        El pool de procesos escribe ``<nombre>-<ancho>w.<ext>`` junto al
+        archivo principal (directorio temporal) y luego se suben al storage.
+        """
+        spec = self.folder_spec(folder)
+        renditions = await get_image_executor().submit(
+            generate_renditions,
+            str(main_path),
+            str(main_path.parent),
+            main_path.stem,
+            mime_type,
+            self.encode_target(folder),
+            spec.widths,
+            spec.formats,
+        )
+        return await self.store_renditions(renditions, main_path.parent, folder)
+
+    async def store_renditions(
+        self, renditions: List[Dict[str, Any]], directory: Path, folder: str
+    ) -> List[ImageRendition]:
+        """Subir al storage las renditions escritas en ``directory``"""
+        db_renditions = []
+        for r in renditions:
+            relative_path = f"{folder}/{r['filename']}"
+            await self.storage.put_file(
+                relative_path, directory / r["filename"], r["mime_type"]
+            )
+            db_renditions.append(
+                ImageRendition(
+                    width=r["width"],
+                    height=r["height"],
+                    format=r["format"],
+                    mime_type=r["mime_type"],
+                    file_path=relative_path,
+                    file_size=r["file_size"],
                 )
-                img = background
-            elif img.mode != "RGB":
-                img = img.convert("RGB")
-
-            # Calcular dimensiones manteniendo aspect ratio
-            img_ratio = img.width / img.height
-            target_ratio = target_size[0] / target_size[1]
-
-            if img_ratio > target_ratio:
-                # Imagen más ancha, ajustar por altura
-                new_height = target_size[1]
-                new_width = int(new_height * img_ratio)
-            else:
-                # Imagen más alta, ajustar por ancho
-                new_width = target_size[0]
-                new_height = int(new_width / img_ratio)
-
-            # Redimensionar
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-            # Recortar al tamaño objetivo (centrado)
-            left = (new_width - target_size[0]) // 2
-            top = (new_height - target_size[1]) // 2
-            right = left + target_size[0]
-            bottom = top + target_size[1]
-
-            img = img.crop((left, top, right, bottom))
-
-            # Guardar en BytesIO
-            output = BytesIO()
-
-            # Determinar formato de salida
-            format_map = {
-                "image/jpeg": "JPEG",
-                "image/jpg": "JPEG",
-                "image/png": "PNG",
-                "image/webp": "WEBP",
-            }
-            output_format = format_map.get(mime_type, "JPEG")
+            )
+        return db_renditions
 
-            # Guardar con calidad optimizada
-            if output_format == "JPEG":
-                img.save(output, format=output_format, quality=85, optimize=True)
-            else:
-                img.save(output, format=output_format, optimize=True)
+    async def _create_thumbnail(self, main_path: Path, folder: str) -> Dict[str, Any]:
+        """
+        Generar y subir la miniatura del archivo principal
 
-            return output.getvalue()
+        Raises:
+            ImageExecutorBusyError: Si la cola del pool está llena
+        """
+        filename = f"{main_path.stem}{THUMBNAIL_SUFFIX}"
+        thumbnail = await get_image_executor().submit(
+            make_thumbnail, str(main_path), str(main_path.parent / filename)
+        )
+        return await self.store_thumbnail(thumbnail, main_path.parent, folder, filename)
 
-        except Exception as e:
-            # Si falla el redimensionamiento, retornar contenido original
-            print(f"Error resizing image: {e}")
-            return image_content
+    async def store_thumbnail(
+        self,
+        thumbnail: Optional[Dict[str, int]],
+        directory: Path,
+        folder: str,
+        filename: str,
+    ) -> Dict[str, Any]:
+        """
+        Subir al storage la miniatura escrita en ``directory``
+
+        Returns:
+            dict: Columnas thumbnail_* del registro (vacío si no se generó)
+        """
+        if thumbnail is None:
+            return {}
+        relative_path = f"{folder}/{filename}"
+        # Antes de subirla: el storage local mueve el archivo
+        size = (directory / filename).stat().st_size
+        await self.storage.put_file(relative_path, directory / filename, "image/webp")
+        return {
+            "thumbnail_path": relative_path,
+            "thumbnail_width": thumbnail["width"],
+            "thumbnail_height": thumbnail["height"],
+            "thumbnail_size": size,
+        }
+
+    def _validate_upload(self, folder: str, file_type: str, mime_type: str) -> int:
+        """
+        Validar folder y tipo de archivo antes de leer el contenido
+
+        Returns:
+            int: Tamaño máximo permitido en bytes para el archivo
+        """
+        if file_type == "image":
+            if mime_type not in self.ALLOWED_IMAGE_TYPES:
+                raise ValueError(f"Tipo de imagen no permitido: {mime_type}")
+            return self.MAX_IMAGE_SIZE
+
+        if file_type == "video":
+            if folder != "projects":
+                raise ValueError("Videos solo permitidos en folder 'projects'")
+            if mime_type not in self.ALLOWED_VIDEO_TYPES:
+                raise ValueError(f"Tipo de video no permitido: {mime_type}")
+            return self.MAX_VIDEO_SIZE
+
+        raise ValueError(f"Tipo de archivo no soportado: {mime_type}")
+
+    def _size_error(self, file_type: str, file_size: int, max_size: int) -> ValueError:
+        """Construir error de tamaño excedido"""
+        label = "Imagen" if file_type == "image" else "Video"
+        return ValueError(f"{label} muy grande: {file_size} bytes (máx {max_size})")
+
+    def _temp_path(self) -> Path:
+        """Crear un archivo temporal vacío dentro de upload_dir"""
+        fd, name = tempfile.mkstemp(dir=self.upload_dir / self.TEMP_FOLDER)
+        os.close(fd)
+        return Path(name)
+
+    async def stream_to_temp(
+        self, file: UploadFile, file_type: str, max_size: int
+    ) -> Tuple[Path, str, int]:
+        """
+        Copiar la subida a un archivo temporal por bloques
+
+        Calcula el SHA-256 mientras escribe y aborta en cuanto se supera el
+        tamaño máximo, de modo que la memoria usada no depende del tamaño
+        del archivo.
+
+        Returns:
+            tuple: (ruta temporal, hash SHA-256, tamaño en bytes)
+        """
+        # Rechazar sin leer si el tamaño ya es conocido
+        if file.size is not None and file.size > max_size:
+            raise self._size_error(file_type, file.size, max_size)
+
+        temp_path = self._temp_path()
+        hasher = hashlib.sha256()
+        file_size = 0
+
+        try:
+            with open(temp_path, "wb") as out:
+                while chunk := await file.read(self.CHUNK_SIZE):
+                    file_size += len(chunk)
+                    if file_size > max_size:
+                        raise self._size_error(file_type, file_size, max_size)
+                    hasher.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        return temp_path, hasher.hexdigest(), file_size
 
     async def save_file(
         self,
@@ -173,6 +396,8 @@ class UploadService:
 
         Raises:
             ValueError: Si el folder no es válido o el archivo no es permitido
+            StorageQuotaError: Si el archivo supera la cuota del folder o usuario
+            ImageExecutorBusyError: Si el pool de imágenes está saturado
         """
         # Validar folder
         if folder not in self.ALLOWED_FOLDERS:
@@ -180,78 +405,366 @@ class UploadService:
                 f"Folder '{folder}' no permitido. Use: {self.ALLOWED_FOLDERS}"
             )
 
-        # Leer contenido del archivo
-        file_content = await file.read()
-        file_size = len(file_content)
-
-        # Validar tipo y tamaño
+        # Validar tipo y cuota antes de leer el contenido
         mime_type = file.content_type or "application/octet-stream"
         file_type = self._get_file_type(mime_type)
+        max_size = self._validate_upload(folder, file_type, mime_type)
+        quotas = StorageUsageService(self.db)
+        quotas.check_quota(folder, user_id, file.size or 0)
 
-        if file_type == "image":
-            if mime_type not in self.ALLOWED_IMAGE_TYPES:
-                raise ValueError(f"Tipo de imagen no permitido: {mime_type}")
-            if file_size > self.MAX_IMAGE_SIZE:
-                raise ValueError(
-                    f"Imagen muy grande: {file_size} bytes (máx {self.MAX_IMAGE_SIZE})"
+        # Copiar a disco por bloques (hash y límite de tamaño en streaming)
+        temp_path, file_hash, file_size = await self.stream_to_temp(
+            file, file_type, max_size
+        )
+
+        try:
+            if file.size is None:
+                # Tamaño desconocido hasta copiarlo: antes de decodificar nada
+                quotas.check_quota(folder, user_id, file_size)
+            return await self.ingest_file(
+                temp_path=temp_path,
+                file_hash=file_hash,
+                file_size=file_size,
+                original_filename=file.filename or "unknown",
+                mime_type=mime_type,
+                file_type=file_type,
+                folder=folder,
+                user_id=user_id,
+            )
+        finally:
+            temp_path.unlink(missing_ok=True)
+
+    async def save_files(
+        self,
+        files: List[UploadFile],
+        folder: str,
+        user_id: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Guardar varios archivos en una sola transacción
+
+        Cada archivo se valida y se copia a disco por separado; los válidos
+        se procesan en paralelo (como máximo tantos como workers tenga el
+        pool de imágenes, para no saturar su cola) y todos los registros
+        nuevos se confirman con un único commit.
+
+        Returns:
+            list: Un resultado por archivo y en el mismo orden, con
+            filename, status ("created", "duplicate" o "error"), file y error
+
+        Raises:
+            ValueError: Si el folder no es válido o el número de archivos no
+            está entre 1 y MAX_BATCH_FILES
+            StorageQuotaError: Si el lote supera la cuota del folder o usuario
+        """
+        if folder not in self.ALLOWED_FOLDERS:
+            raise ValueError(
+                f"Folder '{folder}' no permitido. Use: {self.ALLOWED_FOLDERS}"
+            )
+        if not files or len(files) > self.MAX_BATCH_FILES:
+            raise ValueError(
+                f"Se permiten entre 1 y {self.MAX_BATCH_FILES} archivos por subida"
+            )
+        StorageUsageService(self.db).check_quota(
+            folder, user_id, sum(file.size or 0 for file in files)
+        )
+
+        results: List[Dict[str, Any]] = [
+            {
+                "filename": file.filename or "unknown",
+                "status": "error",
+                "file": None,
+                "error": None,
+            }
+            for file in files
+        ]
+        staged: Dict[int, StagedFile] = {}
+
+        async def stage(index: int, file: UploadFile) -> None:
+            try:
+                staged[index] = await self._stage_batch_file(file, folder)
+            except Exception as e:
+                # Un archivo que no se puede validar o leer no aborta el lote
+                results[index]["error"] = str(e)
+
+        limiter = asyncio.Semaphore(get_image_executor().max_workers)
+        try:
+            await asyncio.gather(*(stage(i, f) for i, f in enumerate(files)))
+            first_by_hash, repeated = self._split_repeated(staged)
+            await asyncio.gather(
+                *(
+                    self._ingest_batch_file(
+                        staged[i], results[i], folder, user_id, limiter
+                    )
+                    for i in first_by_hash.values()
                 )
+            )
+        finally:
+            for temp_path, *_ in staged.values():
+                temp_path.unlink(missing_ok=True)
 
-            # Redimensionar imagen automáticamente
-            file_content = self._resize_image(file_content, folder, mime_type)
-            file_size = len(
-                file_content
-            )  # Actualizar tamaño después del redimensionamiento
+        self._commit_batch(results, folder)
 
-        elif file_type == "video":
-            if folder != "projects":
-                raise ValueError("Videos solo permitidos en folder 'projects'")
-            if mime_type not in self.ALLOWED_VIDEO_TYPES:
-                raise ValueError(f"Tipo de video no permitido: {mime_type}")
-            if file_size > self.MAX_VIDEO_SIZE:
-                raise ValueError(
-                    f"Video muy grande: {file_size} bytes (máx {self.MAX_VIDEO_SIZE})"
+        for index, first in repeated.items():
+            results[index]["file"] = results[first]["file"]
+            results[index]["error"] = results[first]["error"]
+            if results[first]["file"] is not None:
+                results[index]["status"] = "duplicate"
+        return results
+
+    async def _stage_batch_file(self, file: UploadFile, folder: str) -> StagedFile:
+        """Validar un archivo del lote y copiarlo a un temporal"""
+        mime_type = file.content_type or "application/octet-stream"
+        file_type = self._get_file_type(mime_type)
+        max_size = self._validate_upload(folder, file_type, mime_type)
+        temp_path, file_hash, file_size = await self.stream_to_temp(
+            file, file_type, max_size
+        )
+        return temp_path, file_hash, file_size, mime_type, file_type
+
+    @staticmethod
+    def _split_repeated(
+        staged: Dict[int, StagedFile]
+    ) -> Tuple[Dict[str, int], Dict[int, int]]:
+        """
+        Mismo contenido repetido dentro del lote: se procesa una vez
+
+        Returns:
+            tuple: (hash -> índice que se procesa, índice repetido -> ese índice)
+        """
+        first_by_hash: Dict[str, int] = {}
+        repeated: Dict[int, int] = {}
+        for index in sorted(staged):
+            file_hash = staged[index][1]
+            if file_hash in first_by_hash:
+                repeated[index] = first_by_hash[file_hash]
+            else:
+                first_by_hash[file_hash] = index
+        return first_by_hash, repeated
+
+    async def _ingest_batch_file(
+        self,
+        staged_file: StagedFile,
+        result: Dict[str, Any],
+        folder: str,
+        user_id: Optional[int],
+        limiter: asyncio.Semaphore,
+    ) -> None:
+        """Registrar un archivo del lote (sin commit) y anotar su resultado"""
+        temp_path, file_hash, file_size, mime_type, file_type = staged_file
+        try:
+            async with limiter:
+                db_file = await self.ingest_file(
+                    temp_path=temp_path,
+                    file_hash=file_hash,
+                    file_size=file_size,
+                    original_filename=result["filename"],
+                    mime_type=mime_type,
+                    file_type=file_type,
+                    folder=folder,
+                    user_id=user_id,
+                    commit=False,
                 )
-        else:
-            raise ValueError(f"Tipo de archivo no soportado: {mime_type}")
+        except Exception as e:
+            result["error"] = str(e)
+            return
+        result["file"] = db_file
+        result["status"] = "created" if db_file in self.db.new else "duplicate"
 
-        # Calcular hash para detección de duplicados (después del redimensionamiento)
-        file_hash = self._calculate_file_hash(file_content)
-        original_filename = file.filename or "unknown"
-        unique_filename = self._generate_unique_filename(original_filename, file_hash)
+    def _commit_batch(self, results: List[Dict[str, Any]], folder: str) -> None:
+        """Confirmar los registros del lote y cargarlos en una sola consulta"""
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Otra petición registró el mismo contenido a la vez: el rollback
+            # descarta todo el lote, así que se rehace registro a registro
+            self.db.rollback()
+            for result in results:
+                db_file = result["file"]
+                if db_file is None:
+                    continue
+                if result["status"] == "created":
+                    existing = self._find_by_hash(str(db_file.content_hash), folder)
+                    if existing is None:
+                        self.db.add(db_file)
+                        self.db.commit()
+                        continue
+                    result.update(file=existing, status="duplicate")
+                    db_file = existing
+                setattr(db_file, "is_active", True)
+            self.db.commit()
+
+        # Recargar todos los registros (con renditions) en un único SELECT
+        ids = {r["file"].id for r in results if r["file"] is not None}
+        if ids:
+            (
+                self.db.query(UploadedFile)
+                .options(selectinload(UploadedFile.renditions))
+                .filter(UploadedFile.id.in_(ids))
+                .populate_existing()
+                .all()
+            )
+
+    async def ingest_file(
+        self,
+        temp_path: Path,
+        file_hash: str,
+        file_size: int,
+        original_filename: str,
+        mime_type: str,
+        file_type: str,
+        folder: str,
+        user_id: Optional[int] = None,
+        commit: bool = True,
+    ) -> UploadedFile:
+        """
+        Registrar un archivo ya copiado a disco y validado
 
-        # Construir path relativo
-        relative_path = f"{folder}/{unique_filename}"
-        full_path = self.upload_dir / relative_path
+        La detección de duplicados usa el SHA-256 completo del original y
+        ocurre antes de decodificar nada: un re-upload no paga Pillow.
 
-        # Verificar si ya existe (por path)
-        existing_file = self._check_duplicate(str(relative_path))
+        Con ``commit=False`` el registro solo se añade a la sesión: el
+        llamador confirma varios archivos en una única transacción.
+        """
+        # Verificar si ya existe (por hash del contenido original)
+        existing_file = self._find_by_hash(file_hash, folder)
         if existing_file:
-            # Archivo duplicado, retornar el existente
-            return existing_file
+            return self._reactivate(existing_file, commit)
+
+        extension = self._get_file_extension(original_filename)
+        unique_filename = self._generate_unique_filename(original_filename, file_hash)
+        # Columnas que dependen del procesado (un PNG opaco puede guardarse
+        # como JPEG; dimensiones y placeholders o duración/códec)
+        record: Dict[str, Any] = {
+            "filename": unique_filename,
+            "file_path": f"{folder}/{unique_filename}",
+            "mime_type": mime_type,
+            "file_size": file_size,
+            "original_path": None,
+        }
+        renditions: List[ImageRendition] = []
 
-        # Guardar archivo físico
-        with open(full_path, "wb") as f:
-            f.write(file_content)
+        if file_type == "image":
+            renditions = await self._store_image(
+                temp_path, file_hash, extension, folder, record
+            )
+        else:
+            if mime_type == "video/mp4":
+                record.update(await self._prepare_mp4(temp_path))
+                record["file_size"] = temp_path.stat().st_size
+            await self.storage.put_file(record["file_path"], temp_path, mime_type)
 
         # Crear registro en DB
         db_file = UploadedFile(
-            filename=unique_filename,
-            original_filename=file.filename,
-            file_path=str(relative_path),
+            original_filename=original_filename,
             file_type=file_type,
-            mime_type=mime_type,
-            file_size=file_size,
             folder=folder,
+            content_hash=file_hash,
             uploaded_by=user_id,
             is_active=True,
+            **record,
         )
 
+        db_file.renditions = renditions
+
         self.db.add(db_file)
-        self.db.commit()
+        if not commit:
+            return db_file
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Subida concurrente del mismo contenido: gana el primer registro
+            self.db.rollback()
+            existing_file = self._find_by_hash(file_hash, folder)
+            if existing_file is None:
+                raise
+            return existing_file
         self.db.refresh(db_file)
 
         return db_file
 
+    def _reactivate(self, existing_file: UploadedFile, commit: bool) -> UploadedFile:
+        """Reutilizar el registro del mismo contenido, reactivándolo si hace falta"""
+        if not existing_file.is_active:
+            # Reactivar el registro soft-deleted (los archivos siguen en disco)
+            setattr(existing_file, "is_active", True)
+            if commit:
+                self.db.commit()
+                self.db.refresh(existing_file)
+        return existing_file
+
+    async def _store_image(
+        self,
+        temp_path: Path,
+        file_hash: str,
+        extension: str,
+        folder: str,
+        record: Dict[str, Any],
+    ) -> List[ImageRendition]:
+        """
+        Guardar el derivado de una imagen nueva y su original
+
+        Actualiza ``record`` con las columnas que cambian al procesarla.
+
+        Returns:
+            list: Renditions del derivado (vacía si no se pudo procesar)
+        """
+        mime_type = record["mime_type"]
+        # Un único original por contenido; cada folder deriva de él
+        record["original_path"] = self._original_relative_path(file_hash, extension)
+        renditions: List[ImageRendition] = []
+
+        scratch_dir = Path(tempfile.mkdtemp(dir=self.upload_dir / self.TEMP_FOLDER))
+        try:
+            # Redimensionar imagen automáticamente
+            resized = await self._resize_image(temp_path, folder, mime_type)
+
+            if resized is not None:
+                main_path, renditions = await self._derive_image(
+                    resized, scratch_dir, file_hash, folder, record
+                )
+            else:
+                # No se pudo procesar: el derivado es una copia del original
+                main_path = scratch_dir / record["filename"]
+                shutil.copyfile(temp_path, main_path)
+
+            # Guardar archivo físico
+            await self.storage.put_file(
+                record["file_path"], main_path, record["mime_type"]
+            )
+            await self._store_original(temp_path, record["original_path"], mime_type)
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+        return renditions
+
+    async def _derive_image(
+        self,
+        resized: Tuple[bytes, str],
+        scratch_dir: Path,
+        file_hash: str,
+        folder: str,
+        record: Dict[str, Any],
+    ) -> Tuple[Path, List[ImageRendition]]:
+        """Escribir el derivado redimensionado con sus renditions y metadatos"""
+        resized_content, stored_mime_type = resized
+        if stored_mime_type != record["mime_type"]:
+            record["filename"] = file_hash + next(
+                ext
+                for mime, ext in RENDITION_FORMATS.values()
+                if mime == stored_mime_type
+            )
+            record["file_path"] = f"{folder}/{record['filename']}"
+        record["mime_type"] = stored_mime_type
+        record["file_size"] = len(resized_content)
+
+        main_path = scratch_dir / record["filename"]
+        main_path.write_bytes(resized_content)
+        renditions = await self._create_renditions(main_path, folder, stored_mime_type)
+        record.update(await self._image_placeholder(main_path))
+        record.update(await self._create_thumbnail(main_path, folder))
+        record["rendition_version"] = self.folder_spec(folder).version
+        return main_path, renditions
+
     def _get_file_type(self, mime_type: str) -> str:
         """Determinar tipo de archivo desde mime_type"""
         if mime_type in self.ALLOWED_IMAGE_TYPES:
@@ -266,10 +779,15 @@ class UploadService:
         folder: str,
         skip: int = 0,
         limit: int = 100,
+        compact: bool = False,
     ) -> tuple[List[UploadedFile], int]:
         """
         Obtener archivos de una carpeta específica
 
+        Con ``compact`` solo se cargan las columnas del listado compacto
+        (``LIST_COLUMNS``), sin el LQIP, el BlurHash ni los metadatos de
+        vídeo.
+
         Returns:
             tuple: (lista de archivos, total)
         """
@@ -279,6 +797,12 @@ class UploadService:
         )
 
         total = query.count()
+        if compact:
+            query = query.options(
+                load_only(*(getattr(UploadedFile, c) for c in self.LIST_COLUMNS))
+            )
+        else:
+            query = query.options(selectinload(UploadedFile.renditions))
         files = (
             query.order_by(UploadedFile.created_at.desc())
             .offset(skip)
@@ -314,7 +838,31 @@ class UploadService:
 
         return True
 
-    def delete_file_permanent(self, file_id: int) -> bool:
+    def storage_keys(
+        self, db_file: UploadedFile, deleting_ids: Collection[int] = ()
+    ) -> List[str]:
+        """
+        Claves de almacenamiento que se liberan al eliminar ``db_file``
+
+        Archivo principal, renditions y miniatura; el original solo si
+        ningún otro registro (fuera de ``deleting_ids``) deriva de él.
+        """
+        keys = [str(db_file.file_path)] + [str(r.file_path) for r in db_file.renditions]
+        if db_file.thumbnail_path:
+            keys.append(str(db_file.thumbnail_path))
+        if db_file.original_path and not (
+            self.db.query(UploadedFile.id)
+            .filter(
+                UploadedFile.content_hash == db_file.content_hash,
+                UploadedFile.id != db_file.id,
+                UploadedFile.id.notin_([*deleting_ids]),
+            )
+            .first()
+        ):
+            keys.append(str(db_file.original_path))
+        return keys
+
+    async def delete_file_permanent(self, file_id: int) -> bool:
         """
         Eliminar archivo permanentemente (hard delete)
 
@@ -329,10 +877,9 @@ class UploadService:
         if not db_file:
             return False
 
-        # Eliminar archivo físico
-        full_path = self.upload_dir / db_file.file_path
-        if full_path.exists():
-            full_path.unlink()
+        # Eliminar archivo físico y sus renditions
+        for relative_path in self.storage_keys(db_file):
+            await self.storage.delete(relative_path)
 
         # Eliminar registro de DB
         self.db.delete(db_file)
@@ -349,9 +896,9 @@ class UploadService:
         )
 
     def get_file_path(self, file_id: int) -> Optional[Path]:
-        """Obtener path completo del archivo"""
+        """Obtener path completo del archivo (solo con almacenamiento local)"""
         db_file = self.get_file_by_id(file_id)
         if not db_file:
             return None
 
-        return self.upload_dir / str(db_file.file_path)
+        return self.storage.local_path(str(db_file.file_path))
@@ -0,0 +1,370 @@
+"""
+Servicio para subidas reanudables por bloques
+
+Protocolo:
+1. create_session: declara folder, nombre, tipo y tamaño total
+2. append_chunk: escribe bytes en ``uploads/.sessions/<id>.part`` desde un
+   offset; si la conexión cae, el cliente consulta el offset y continúa
+3. finalize: valida que el archivo esté completo y lo registra con
+   ``UploadService.ingest_file`` (misma validación y deduplicación)
+
+Subida directa: ``create_direct_upload`` crea la sesión y devuelve un
+destino firmado. Con S3 el cliente sube al bucket (``.incoming/<id>``) sin
+pasar por la API y ``finalize`` descarga el objeto para procesarlo; con
+almacenamiento local el destino es ``PUT /api/uploads/direct/{id}`` con
+una firma HMAC en la URL, que escribe el cuerpo sin parsear multipart.
+"""
+
+import hashlib
+import hmac
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import anyio
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.upload_session import UploadSession
+from app.models.uploaded_file import UploadedFile
+from app.schemas.upload_session import UploadSessionCreate
+from app.services.storage_usage_service import StorageUsageService
+from app.services.upload_service import UploadService
+
+
+class UploadOffsetError(Exception):
+    """El offset enviado no coincide con el recibido por el servidor"""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(message)
+        self.offset = offset
+
+
+class UploadSessionService:
+    """Servicio para sesiones de subida reanudable"""
+
+    # Directorio de archivos parciales (dentro de upload_dir: rename atómico)
+    SESSIONS_FOLDER = ".sessions"
+    # Prefijo de los objetos subidos directamente al storage
+    STAGING_PREFIX = ".incoming"
+
+    def __init__(self, db: Session, upload_dir: Optional[str] = None):
+        self.db = db
+        self.upload_service = UploadService(db, upload_dir)
+        self.storage = self.upload_service.storage
+        self.sessions_dir = self.upload_service.upload_dir / self.SESSIONS_FOLDER
+        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+
+    def _part_path(self, session: UploadSession) -> Path:
+        """Ruta del archivo parcial de una sesión"""
+        return self.sessions_dir / f"{session.id}.part"
+
+    def _hash_file(self, path: Path) -> str:
+        """Calcular SHA-256 de un archivo leyendo por bloques"""
+        hasher = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(self.upload_service.CHUNK_SIZE):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def create_session(
+        self, data: UploadSessionCreate, user_id: Optional[int] = None
+    ) -> UploadSession:
+        """
+        Crear una sesión de subida
+
+        Raises:
+            ValueError: Si el folder, el tipo o el tamaño declarado no son válidos
+            StorageQuotaError: Si el tamaño declarado supera una cuota
+        """
+        upload_service = self.upload_service
+        if data.folder not in upload_service.ALLOWED_FOLDERS:
+            raise ValueError(
+                f"Folder '{data.folder}' no permitido. "
+                f"Use: {upload_service.ALLOWED_FOLDERS}"
+            )
+
+        file_type = upload_service._get_file_type(data.mime_type)
+        max_size = upload_service._validate_upload(
+            data.folder, file_type, data.mime_type
+        )
+        if data.total_size > max_size:
+            raise upload_service._size_error(file_type, data.total_size, max_size)
+        StorageUsageService(self.db).check_quota(data.folder, user_id, data.total_size)
+
+        session = UploadSession(
+            id=uuid.uuid4().hex,
+            folder=data.folder,
+            filename=data.filename,
+            mime_type=data.mime_type,
+            total_size=data.total_size,
+            received_size=0,
+            status="pending",
+            uploaded_by=user_id,
+            expires_at=datetime.now(timezone.utc)
+            + timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS),
+        )
+        self._part_path(session).touch()
+
+        self.db.add(session)
+        self.db.commit()
+        self.db.refresh(session)
+        return session
+
+    def create_direct_upload(
+        self, data: UploadSessionCreate, user_id: Optional[int] = None
+    ) -> Tuple[UploadSession, Optional[Dict[str, Any]]]:
+        """
+        Crear una sesión para subir el archivo directamente al storage
+
+        Returns:
+            tuple: (sesión, destino firmado del storage o None si el backend
+            no admite subidas directas y se usa el PUT firmado de la API)
+
+        Raises:
+            ValueError: Si el folder, el tipo o el tamaño declarado no son válidos
+        """
+        session = self.create_session(data, user_id)
+        key = f"{self.STAGING_PREFIX}/{session.id}"
+        target = self.storage.presign_upload(
+            key,
+            str(session.mime_type),
+            int(session.total_size),  # type: ignore[arg-type]
+            settings.DIRECT_UPLOAD_EXPIRE_SECONDS,
+        )
+        if target is not None:
+            setattr(session, "storage_key", key)
+            self.db.commit()
+        return session, target
+
+    @staticmethod
+    def sign(session_id: str, expires: int) -> str:
+        """Firma HMAC de una URL de subida directa local"""
+        message = f"{session_id}:{expires}".encode()
+        return hmac.new(
+            settings.SECRET_KEY.encode(), message, hashlib.sha256
+        ).hexdigest()
+
+    @classmethod
+    def signed_params(cls, session_id: str) -> Dict[str, str]:
+        """Parámetros ``expires`` y ``signature`` de la URL de subida local"""
+        expires = int(time.time()) + settings.DIRECT_UPLOAD_EXPIRE_SECONDS
+        return {"expires": str(expires), "signature": cls.sign(session_id, expires)}
+
+    @classmethod
+    def verify_signature(cls, session_id: str, expires: int, signature: str) -> bool:
+        """Validar la firma y la caducidad de una URL de subida local"""
+        if expires < time.time():
+            return False
+        return hmac.compare_digest(cls.sign(session_id, expires), signature)
+
+    def get_session(
+        self, session_id: str, user_id: Optional[int] = None
+    ) -> Optional[UploadSession]:
+        """Obtener una sesión vigente del usuario"""
+        return (
+            self.db.query(UploadSession)
+            .filter(
+                UploadSession.id == session_id,
+                UploadSession.uploaded_by == user_id,
+                UploadSession.expires_at > datetime.now(timezone.utc),
+            )
+            .first()
+        )
+
+    def get_direct_session(self, session_id: str) -> Optional[UploadSession]:
+        """Sesión de subida directa local (la URL firmada la autoriza)"""
+        session = self.db.get(UploadSession, session_id)
+        if session is None or session.storage_key:
+            return None
+        return session
+
+    async def append_chunk(
+        self, session: UploadSession, offset: int, chunks: AsyncIterator[bytes]
+    ) -> int:
+        """
+        Escribir un bloque en el archivo parcial a partir de ``offset``
+
+        Los bytes se escriben a disco a medida que llegan. Si la conexión se
+        corta a mitad del bloque, lo ya escrito cuenta y el cliente reanuda
+        desde el nuevo offset.
+
+        Returns:
+            int: Nuevo offset (bytes recibidos)
+
+        Raises:
+            UploadOffsetError: Si el offset no coincide o la sesión está cerrada
+            ValueError: Si el bloque excede el tamaño total declarado
+        """
+        received = int(session.received_size)  # type: ignore[arg-type]
+        if session.status != "pending":
+            raise UploadOffsetError("La sesión ya fue finalizada", received)
+        if offset != received:
+            raise UploadOffsetError(
+                f"Offset inválido: {offset} (esperado {received})", received
+            )
+
+        total = int(session.total_size)  # type: ignore[arg-type]
+        written = received
+        try:
+            with open(self._part_path(session), "r+b") as part:
+                part.seek(offset)
+                async for chunk in chunks:
+                    if written + len(chunk) > total:
+                        # Descartar el bloque completo
+                        part.truncate(received)
+                        written = received
+                        raise ValueError(
+                            f"El bloque excede el tamaño declarado ({total} bytes)"
+                        )
+                    part.write(chunk)
+                    written += len(chunk)
+        finally:
+            setattr(session, "received_size", written)
+            self.db.commit()
+
+        return written
+
+    async def receive_direct(
+        self, session: UploadSession, chunks: AsyncIterator[bytes]
+    ) -> int:
+        """
+        Recibir el archivo completo de una subida directa local
+
+        Un nuevo PUT reemplaza lo recibido antes (el cliente reintenta desde
+        cero, como con S3).
+
+        Returns:
+            int: Bytes recibidos
+        """
+        if session.status == "pending":
+            with open(self._part_path(session), "r+b") as part:
+                part.truncate(0)
+            setattr(session, "received_size", 0)
+        return await self.append_chunk(session, 0, chunks)
+
+    async def _fetch_staged(self, session: UploadSession, part_path: Path) -> None:
+        """
+        Descargar el objeto subido al storage al archivo parcial
+
+        Raises:
+            UploadOffsetError: Si el cliente todavía no ha subido el archivo
+            ValueError: Si el tamaño no coincide con el declarado
+        """
+        key = str(session.storage_key)
+        size = await self.storage.size(key)
+        if size is None:
+            raise UploadOffsetError("El archivo todavía no se ha subido", 0)
+        if size != session.total_size:
+            await self.storage.delete(key)
+            raise ValueError(
+                f"Tamaño subido ({size} bytes) distinto del declarado "
+                f"({session.total_size} bytes)"
+            )
+
+        part = await anyio.to_thread.run_sync(open, part_path, "wb")
+        try:
+            async for chunk in self.storage.stream(key):
+                await anyio.to_thread.run_sync(part.write, chunk)
+        finally:
+            await anyio.to_thread.run_sync(part.close)
+        setattr(session, "received_size", size)
+
+    async def finalize(self, session: UploadSession) -> UploadedFile:
+        """
+        Finalizar la sesión y registrar el archivo
+
+        Raises:
+            UploadOffsetError: Si todavía faltan bytes por recibir
+            ValueError: Si el archivo no pasa la validación de UploadService
+                (la sesión se descarta)
+            ImageExecutorBusyError: Si el pool de imágenes está lleno (la
+                sesión sigue pendiente y se puede reintentar)
+        """
+        if session.status == "completed":
+            db_file = (
+                self.db.query(UploadedFile)
+                .filter(UploadedFile.id == session.uploaded_file_id)
+                .first()
+            )
+            if db_file:
+                return db_file
+
+        part_path = self._part_path(session)
+        try:
+            db_file = await self._ingest(session, part_path)
+        except ValueError:
+            # Contenido inválido: la sesión no se puede completar, se descarta
+            # con sus bytes (también el objeto subido)
+            await self.abort(session)
+            raise
+
+        # Solo tras registrar el archivo: si el pool está ocupado (503) el
+        # cliente reintenta el finalize sin volver a enviar los bytes
+        part_path.unlink(missing_ok=True)
+        await self._delete_staged(session)
+        setattr(session, "status", "completed")
+        setattr(session, "uploaded_file_id", db_file.id)
+        self.db.commit()
+        return db_file
+
+    async def _ingest(self, session: UploadSession, part_path: Path) -> UploadedFile:
+        """Validar el archivo recibido y registrarlo con UploadService"""
+        if session.storage_key:
+            await self._fetch_staged(session, part_path)
+
+        received = int(session.received_size)  # type: ignore[arg-type]
+        if received != session.total_size:
+            raise UploadOffsetError(
+                f"Subida incompleta: {received} de {session.total_size} bytes",
+                received,
+            )
+
+        mime_type = str(session.mime_type)
+        # SHA-256 de hasta 100MB: fuera del event loop
+        file_hash = await anyio.to_thread.run_sync(self._hash_file, part_path)
+        return await self.upload_service.ingest_file(
+            temp_path=part_path,
+            file_hash=file_hash,
+            file_size=received,
+            original_filename=str(session.filename),
+            mime_type=mime_type,
+            file_type=self.upload_service._get_file_type(mime_type),
+            folder=str(session.folder),
+            user_id=session.uploaded_by,  # type: ignore[arg-type]
+        )
+
+    async def _delete_staged(self, session: UploadSession) -> None:
+        """Eliminar el objeto de una subida directa, si lo hay"""
+        if session.storage_key:
+            await self.storage.delete(str(session.storage_key))
+
+    async def abort(self, session: UploadSession) -> None:
+        """Cancelar la sesión y eliminar el archivo parcial"""
+        self._part_path(session).unlink(missing_ok=True)
+        await self._delete_staged(session)
+        self.db.delete(session)
+        self.db.commit()
+
+    def purge_expired(self) -> int:
+        """
+        Eliminar sesiones expiradas y sus archivos parciales
+
+        Returns:
+            int: Número de sesiones eliminadas
+
+        Los objetos de subidas directas abandonadas (``.incoming/``) los
+        elimina la regla de ciclo de vida del bucket.
+        """
+        expired = (
+            self.db.query(UploadSession)
+            .filter(UploadSession.expires_at <= datetime.now(timezone.utc))
+            .all()
+        )
+        for session in expired:
+            self._part_path(session).unlink(missing_ok=True)
+            self.db.delete(session)
+        self.db.commit()
+        return len(expired)
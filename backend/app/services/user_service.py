@@ -1,9 +1,25 @@
 from typing import Any, Dict, List, Optional
 
+import anyio
 from sqlalchemy import func, or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from ..core.security import get_password_hash, verify_password
+from ..core.password_executor import PasswordExecutorBusyError
+from ..core.principal import (
+    Principal,
+    compile_permissions,
+    compiled_permissions,
+    permission_stamp,
+    principal_cache,
+)
+from ..core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    password_needs_rehash,
+    verify_password,
+    verify_password_async,
+)
+from ..models.permission_stamp import PermissionStamp
 from ..models.role import Role
 from ..models.user import User
 from ..schemas.user import UserCreate, UserUpdate
@@ -32,6 +48,80 @@ class UserService:
             .first()
         )
 
+    @staticmethod
+    def get_principal(db: Session, username: str) -> Optional[Principal]:
+        """
+        Build the authorization snapshot of a user
+
+        Roles and permissions are only queried (without a cartesian join)
+        when the user's permissions_version has no compiled set yet.
+        """
+        user = db.query(User).filter(User.username == username).first()
+        if not user:
+            return None
+
+        version = user.permissions_version or 0
+        compiled = compiled_permissions.get(user.id, version)  # type: ignore
+        if compiled is None:
+            roles = (
+                db.query(Role)
+                .options(selectinload(Role.permissions))
+                .filter(Role.users.any(User.id == user.id))
+                .all()
+            )
+            compiled = compile_permissions(roles)
+            compiled_permissions.put(user.id, version, compiled)  # type: ignore
+        return Principal.build(user, compiled)
+
+    @staticmethod
+    def bump_permissions_version(db: Session, user_ids: List[int]) -> None:
+        """Mark the compiled permissions of these users as stale (no commit)"""
+        if not user_ids:
+            return
+        db.query(User).filter(User.id.in_(user_ids)).update(
+            {User.permissions_version: User.permissions_version + 1},
+            synchronize_session=False,
+        )
+        UserService.bump_permission_stamp(db)
+
+    @staticmethod
+    def bump_permission_stamp(db: Session) -> None:
+        """
+        Make the authorization claims of every issued token stale (no commit)
+
+        Call permission_stamp.expire() after committing so this process
+        stops trusting the old claims right away.
+        """
+        updated = (
+            db.query(PermissionStamp)
+            .filter(PermissionStamp.id == PermissionStamp.ROW_ID)
+            .update(
+                {PermissionStamp.version: PermissionStamp.version + 1},
+                synchronize_session=False,
+            )
+        )
+        if not updated:
+            db.add(PermissionStamp(id=PermissionStamp.ROW_ID, version=1))
+
+    @staticmethod
+    def get_permission_stamp(db: Session) -> int:
+        """Current global permission version (cached for a few seconds)"""
+        return permission_stamp.get(
+            lambda: db.query(PermissionStamp.version)
+            .filter(PermissionStamp.id == PermissionStamp.ROW_ID)
+            .scalar()
+            or 0
+        )
+
+    @staticmethod
+    def authorization_claims(db: Session, user: User) -> Dict[str, Any]:
+        """Claims that let check_permission authorize the token without the DB"""
+        # Read the stamp first: a change made meanwhile leaves the token stale
+        stamp = UserService.get_permission_stamp(db)
+        principal = UserService.get_principal(db, user.username)  # type: ignore
+        assert principal is not None
+        return {**principal.claims(), "pv": stamp}
+
     @staticmethod
     def get_users(
         db: Session,
@@ -135,12 +225,24 @@ class UserService:
             role_ids = update_data.pop("role_ids")
             if role_ids is not None:
                 roles = db.query(Role).filter(Role.id.in_(role_ids)).all()
+                if {r.id for r in roles} != {r.id for r in db_user.roles}:
+                    UserService.bump_permissions_version(db, [user_id])
                 db_user.roles = roles
 
+        # Username and status are part of the authorization claims
+        if any(
+            field in update_data and update_data[field] != getattr(db_user, field)
+            for field in ("username", "is_active")
+        ):
+            UserService.bump_permission_stamp(db)
+
         for field, value in update_data.items():
             setattr(db_user, field, value)
 
         db.commit()
+        # Flags, roles or username may have changed
+        principal_cache.invalidate_user(user_id)
+        permission_stamp.expire()
         db.refresh(db_user)
         return db_user
 
@@ -149,8 +251,11 @@ class UserService:
         db_user = db.query(User).filter(User.id == user_id).first()
         if not db_user:
             return False
+        UserService.bump_permission_stamp(db)
         db.delete(db_user)
         db.commit()
+        principal_cache.invalidate_user(user_id)
+        permission_stamp.expire()
         return True
 
     @staticmethod
@@ -161,3 +266,38 @@ class UserService:
         if not verify_password(password, user.hashed_password):  # type: ignore
             return None
         return user
+
+    @staticmethod
+    async def authenticate_user_async(
+        db: Session, username: str, password: str
+    ) -> Optional[User]:
+        """
+        authenticate_user with bcrypt on the bounded password executor
+
+        If the stored hash uses a cost other than BCRYPT_ROUNDS, the password
+        is rehashed with the current cost (skipped, and retried on a later
+        login, when the executor is saturated). The lookup and the rehash
+        commit run in the threadpool: only bcrypt is awaited on the loop.
+
+        Raises:
+            PasswordExecutorBusyError: If the executor cannot take the check
+        """
+        user = await anyio.to_thread.run_sync(
+            UserService.get_user_by_username, db, username
+        )
+        if not user:
+            return None
+        hashed_password: str = user.hashed_password  # type: ignore[assignment]
+        if not await verify_password_async(password, hashed_password):
+            return None
+
+        if password_needs_rehash(hashed_password):
+            try:
+                rehashed = await get_password_hash_async(password)
+            except PasswordExecutorBusyError:
+                return user
+            user.hashed_password = rehashed  # type: ignore[assignment]
+            await anyio.to_thread.run_sync(db.commit)
+            # Reload the expired attributes here, not lazily on the loop
+            await anyio.to_thread.run_sync(db.refresh, user)
+        return user
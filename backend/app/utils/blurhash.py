@@ -0,0 +1,118 @@
+"""
+Codificador BlurHash en Python puro
+
+Implementa el algoritmo de referencia (https://blurha.sh): la imagen se
+resume en unas pocas componentes de coseno (DCT) y se codifica en base 83.
+Pensado para miniaturas de ~32px; con imágenes grandes es lento.
+"""
+
+import math
+from typing import List, Sequence, Tuple
+
+from PIL import Image
+
+BASE83_CHARS = (
+    "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    "abcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+)
+
+# sRGB (0-255) -> lineal, precalculado para los 256 valores
+_SRGB_TO_LINEAR = [
+    v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+    for v in (i / 255 for i in range(256))
+]
+
+
+def _base83(value: int, length: int) -> str:
+    return "".join(
+        BASE83_CHARS[(value // 83 ** (length - i)) % 83] for i in range(1, length + 1)
+    )
+
+
+def _linear_to_srgb(value: float) -> int:
+    v = max(0.0, min(1.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _sign_pow(value: float, exponent: float) -> float:
+    return math.copysign(abs(value) ** exponent, value)
+
+
+def _encode_ac(color: Sequence[float], max_value: float) -> int:
+    r, g, b = (
+        max(0, min(18, int(math.floor(_sign_pow(c / max_value, 0.5) * 9 + 9.5))))
+        for c in color
+    )
+    return r * 19 * 19 + g * 19 + b
+
+
+def encode(image: Image.Image, x_components: int = 4, y_components: int = 3) -> str:
+    """
+    Calcular el BlurHash de una imagen RGB
+
+    Args:
+        image: Imagen RGB (idealmente una miniatura)
+        x_components, y_components: Componentes horizontales/verticales (1-9)
+
+    Returns:
+        str: BlurHash de ``4 + 2 * x_components * y_components`` caracteres
+    """
+    if not (1 <= x_components <= 9 and 1 <= y_components <= 9):
+        raise ValueError("El número de componentes debe estar entre 1 y 9")
+
+    width, height = image.size
+    pixels = [
+        (_SRGB_TO_LINEAR[r], _SRGB_TO_LINEAR[g], _SRGB_TO_LINEAR[b])
+        for r, g, b in image.convert("RGB").getdata()
+    ]
+
+    # Las bases de coseno son separables: tablas por eje
+    cos_x = [
+        [math.cos(math.pi * i * x / width) for x in range(width)]
+        for i in range(x_components)
+    ]
+    cos_y = [
+        [math.cos(math.pi * j * y / height) for y in range(height)]
+        for j in range(y_components)
+    ]
+
+    factors: List[Tuple[float, float, float]] = []
+    for j in range(y_components):
+        for i in range(x_components):
+            normalisation = 1 if i == 0 and j == 0 else 2
+            r = g = b = 0.0
+            for y in range(height):
+                row = y * width
+                basis_y = cos_y[j][y]
+                for x in range(width):
+                    basis = cos_x[i][x] * basis_y
+                    pr, pg, pb = pixels[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            scale = normalisation / (width * height)
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = _base83((x_components - 1) + (y_components - 1) * 9, 1)
+
+    if ac:
+        actual_max = max(abs(c) for color in ac for c in color)
+        quantised_max = max(0, min(82, int(math.floor(actual_max * 166 - 0.5))))
+        max_value = (quantised_max + 1) / 166
+        result += _base83(quantised_max, 1)
+    else:
+        max_value = 1.0
+        result += _base83(0, 1)
+
+    dc_value = (
+        (_linear_to_srgb(dc[0]) << 16)
+        + (_linear_to_srgb(dc[1]) << 8)
+        + _linear_to_srgb(dc[2])
+    )
+    result += _base83(dc_value, 4)
+    for color in ac:
+        result += _base83(_encode_ac(color, max_value), 2)
+    return result
@@ -0,0 +1,87 @@
+"""
+Métricas de calidad de imagen (PSNR y SSIM) solo con Pillow
+
+Sin numpy: las medias por ventana se obtienen con un resize BOX sobre
+imágenes en modo "F" y el resto con ``ImageMath``, todo en C.
+"""
+
+import math
+
+from PIL import Image, ImageChops, ImageMath
+
+# Constantes de estabilidad de SSIM para rango dinámico de 8 bits
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+
+def _same_size(reference: Image.Image, candidate: Image.Image, mode: str):
+    """Convertir a ``mode`` y llevar ``candidate`` al tamaño de ``reference``"""
+    reference = reference.convert(mode)
+    candidate = candidate.convert(mode)
+    if candidate.size != reference.size:
+        candidate = candidate.resize(reference.size, Image.Resampling.LANCZOS)
+    return reference, candidate
+
+
+def psnr(reference: Image.Image, candidate: Image.Image) -> float:
+    """PSNR en dB sobre RGB (``inf`` si las imágenes son idénticas)"""
+    reference, candidate = _same_size(reference, candidate, "RGB")
+    histogram = ImageChops.difference(reference, candidate).histogram()
+    squared = sum(count * (i % 256) ** 2 for i, count in enumerate(histogram))
+    mse = squared / (reference.width * reference.height * 3)
+    if mse == 0:
+        return math.inf
+    return 10 * math.log10(255**2 / mse)
+
+
+def ssim(
+    reference: Image.Image,
+    candidate: Image.Image,
+    max_side: int = 512,
+    window: int = 8,
+) -> float:
+    """
+    SSIM medio sobre la luminancia en ventanas de ``window`` píxeles
+
+    Ambas imágenes se reducen (BOX) a ``max_side`` en el lado largo: la
+    métrica compara estructura, no ruido de subpíxel, y así es barata.
+
+    Returns:
+        float: 1.0 para imágenes idénticas; ~0.95+ es visualmente equivalente
+    """
+    reference, candidate = _same_size(reference, candidate, "L")
+    scale = min(1.0, max_side / max(reference.size))
+    size = (
+        max(window, round(reference.width * scale)),
+        max(window, round(reference.height * scale)),
+    )
+    blocks = (size[0] // window, size[1] // window)
+    size = (blocks[0] * window, blocks[1] * window)
+    a = reference.resize(size, Image.Resampling.BOX).convert("F")
+    b = candidate.resize(size, Image.Resampling.BOX).convert("F")
+
+    def mean(image: Image.Image) -> Image.Image:
+        return image.resize(blocks, Image.Resampling.BOX)
+
+    mu_a, mu_b = mean(a), mean(b)
+    aa = mean(ImageMath.lambda_eval(lambda x: x["a"] * x["a"], a=a))
+    bb = mean(ImageMath.lambda_eval(lambda x: x["b"] * x["b"], b=b))
+    ab = mean(ImageMath.lambda_eval(lambda x: x["a"] * x["b"], a=a, b=b))
+
+    ssim_map = ImageMath.lambda_eval(
+        lambda x: (
+            (x["ma"] * x["mb"] * 2 + SSIM_C1)
+            * ((x["ab"] - x["ma"] * x["mb"]) * 2 + SSIM_C2)
+        )
+        / (
+            (x["ma"] * x["ma"] + x["mb"] * x["mb"] + SSIM_C1)
+            * (x["aa"] - x["ma"] * x["ma"] + x["bb"] - x["mb"] * x["mb"] + SSIM_C2)
+        ),
+        ma=mu_a,
+        mb=mu_b,
+        aa=aa,
+        bb=bb,
+        ab=ab,
+    )
+    values = list(ssim_map.getdata())
+    return sum(values) / len(values)
@@ -0,0 +1,724 @@
+"""
+Procesamiento de imágenes con Pillow
+
+Funciones puras a nivel de módulo para que puedan ejecutarse en el pool
+de procesos (ver app.core.image_executor).
+"""
+
+import base64
+import hashlib
+import math
+import os
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from PIL import Image, ImageOps
+
+from app.utils import blurhash
+from app.utils.image_quality import ssim
+
+try:  # AVIF es opcional: requiere pillow-avif-plugin
+    import pillow_avif  # type: ignore[import-not-found]  # noqa: F401
+except ImportError:  # pragma: no cover - depende del entorno
+    pillow_avif = None
+
+# Tamaños objetivo por folder
+FOLDER_TARGET_SIZES = {
+    "hero": (1920, 1080),  # 16:9 para hero images
+    "services": (800, 600),  # 4:3 para servicios
+    "projects": (1200, 800),  # 3:2 para proyectos
+}
+
+# Presupuesto de bytes del archivo principal por folder (modo "budget")
+FOLDER_BYTE_BUDGETS = {
+    "hero": 300 * 1024,
+    "services": 80 * 1024,
+    "projects": 160 * 1024,
+}
+
+# Formato de salida de Pillow por tipo MIME
+FORMAT_MAP = {
+    "image/jpeg": "JPEG",
+    "image/jpg": "JPEG",
+    "image/png": "PNG",
+    "image/webp": "WEBP",
+}
+
+# Anchos de las renditions responsive (se limitan al ancho del recorte)
+RENDITION_WIDTHS = (480, 768, 1280, 1920)
+
+# Formato de Pillow -> (tipo MIME, extensión)
+RENDITION_FORMATS = {
+    "JPEG": ("image/jpeg", ".jpg"),
+    "PNG": ("image/png", ".png"),
+    "WEBP": ("image/webp", ".webp"),
+    "AVIF": ("image/avif", ".avif"),
+}
+
+
+class RenditionSpec(NamedTuple):
+    """
+    Geometría y formatos con que se derivan las imágenes de un folder
+
+    ``formats``: formatos extra además del original (vacío = WebP, más AVIF
+    si está disponible). ``version`` identifica el spec en los nombres de
+    archivo de un re-render.
+    """
+
+    size: Tuple[int, int]
+    widths: Tuple[int, ...] = RENDITION_WIDTHS
+    formats: Tuple[str, ...] = ()
+
+    @property
+    def version(self) -> str:
+        return hashlib.sha256(repr(tuple(self)).encode()).hexdigest()[:8]
+
+
+# Calidad fija por formato (modo "fixed") y rango de la búsqueda adaptativa
+FIXED_QUALITY = {"JPEG": 85, "WEBP": 80, "AVIF": 80}
+QUALITY_RANGE = {"JPEG": (40, 92), "WEBP": (40, 92), "AVIF": (30, 85)}
+
+# Lado máximo al que se compara el SSIM en la búsqueda de calidad
+SSIM_MAX_SIDE = 1024
+
+
+class EncodeTarget(NamedTuple):
+    """
+    Objetivo del codificador adaptativo (se envía al pool de procesos)
+
+    ``ssim``: similitud mínima frente a la imagen sin comprimir.
+    ``max_bytes``: tamaño máximo del archivo codificado.
+    """
+
+    ssim: Optional[float] = None
+    max_bytes: Optional[int] = None
+
+
+# Margen que se deja al reducir en dos pasos (draft JPEG / reduce entero)
+# antes del LANCZOS final. Con fotos de 12MP, 1.5 da la misma calidad
+# (SSIM) que 2.0, el valor de Image.thumbnail, con la mitad de CPU
+# (ver benchmarks/bench_resize.py)
+REDUCING_GAP = 1.5
+
+# Orientaciones EXIF que intercambian ancho y alto (rotaciones de 90/270)
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+EXIF_ORIENTATION = 0x0112
+
+
+def open_for_resize(source_path: str, resize_size: Callable) -> Image.Image:
+    """
+    Abrir una imagen decodificando solo la resolución necesaria
+
+    - JPEG: ``draft`` escala en el dominio DCT (1/2, 1/4, 1/8) mientras
+      decodifica, sin llegar a materializar los megapíxeles originales.
+    - Aplica la orientación EXIF (fotos de móvil en vertical).
+
+    Args:
+        source_path: Ruta de la imagen
+        resize_size: Función ``(ancho, alto) -> (ancho, alto)`` que, dado el
+            tamaño ya orientado, devuelve el tamaño al que se redimensionará
+
+    Returns:
+        Image: Imagen cargada y orientada (los metadatos no se copian al
+        guardar salvo el perfil ICC, ver ``_save_image``)
+    """
+    img = Image.open(source_path)
+    orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+    transposed = orientation in TRANSPOSED_ORIENTATIONS
+    width, height = img.size[::-1] if transposed else img.size
+
+    target = resize_size((width, height))
+    requested = (
+        math.ceil(target[0] * REDUCING_GAP),
+        math.ceil(target[1] * REDUCING_GAP),
+    )
+    if transposed:
+        requested = requested[::-1]
+    if requested[0] < img.width and requested[1] < img.height:
+        img.draft(img.mode, requested)
+
+    img.load()
+    if orientation != 1:
+        oriented = ImageOps.exif_transpose(img)
+        img.close()
+        img = oriented
+    return img
+
+
+def _cover_box(
+    size: Tuple[int, int], target_size: Tuple[int, int]
+) -> Tuple[float, float, float, float]:
+    """Región centrada de ``size`` con la proporción de ``target_size``"""
+    width, height = size
+    scale = max(target_size[0] / width, target_size[1] / height)
+    box_width, box_height = target_size[0] / scale, target_size[1] / scale
+    left, top = (width - box_width) / 2, (height - box_height) / 2
+    return (left, top, left + box_width, top + box_height)
+
+
+def _is_opaque(img: Image.Image) -> bool:
+    """Indicar si la imagen no tiene ningún píxel transparente"""
+    if not img.has_transparency_data:
+        return True
+    alpha = img.convert("RGBA").getchannel("A")
+    return alpha.getextrema()[0] == 255
+
+
+def resize_image(
+    source_path: str,
+    folder: str,
+    mime_type: str,
+    encode_target: Optional[EncodeTarget] = None,
+    convert_png: bool = False,
+    target_size: Optional[Tuple[int, int]] = None,
+) -> Optional[Tuple[bytes, str]]:
+    """
+    Redimensionar imagen según el folder de destino
+
+    Se ejecuta dentro del pool de procesos de imágenes, por lo que recibe
+    una ruta (no bytes) para no copiar el archivo completo entre procesos.
+    La imagen se recorta (centrada) a la proporción del folder; el resize
+    lee solo la región recortada y reduce en dos pasos (``reducing_gap``).
+    El resultado va orientado y sin EXIF/XMP (ni GPS).
+
+    Args:
+        source_path: Ruta al archivo temporal con la imagen original
+        folder: Carpeta destino (hero/services/projects)
+        mime_type: Tipo MIME de la imagen
+        encode_target: Objetivo de calidad (ver ``encode_image``); None = fija
+        convert_png: Guardar los PNG opacos como JPEG si ocupan menos
+        target_size: Tamaño final (por defecto el de FOLDER_TARGET_SIZES)
+
+    Returns:
+        tuple: (contenido, tipo MIME) de la imagen redimensionada, o None si
+        no se pudo procesar (en ese caso se conserva el original)
+    """
+    if target_size is None:
+        target_size = FOLDER_TARGET_SIZES.get(folder, (1920, 1080))
+
+    def cover_size(size: Tuple[int, int]) -> Tuple[int, int]:
+        assert target_size is not None
+        scale = max(target_size[0] / size[0], target_size[1] / size[1])
+        return (round(size[0] * scale), round(size[1] * scale))
+
+    try:
+        with open_for_resize(source_path, cover_size) as source:
+            img = source
+            opaque = _is_opaque(img)
+            # Convertir a RGB si es necesario (para JPG)
+            if img.mode in ("RGBA", "LA", "P"):
+                # Crear fondo blanco para transparencias
+                rgba = img.convert("RGBA")
+                img = Image.new("RGB", rgba.size, (255, 255, 255))
+                img.paste(rgba, mask=rgba.split()[-1])
+                img.info = source.info
+            elif img.mode != "RGB":
+                img = img.convert("RGB")
+
+            # Recortar y redimensionar en una sola pasada (solo la región útil)
+            img = img.resize(
+                target_size,
+                Image.Resampling.LANCZOS,
+                box=_cover_box(img.size, target_size),
+                reducing_gap=REDUCING_GAP,
+            )
+
+            output_format = FORMAT_MAP.get(mime_type, "JPEG")
+            content = encode_image(img, output_format, encode_target)
+            if output_format == "PNG" and convert_png and opaque:
+                # Fotos guardadas como PNG: JPEG ocupa una fracción. Los
+                # gráficos planos (capturas, logos) suelen quedarse en PNG
+                lossy = encode_image(img, "JPEG", encode_target)
+                if len(lossy) < len(content):
+                    return lossy, "image/jpeg"
+            return content, mime_type
+
+    except Exception as e:
+        # Si falla el redimensionamiento, se conservará el contenido original
+        print(f"Error resizing image: {e}")
+        return None
+
+
+def avif_supported() -> bool:
+    """Indicar si Pillow puede codificar AVIF en este entorno"""
+    Image.init()
+    return "AVIF" in Image.SAVE
+
+
+def rendition_formats(mime_type: str, extra: Sequence[str] = ()) -> List[str]:
+    """
+    Formatos a generar: el original + ``extra`` (por defecto WebP, más AVIF
+    si está disponible). AVIF se omite si Pillow no puede codificarlo.
+    """
+    formats = [FORMAT_MAP.get(mime_type, "JPEG")]
+    for output_format in extra or ("WEBP", "AVIF"):
+        if output_format == "AVIF" and not avif_supported():
+            continue
+        if output_format not in formats:
+            formats.append(output_format)
+    return formats
+
+
+def _save_image(
+    img: Image.Image, output_format: str, quality: Optional[int] = None
+) -> bytes:
+    """
+    Codificar imagen con los parámetros de calidad por formato
+
+    Solo se conserva el perfil ICC (los colores de fotos Display P3 o Adobe
+    RGB dependen de él); EXIF, XMP y comentarios no se escriben.
+    """
+    output = BytesIO()
+    icc_profile = img.info.get("icc_profile")
+    if output_format in FIXED_QUALITY:
+        options: Dict[str, Any] = {
+            "quality": quality or FIXED_QUALITY[output_format],
+        }
+        if output_format == "JPEG":
+            options["optimize"] = True
+        img.save(output, format=output_format, icc_profile=icc_profile, **options)
+    else:
+        img.save(output, format=output_format, optimize=True, icc_profile=icc_profile)
+    return output.getvalue()
+
+
+def encode_image(
+    img: Image.Image, output_format: str, target: Optional[EncodeTarget] = None
+) -> bytes:
+    """
+    Codificar buscando la calidad mínima que cumple ``target``
+
+    Búsqueda binaria sobre la calidad: la más baja cuyo SSIM alcanza
+    ``target.ssim`` (sin objetivo de SSIM se parte de la calidad fija). Si
+    el resultado supera ``target.max_bytes``, se baja hasta la más alta que
+    cabe en el presupuesto, nunca por debajo del rango. Sin ``target``, o en
+    formatos sin pérdida, se usa la calidad fija.
+    """
+    if target is None or output_format not in QUALITY_RANGE:
+        return _save_image(img, output_format)
+
+    encoded: Dict[int, bytes] = {}
+
+    def encode(quality: int) -> bytes:
+        if quality not in encoded:
+            encoded[quality] = _save_image(img, output_format, quality)
+        return encoded[quality]
+
+    def similarity(quality: int) -> float:
+        with Image.open(BytesIO(encode(quality))) as decoded:
+            return ssim(img, decoded, max_side=SSIM_MAX_SIDE)
+
+    def search(low: int, high: int, accept: Callable[[int], bool]) -> Optional[int]:
+        """Calidad más baja de [low, high] aceptada (monótono creciente)"""
+        found = None
+        while low <= high:
+            middle = (low + high) // 2
+            if accept(middle):
+                found, high = middle, middle - 1
+            else:
+                low = middle + 1
+        return found
+
+    low, high = QUALITY_RANGE[output_format]
+    quality = FIXED_QUALITY[output_format]
+    min_ssim, max_bytes = target
+    if min_ssim is not None:
+        quality = search(low, high, lambda q: similarity(q) >= min_ssim) or high
+
+    if max_bytes is not None and len(encode(quality)) > max_bytes:
+        # Más alta que cabe: la más baja de las que ya no caben, menos una
+        too_big = search(low, quality, lambda q: len(encode(q)) > max_bytes)
+        quality = max(low, (too_big or low) - 1)
+
+    return encode(quality)
+
+
+def generate_renditions(
+    source_path: str,
+    output_dir: str,
+    base_name: str,
+    mime_type: str,
+    encode_target: Optional[EncodeTarget] = None,
+    widths: Sequence[int] = RENDITION_WIDTHS,
+    formats: Sequence[str] = (),
+) -> List[Dict[str, Any]]:
+    """
+    Generar el set de renditions responsive de una imagen ya recortada
+
+    Escribe ``{base_name}-{ancho}w{ext}`` en ``output_dir`` para cada ancho
+    de ``widths`` menor o igual al de la imagen y cada formato (el original
+    más ``formats``, ver ``rendition_formats``). El
+    ancho completo en el formato original no se repite: es el archivo
+    principal. Con ``encode_target`` cada rendition se codifica con calidad
+    adaptativa; el presupuesto de bytes se reparte según su superficie.
+
+    Returns:
+        list: Metadatos de cada rendition (width, height, format, mime_type,
+        filename, file_size). Lista vacía si la imagen no se pudo procesar.
+    """
+    try:
+        with Image.open(source_path) as source:
+            source.load()
+            img = (
+                source.convert("RGB") if source.mode not in ("RGB", "RGBA") else source
+            )
+            original_format = FORMAT_MAP.get(mime_type, "JPEG")
+
+            sizes = sorted({w for w in widths if w < img.width}) + [img.width]
+            renditions = []
+            full_area = img.width * img.height
+
+            for width in sizes:
+                height = max(1, round(img.height * width / img.width))
+                resized = (
+                    img
+                    if width == img.width
+                    else img.resize((width, height), Image.Resampling.LANCZOS)
+                )
+
+                for output_format in rendition_formats(mime_type, formats):
+                    if width == img.width and output_format == original_format:
+                        continue
+
+                    rendition_mime, extension = RENDITION_FORMATS[output_format]
+                    filename = f"{base_name}-{width}w{extension}"
+                    width_target = encode_target
+                    if width_target is not None and width_target.max_bytes:
+                        width_target = width_target._replace(
+                            max_bytes=width_target.max_bytes
+                            * width
+                            * height
+                            // full_area
+                        )
+                    content = encode_image(resized, output_format, width_target)
+
+                    # Escritura atómica: temporal + rename en el mismo directorio
+                    target = Path(output_dir) / filename
+                    temp = target.with_suffix(target.suffix + ".part")
+                    temp.write_bytes(content)
+                    os.replace(temp, target)
+
+                    renditions.append(
+                        {
+                            "width": width,
+                            "height": height,
+                            "format": output_format.lower(),
+                            "mime_type": rendition_mime,
+                            "filename": filename,
+                            "file_size": len(content),
+                        }
+                    )
+
+            return renditions
+
+    except Exception as e:
+        print(f"Error generating renditions: {e}")
+        return []
+
+
+def rerender_image(
+    source_path: str,
+    output_dir: str,
+    base_name: str,
+    mime_type: str,
+    spec: RenditionSpec,
+    encode_target: Optional[EncodeTarget] = None,
+    convert_png: bool = False,
+) -> Optional[Dict[str, Any]]:
+    """
+    Derivar de nuevo una imagen desde su original con ``spec``
+
+    Archivo principal, renditions, placeholder y miniatura en una sola
+    tarea del pool
+    (re-render masivo). Escribe ``{base_name}{ext}`` y sus renditions en
+    ``output_dir``.
+
+    Returns:
+        dict: filename, mime_type, file_size, renditions, placeholder y
+        thumbnail, o None si el original no se pudo procesar
+    """
+    resized = resize_image(
+        source_path, "", mime_type, encode_target, convert_png, spec.size
+    )
+    if resized is None:
+        return None
+    content, output_mime = resized
+    extension = RENDITION_FORMATS[FORMAT_MAP.get(output_mime, "JPEG")][1]
+    main_path = Path(output_dir) / f"{base_name}{extension}"
+    main_path.write_bytes(content)
+
+    return {
+        "filename": main_path.name,
+        "mime_type": output_mime,
+        "file_size": len(content),
+        "renditions": generate_renditions(
+            str(main_path),
+            output_dir,
+            base_name,
+            output_mime,
+            encode_target,
+            spec.widths,
+            spec.formats,
+        ),
+        "placeholder": image_placeholder(str(main_path)) or {},
+        "thumbnail": make_thumbnail(
+            str(main_path), str(Path(output_dir) / f"{base_name}{THUMBNAIL_SUFFIX}")
+        ),
+    }
+
+
+# Modos de ajuste de /api/images (semántica de CSS object-fit)
+TRANSFORM_FITS = ("cover", "contain", "fill")
+
+
+def transform_size(
+    source_size: Tuple[int, int],
+    width: Optional[int],
+    height: Optional[int],
+    fit: str,
+) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+    """
+    Calcular el tamaño de redimensionado y de salida de una variante
+
+    Nunca amplía la imagen: si el tamaño pedido supera al original se reduce
+    manteniendo la proporción pedida.
+
+    Returns:
+        tuple: (tamaño tras el resize, tamaño final tras el recorte centrado)
+    """
+    source_width, source_height = source_size
+    if width and not height:
+        height = max(1, round(source_height * width / source_width))
+        fit = "fill"
+    elif height and not width:
+        width = max(1, round(source_width * height / source_height))
+        fit = "fill"
+    elif not width and not height:
+        width, height = source_width, source_height
+
+    assert width is not None and height is not None
+    if fit == "contain":
+        scale = min(width / source_width, height / source_height, 1)
+        size = (
+            max(1, round(source_width * scale)),
+            max(1, round(source_height * scale)),
+        )
+        return size, size
+
+    # cover/fill: la caja pedida no puede superar al original
+    shrink = min(1, source_width / width, source_height / height)
+    box = (max(1, round(width * shrink)), max(1, round(height * shrink)))
+    if fit == "fill":
+        return box, box
+
+    scale = max(box[0] / source_width, box[1] / source_height)
+    resized = (
+        max(box[0], round(source_width * scale)),
+        max(box[1], round(source_height * scale)),
+    )
+    return resized, box
+
+
+def transform_image(
+    source_path: str,
+    output_path: str,
+    width: Optional[int],
+    height: Optional[int],
+    fit: str,
+    output_format: str,
+) -> Optional[Dict[str, int]]:
+    """
+    Generar una variante bajo demanda (w/h/fit/formato) de una imagen
+
+    Se ejecuta en el pool de imágenes; escribe el resultado de forma atómica
+    en ``output_path``.
+
+    Returns:
+        dict: width, height y file_size de la variante, o None si la imagen
+        no se pudo procesar
+    """
+    try:
+        with open_for_resize(
+            source_path, lambda size: transform_size(size, width, height, fit)[0]
+        ) as source:
+            img = source
+            if output_format == "JPEG" and img.mode != "RGB":
+                # JPEG no admite transparencia: fondo blanco
+                rgba = img.convert("RGBA")
+                img = Image.new("RGB", rgba.size, (255, 255, 255))
+                img.paste(rgba, mask=rgba.split()[-1])
+                img.info = source.info
+            elif img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+
+            resized_size, final_size = transform_size(img.size, width, height, fit)
+            if resized_size != img.size:
+                img = img.resize(
+                    resized_size, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP
+                )
+            if final_size != resized_size:
+                left = (resized_size[0] - final_size[0]) // 2
+                top = (resized_size[1] - final_size[1]) // 2
+                img = img.crop((left, top, left + final_size[0], top + final_size[1]))
+
+            content = _save_image(img, output_format)
+
+        temp = Path(output_path + ".part")
+        temp.write_bytes(content)
+        os.replace(temp, output_path)
+        return {"width": img.width, "height": img.height, "file_size": len(content)}
+
+    except Exception as e:
+        print(f"Error transforming image: {e}")
+        return None
+
+
+def avatar_renditions(
+    source_path: str, output_dir: str, base_name: str, sizes: Tuple[int, ...]
+) -> List[Dict[str, Any]]:
+    """
+    Generar avatares cuadrados en WebP de cada lado de ``sizes``
+
+    Recorte centrado, orientación EXIF aplicada y sin metadatos (salvo el
+    perfil ICC). El más grande sale del original (draft + reducing_gap) y
+    los demás de él.
+    Escribe ``{base_name}-{lado}w.webp`` en ``output_dir``.
+
+    Returns:
+        list: size, filename y file_size de cada avatar (de mayor a menor),
+        o lista vacía si el archivo no es una imagen válida
+    """
+    largest = max(sizes)
+    try:
+        with open_for_resize(source_path, lambda size: (largest, largest)) as source:
+            img = source
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if img.has_transparency_data else "RGB")
+            img = img.resize(
+                (largest, largest),
+                Image.Resampling.LANCZOS,
+                box=_cover_box(img.size, (largest, largest)),
+                reducing_gap=REDUCING_GAP,
+            )
+
+        avatars = []
+        for size in sorted(sizes, reverse=True):
+            if size != img.width:
+                img = img.resize((size, size), Image.Resampling.LANCZOS)
+            content = _save_image(img, "WEBP")
+            filename = f"{base_name}-{size}w.webp"
+            target = Path(output_dir) / filename
+            temp = target.with_suffix(".webp.part")
+            temp.write_bytes(content)
+            os.replace(temp, target)
+            avatars.append(
+                {"size": size, "filename": filename, "file_size": len(content)}
+            )
+        return avatars
+
+    except Exception as e:
+        print(f"Error generating avatars: {e}")
+        return []
+
+
+# Placeholders: miniatura para BlurHash y ancho del LQIP (data URI WebP)
+PLACEHOLDER_SAMPLE_SIZE = 32
+LQIP_WIDTH = 16
+
+
+def image_placeholder(source_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Dimensiones, color dominante, BlurHash y LQIP de una imagen
+
+    Se calcula una sola vez al subir (en el pool de imágenes) para que el
+    frontend pueda reservar el espacio y pintar un placeholder sin
+    descargar ni decodificar la imagen.
+
+    Returns:
+        dict: width, height, dominant_color (``#rrggbb``), blurhash y lqip
+        (``data:image/webp;base64,...``), o None si no se pudo procesar
+    """
+    try:
+        with Image.open(source_path) as source:
+            width, height = source.size
+            # JPEG: decodificar directamente a escala reducida (1/2..1/8)
+            source.draft("RGB", (PLACEHOLDER_SAMPLE_SIZE * 2,) * 2)
+            img = source.convert("RGBA")
+
+        # Transparencias sobre fondo blanco (como las variantes JPEG)
+        sample = Image.new("RGB", img.size, (255, 255, 255))
+        sample.paste(img, mask=img.split()[-1])
+        sample.thumbnail(
+            (PLACEHOLDER_SAMPLE_SIZE, PLACEHOLDER_SAMPLE_SIZE),
+            Image.Resampling.BOX,
+        )
+
+        # Color más frecuente tras reducir la paleta (no la media, que agrisa)
+        palette_image = sample.quantize(colors=8)
+        palette = palette_image.getpalette() or []
+        _, index = max(palette_image.getcolors() or [(0, 0)])
+        dominant = "#{:02x}{:02x}{:02x}".format(*palette[index * 3 : index * 3 + 3])
+
+        # Más componentes en el eje largo
+        x_components, y_components = (4, 3) if width >= height else (3, 4)
+        hash_value = blurhash.encode(sample, x_components, y_components)
+
+        lqip = sample.copy()
+        lqip.thumbnail((LQIP_WIDTH, LQIP_WIDTH), Image.Resampling.BOX)
+        output = BytesIO()
+        lqip.save(output, format="WEBP", quality=40)
+        encoded = base64.b64encode(output.getvalue()).decode("ascii")
+
+        return {
+            "width": width,
+            "height": height,
+            "dominant_color": dominant,
+            "blurhash": hash_value,
+            "lqip": f"data:image/webp;base64,{encoded}",
+        }
+
+    except Exception as e:
+        print(f"Error computing image placeholder: {e}")
+        return None
+
+
+# Miniatura de las rejillas del admin: lado máximo (celdas de 128px a 2x)
+THUMBNAIL_SIZE = 256
+THUMBNAIL_SUFFIX = "-thumb.webp"
+
+
+def make_thumbnail(
+    source_path: str, output_path: str, max_side: int = THUMBNAIL_SIZE
+) -> Optional[Dict[str, int]]:
+    """
+    Miniatura WebP de una imagen ya derivada, sin recorte
+
+    Parte del archivo principal (ya orientado y reducido), no del original.
+
+    Returns:
+        dict: width, height y file_size, o None si no se pudo procesar
+    """
+    try:
+        with Image.open(source_path) as source:
+            # JPEG: decodificar directamente a escala reducida (1/2..1/8)
+            source.draft("RGB", (max_side * 2, max_side * 2))
+            img = source.convert("RGBA" if source.has_transparency_data else "RGB")
+        img.thumbnail(
+            (max_side, max_side), Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP
+        )
+
+        # Escritura atómica: temporal + rename en el mismo directorio
+        target = Path(output_path)
+        temp = target.with_suffix(target.suffix + ".part")
+        img.save(temp, format="WEBP", quality=75, method=4)
+        os.replace(temp, target)
+        return {
+            "width": img.width,
+            "height": img.height,
+            "file_size": target.stat().st_size,
+        }
+
+    except Exception as e:
+        print(f"Error generating thumbnail: {e}")
+        return None
@@ -0,0 +1,355 @@
+"""
+Post-procesado de vídeos MP4 en Python puro
+
+- ``faststart``: mueve el átomo ``moov`` (índice de muestras) delante de
+  ``mdat`` y corrige los offsets de ``stco``/``co64``, de modo que el
+  navegador puede empezar a reproducir con los primeros KB en lugar de
+  descargar el archivo hasta el final.
+- ``read_metadata``: duración, dimensiones de presentación y códec de vídeo
+  leyendo solo ``moov`` (sin ffprobe).
+
+Ambas funciones son bloqueantes (E/S de disco) y se ejecutan en un hilo.
+"""
+
+import bisect
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Átomos contenedor que hay que recorrer para llegar a stco/co64 y stsd
+CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+# Bloque de copia al reescribir el archivo
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class Box(NamedTuple):
+    type: bytes
+    start: int  # offset del encabezado
+    end: int  # offset del final (exclusivo)
+    header_size: int
+
+    @property
+    def body_start(self) -> int:
+        return self.start + self.header_size
+
+
+def _read_top_level_boxes(f: BinaryIO, file_size: int) -> List[Box]:
+    """Leer los encabezados de los átomos de primer nivel"""
+    boxes = []
+    position = 0
+    while position + 8 <= file_size:
+        f.seek(position)
+        size, box_type = struct.unpack(">I4s", f.read(8))
+        header_size = 8
+        if size == 1:
+            (size,) = struct.unpack(">Q", f.read(8))
+            header_size = 16
+        elif size == 0:
+            size = file_size - position
+        if size < header_size or position + size > file_size:
+            raise ValueError(f"Átomo {box_type!r} truncado en {position}")
+        boxes.append(Box(box_type, position, position + size, header_size))
+        position += size
+    return boxes
+
+
+def _parse_boxes(data: bytes, start: int, end: int) -> List[Box]:
+    """Leer los átomos hijos de ``data[start:end]``"""
+    boxes = []
+    position = start
+    while position + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, position)
+        header_size = 8
+        if size == 1:
+            (size,) = struct.unpack_from(">Q", data, position + 8)
+            header_size = 16
+        elif size == 0:
+            size = end - position
+        if size < header_size or position + size > end:
+            raise ValueError(f"Átomo {box_type!r} truncado en {position}")
+        boxes.append(Box(box_type, position, position + size, header_size))
+        position += size
+    return boxes
+
+
+def _find(data: bytes, parent: Box, box_type: bytes) -> Optional[Box]:
+    for box in _parse_boxes(data, parent.body_start, parent.end):
+        if box.type == box_type:
+            return box
+    return None
+
+
+def _box(box_type: bytes, body: bytes) -> bytes:
+    size = len(body) + 8
+    if size > 0xFFFFFFFF:
+        return struct.pack(">I4sQ", 1, box_type, size + 8) + body
+    return struct.pack(">I4s", size, box_type) + body
+
+
+def _rewrite_moov(
+    data: bytes, box: Box, translate: Callable[[int], int], use_co64: bool
+) -> bytes:
+    """Reconstruir ``box`` con los offsets de chunk traducidos"""
+    if box.type in CONTAINER_BOXES:
+        body = b"".join(
+            _rewrite_moov(data, child, translate, use_co64)
+            for child in _parse_boxes(data, box.body_start, box.end)
+        )
+        return _box(box.type, body)
+
+    if box.type in (b"stco", b"co64"):
+        version_flags, count = struct.unpack_from(">4sI", data, box.body_start)
+        entry_format = ">%dQ" if box.type == b"co64" else ">%dI"
+        offsets = struct.unpack_from(entry_format % count, data, box.body_start + 8)
+        new_type = b"co64" if use_co64 else box.type
+        new_format = ">%dQ" if new_type == b"co64" else ">%dI"
+        body = (
+            version_flags
+            + struct.pack(">I", count)
+            + struct.pack(new_format % count, *(translate(o) for o in offsets))
+        )
+        return _box(new_type, body)
+
+    return data[box.start : box.end]
+
+
+def _copy_range(src: BinaryIO, dst: BinaryIO, start: int, length: int) -> None:
+    src.seek(start)
+    while length > 0:
+        chunk = src.read(min(COPY_CHUNK_SIZE, length))
+        if not chunk:
+            raise ValueError("Archivo truncado durante la copia")
+        dst.write(chunk)
+        length -= len(chunk)
+
+
+def _read_box(f: BinaryIO, box: Box) -> Tuple[bytes, Box]:
+    """Leer ``box`` entero; devuelve sus bytes y el átomo relativo a ellos"""
+    f.seek(box.start)
+    data = f.read(box.end - box.start)
+    return data, Box(box.type, 0, len(data), box.header_size)
+
+
+def _faststart_layout(boxes: List[Box]) -> Optional[Tuple[List[Box], Box]]:
+    """
+    Nuevo orden de los átomos, con ``moov`` delante del primer ``mdat``
+
+    Returns:
+        tuple: (orden nuevo, átomo moov), o None si no hace falta o el
+        archivo no tiene exactamente un ``moov`` y algún ``mdat``
+    """
+    types = [box.type for box in boxes]
+    if types.count(b"moov") != 1 or b"mdat" not in types:
+        return None
+    moov_index = types.index(b"moov")
+    first_mdat = types.index(b"mdat")
+    if moov_index < first_mdat:
+        return None
+    moov = boxes[moov_index]
+    others = [box for box in boxes if box is not moov]
+    return others[:first_mdat] + [moov] + others[first_mdat:], moov
+
+
+def _offset_translator(
+    layout: List[Box], moov: Box, moov_size: int
+) -> Callable[[int], int]:
+    """Traducir un offset del archivo original a su posición en ``layout``"""
+    old_starts, spans = [], []
+    position = 0
+    for box in layout:
+        if box is moov:
+            position += moov_size
+            continue
+        old_starts.append(box.start)
+        spans.append((box.end, position - box.start))
+        position += box.end - box.start
+
+    def translate(offset: int) -> int:
+        index = bisect.bisect_right(old_starts, offset) - 1
+        if index >= 0 and offset < spans[index][0]:
+            return offset + spans[index][1]
+        return offset
+
+    return translate
+
+
+def _rebuild_moov(data: bytes, moov_box: Box, layout: List[Box], moov: Box) -> bytes:
+    """``moov`` con los offsets de ``stco``/``co64`` corregidos para ``layout``"""
+
+    def build(moov_size: int, use_co64: bool) -> bytes:
+        translate = _offset_translator(layout, moov, moov_size)
+        return _rewrite_moov(data, moov_box, translate, use_co64)
+
+    # El tamaño del moov reconstruido no depende de los offsets: se mide
+    # primero y después se traduce con el desplazamiento real
+    try:
+        return build(len(build(0, use_co64=False)), use_co64=False)
+    except struct.error:
+        # Algún offset ya no cabe en 32 bits: pasar stco a co64
+        return build(len(build(0, use_co64=True)), use_co64=True)
+
+
+def _write_layout(
+    src: BinaryIO, path: str, layout: List[Box], moov: Box, new_moov: bytes
+) -> None:
+    """Escribir los átomos en el orden de ``layout`` y sustituir ``path``"""
+    fd, temp_name = tempfile.mkstemp(dir=Path(path).parent, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as dst:
+            for box in layout:
+                if box is moov:
+                    dst.write(new_moov)
+                else:
+                    _copy_range(src, dst, box.start, box.end - box.start)
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+def faststart(path: str) -> bool:
+    """
+    Mover ``moov`` delante de ``mdat`` (in place, escritura atómica)
+
+    Returns:
+        bool: True si el archivo se reescribió; False si ya era faststart,
+        no es un MP4 reconocible o usa un ``moov`` comprimido (se deja igual)
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as src:
+        try:
+            plan = _faststart_layout(_read_top_level_boxes(src, file_size))
+            if plan is None:
+                return False
+            layout, moov = plan
+            data, moov_box = _read_box(src, moov)
+            if _find(data, moov_box, b"cmov") is not None:
+                return False
+        except (ValueError, struct.error):
+            return False
+
+        new_moov = _rebuild_moov(data, moov_box, layout, moov)
+        _write_layout(src, path, layout, moov, new_moov)
+    return True
+
+
+def _codec(data: bytes, stbl: Box) -> Optional[str]:
+    """Códec de la primera entrada de ``stsd`` (``avc1.64001f`` si hay avcC)"""
+    stsd = _find(data, stbl, b"stsd")
+    if stsd is None:
+        return None
+    entries = _parse_boxes(data, stsd.body_start + 8, stsd.end)
+    if not entries:
+        return None
+    entry = entries[0]
+    fourcc = entry.type.decode("latin-1")
+    # VisualSampleEntry: 78 bytes de campos fijos antes de los hijos
+    children_start = entry.body_start + 78
+    if entry.type in (b"avc1", b"avc3") and children_start < entry.end:
+        for child in _parse_boxes(data, children_start, entry.end):
+            if child.type == b"avcC":
+                profile, compat, level = data[
+                    child.body_start + 1 : child.body_start + 4
+                ]
+                return f"{fourcc}.{profile:02x}{compat:02x}{level:02x}"
+    return fourcc
+
+
+def _sample_entry_size(data: bytes, stbl: Box) -> Optional[tuple]:
+    stsd = _find(data, stbl, b"stsd")
+    if stsd is None:
+        return None
+    entries = _parse_boxes(data, stsd.body_start + 8, stsd.end)
+    if not entries or entries[0].end - entries[0].body_start < 28:
+        return None
+    return struct.unpack_from(">HH", data, entries[0].body_start + 24)
+
+
+def _presentation_size(data: bytes, tkhd: Box) -> Optional[tuple]:
+    """Ancho/alto de presentación de ``tkhd`` aplicando la rotación de la matriz"""
+    version = data[tkhd.body_start]
+    matrix = tkhd.body_start + (52 if version == 1 else 40)
+    a, b = struct.unpack_from(">ii", data, matrix)
+    width, height = struct.unpack_from(">II", data, matrix + 36)
+    width, height = width >> 16, height >> 16
+    if not width or not height:
+        return None
+    if a == 0 and b != 0:
+        # Rotación de 90/270 grados (vídeos grabados en vertical)
+        width, height = height, width
+    return width, height
+
+
+def _duration(data: bytes, moov: Box) -> Optional[float]:
+    """Duración en segundos de ``mvhd``"""
+    mvhd = _find(data, moov, b"mvhd")
+    if mvhd is None:
+        return None
+    if data[mvhd.body_start] == 1:
+        timescale, duration = struct.unpack_from(">IQ", data, mvhd.body_start + 20)
+    else:
+        timescale, duration = struct.unpack_from(">II", data, mvhd.body_start + 12)
+    return round(duration / timescale, 3) if timescale else None
+
+
+def _video_media(data: bytes, trak: Box) -> Optional[Box]:
+    """``mdia`` de ``trak`` si es una pista de vídeo (handler ``vide``)"""
+    mdia = _find(data, trak, b"mdia")
+    hdlr = _find(data, mdia, b"hdlr") if mdia else None
+    if hdlr is None or data[hdlr.body_start + 8 : hdlr.body_start + 12] != b"vide":
+        return None
+    return mdia
+
+
+def _video_track_metadata(data: bytes, trak: Box, mdia: Box) -> Dict[str, object]:
+    """Ancho, alto y códec de una pista de vídeo"""
+    metadata: Dict[str, object] = {}
+    minf = _find(data, mdia, b"minf")
+    stbl = _find(data, minf, b"stbl") if minf else None
+    tkhd = _find(data, trak, b"tkhd")
+    size = _presentation_size(data, tkhd) if tkhd else None
+    if size is None and stbl is not None:
+        size = _sample_entry_size(data, stbl)
+    if size:
+        metadata["width"], metadata["height"] = size
+    if stbl is not None:
+        metadata["codec"] = _codec(data, stbl)
+    return metadata
+
+
+def read_metadata(path: str) -> Optional[Dict[str, object]]:
+    """
+    Leer duración (s), ancho, alto y códec de vídeo de un MP4
+
+    Returns:
+        dict: duration, width, height, codec (None en los campos que falten),
+        o None si el archivo no es un MP4 reconocible
+    """
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            boxes = _read_top_level_boxes(f, file_size)
+            moov = next((box for box in boxes if box.type == b"moov"), None)
+            if moov is None:
+                return None
+            data, moov = _read_box(f, moov)
+
+        metadata: Dict[str, object] = {
+            "duration": _duration(data, moov),
+            "width": None,
+            "height": None,
+            "codec": None,
+        }
+        # Solo la primera pista de vídeo
+        for trak in _parse_boxes(data, moov.body_start, moov.end):
+            mdia = _video_media(data, trak) if trak.type == b"trak" else None
+            if mdia is not None:
+                metadata.update(_video_track_metadata(data, trak, mdia))
+                break
+        return metadata
+
+    except (OSError, ValueError, struct.error, IndexError):
+        return None
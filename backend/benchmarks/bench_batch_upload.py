@@ -0,0 +1,96 @@
+"""
+Benchmark: galería de N fotos subida una a una vs en lote
+
+Compara ``UploadService.save_file`` llamado N veces (lo que hace hoy el
+editor de galerías, una petición por foto) con ``save_files`` (POST
+/api/uploads/batch). Se mide solo el servicio: en la API real cada petición
+individual paga además autenticación y comprobación de permisos.
+
+Usa una base SQLite y un directorio temporales. Uso (desde backend/):
+
+    python -m benchmarks.bench_batch_upload [--photos 30] [--size 2400x1600]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.datastructures import Headers, UploadFile
+
+import app.models  # noqa: F401  (registrar todos los modelos)
+from app.core.config import settings
+from app.core.database import Base
+from app.core.image_executor import shutdown_image_executor
+from app.services.upload_service import UploadService
+
+
+def make_photos(count: int, size: tuple) -> list:
+    photos = []
+    for i in range(count):
+        img = Image.effect_noise(size, 40 + i).convert("RGB")
+        output = BytesIO()
+        img.save(output, format="JPEG", quality=90)
+        photos.append(output.getvalue())
+    return photos
+
+
+def uploads(photos: list) -> list:
+    return [
+        UploadFile(
+            file=BytesIO(content),
+            filename=f"foto-{i}.jpg",
+            headers=Headers({"content-type": "image/jpeg"}),
+        )
+        for i, content in enumerate(photos)
+    ]
+
+
+async def run(photos: list, batch: bool) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.UPLOAD_DIR = tmp
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        service = UploadService(db)
+        files = uploads(photos)
+
+        started = time.perf_counter()
+        if batch:
+            results = await service.save_files(files, "projects", user_id=1)
+            assert all(r["status"] == "created" for r in results)
+        else:
+            for file in files:
+                await service.save_file(file, "projects", user_id=1)
+        elapsed = time.perf_counter() - started
+
+        db.close()
+        engine.dispose()
+        return elapsed
+
+
+async def main(count: int, size: tuple) -> None:
+    photos = make_photos(count, size)
+    print(f"{count} fotos {size[0]}x{size[1]}, IMAGE_WORKERS={settings.IMAGE_WORKERS}")
+    # Calentar el pool de procesos para no medir su arranque
+    await run(photos[:1], batch=False)
+
+    sequential = await run(photos, batch=False)
+    batched = await run(photos, batch=True)
+    print(f"una a una : {sequential:7.2f}s")
+    print(f"en lote   : {batched:7.2f}s  ({sequential / batched:.1f}x)")
+    shutdown_image_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--photos", type=int, default=30)
+    parser.add_argument("--size", default="2400x1600")
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.split("x"))
+    asyncio.run(main(args.photos, (width, height)))
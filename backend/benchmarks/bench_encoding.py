@@ -0,0 +1,159 @@
+"""
+Benchmark: calidad fija frente a codificación adaptativa
+
+Procesa un corpus mixto como lo haría una subida (``resize_image`` al
+tamaño del folder + ``generate_renditions``) con cada modo de calidad:
+
+- fixed: JPEG 85 / WebP 80 (comportamiento anterior, PNG sin convertir)
+- ssim: calidad mínima que alcanza el SSIM objetivo, PNG opacos a JPEG
+- budget: calidad máxima dentro del presupuesto del folder, PNG a JPEG
+
+Para cada modo se mide el total de bytes (principal + renditions), la CPU
+por imagen y el SSIM del archivo principal frente a la imagen redimensionada
+sin comprimir. El corpus (fotos JPEG, fotos y gráficos en PNG opaco) se
+genera en un directorio temporal. Uso (desde backend/):
+
+    python -m benchmarks.bench_encoding [--images 4] [--folder projects]
+    [--ssim 0.98]
+"""
+
+import argparse
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFilter, ImageOps
+
+from app.utils.image_quality import ssim
+from app.utils.images import (
+    FOLDER_BYTE_BUDGETS,
+    FOLDER_TARGET_SIZES,
+    EncodeTarget,
+    generate_renditions,
+    resize_image,
+)
+
+SOURCE_SIZE = (3000, 2000)
+
+
+def make_photo(seed: int) -> Image.Image:
+    """Foto sintética: degradados suaves, textura y objetos con bordes"""
+    noise = Image.effect_noise(SOURCE_SIZE, 20 + seed).filter(ImageFilter.BoxBlur(2))
+    sky = Image.linear_gradient("L").resize(SOURCE_SIZE)
+    img = Image.merge("RGB", (sky, Image.blend(noise, sky, 0.6), noise))
+    draw = ImageDraw.Draw(img)
+    for j in range(10):
+        x, y = 260 * j + 30 * seed, 150 * j
+        draw.ellipse((x, y, x + 420, y + 420), fill=(40 + 20 * j, 90, 160))
+    return img.filter(ImageFilter.GaussianBlur(1.5))
+
+
+def make_graphic(seed: int) -> Image.Image:
+    """Gráfico plano (captura, diagrama): pocos colores y texto"""
+    img = Image.new("RGB", SOURCE_SIZE, (245, 245, 250))
+    draw = ImageDraw.Draw(img)
+    for j in range(14):
+        y = 120 + 130 * j
+        draw.rectangle((100, y, 2900, y + 90), fill=(30 + 15 * seed, 100, 200 - 10 * j))
+        draw.text((140, y + 30), f"Elemento {seed}-{j} " * 8, fill=(255, 255, 255))
+    return img
+
+
+def make_corpus(directory: Path, count: int) -> list:
+    """(ruta, tipo MIME, tipo) para fotos JPEG y PNG y gráficos PNG"""
+    corpus = []
+    for i in range(count):
+        photo = make_photo(i)
+        path = directory / f"foto-{i}.jpg"
+        photo.save(path, format="JPEG", quality=95)
+        corpus.append((path, "image/jpeg", "foto jpeg"))
+
+        path = directory / f"foto-{i}.png"
+        photo.save(path, format="PNG")
+        corpus.append((path, "image/png", "foto png"))
+
+        path = directory / f"grafico-{i}.png"
+        make_graphic(i).save(path, format="PNG")
+        corpus.append((path, "image/png", "gráfico png"))
+    return corpus
+
+
+def reference(path: Path, folder: str) -> Image.Image:
+    """Imagen redimensionada sin comprimir (lo que se quiere preservar)"""
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+    return ImageOps.fit(img, FOLDER_TARGET_SIZES[folder], Image.Resampling.LANCZOS)
+
+
+def run_mode(mode: str, corpus: list, folder: str, ssim_target: float) -> dict:
+    target, convert_png = {
+        "fixed": (None, False),
+        "ssim": (EncodeTarget(ssim=ssim_target), True),
+        "budget": (EncodeTarget(max_bytes=FOLDER_BYTE_BUDGETS[folder]), True),
+    }[mode]
+    by_kind: dict = {}
+    cpu = 0.0
+    ssims = []
+    with tempfile.TemporaryDirectory() as out:
+        for i, (path, mime_type, kind) in enumerate(corpus):
+            started = time.process_time()
+            content, output_mime = resize_image(
+                str(path), folder, mime_type, target, convert_png
+            )
+            main_path = Path(out) / f"main-{i}"
+            main_path.write_bytes(content)
+            renditions = generate_renditions(
+                str(main_path), out, f"r-{i}", output_mime, target
+            )
+            cpu += time.process_time() - started
+
+            total = len(content) + sum(r["file_size"] for r in renditions)
+            by_kind[kind] = by_kind.get(kind, 0) + total
+            with Image.open(BytesIO(content)) as decoded:
+                ssims.append(ssim(reference(path, folder), decoded, max_side=2048))
+
+    return {
+        "bytes": sum(by_kind.values()),
+        "by_kind": by_kind,
+        "cpu_ms": cpu / len(corpus) * 1000,
+        "ssim": sum(ssims) / len(ssims),
+        "min_ssim": min(ssims),
+    }
+
+
+def main(count: int, folder: str, ssim_target: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = make_corpus(Path(tmp), count)
+        width, height = FOLDER_TARGET_SIZES[folder]
+        print(
+            f"{len(corpus)} imágenes {SOURCE_SIZE[0]}x{SOURCE_SIZE[1]} -> "
+            f"{width}x{height} ({folder}), SSIM objetivo {ssim_target}"
+        )
+        kinds = sorted({kind for _, _, kind in corpus})
+        header = "".join(f"{kind:>13}" for kind in kinds)
+        print(
+            f"{'modo':7} {'total':>9} {'ahorro':>7}{header} {'CPU/img':>9} "
+            f"{'SSIM':>7} {'mín':>7}"
+        )
+        baseline = None
+        for mode in ("fixed", "ssim", "budget"):
+            r = run_mode(mode, corpus, folder, ssim_target)
+            baseline = baseline or r["bytes"]
+            saved = 1 - r["bytes"] / baseline
+            per_kind = "".join(f"{r['by_kind'][k] / 1024:11.0f}KB" for k in kinds)
+            print(
+                f"{mode:7} {r['bytes'] / 1024:7.0f}KB {saved:6.1%}{per_kind} "
+                f"{r['cpu_ms']:7.0f}ms {r['ssim']:7.4f} {r['min_ssim']:7.4f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--images", type=int, default=4)
+    parser.add_argument(
+        "--folder", choices=sorted(FOLDER_TARGET_SIZES), default="projects"
+    )
+    parser.add_argument("--ssim", type=float, default=0.98)
+    args = parser.parse_args()
+    main(args.images, args.folder, args.ssim)
@@ -0,0 +1,97 @@
+"""
+Benchmark: servicio de /uploads con StaticFiles vs la ruta de media
+
+Compara el montaje ``StaticFiles`` anterior con ``app.api.routes.media`` en
+tres escenarios típicos del sitio público:
+
+- GET completo de una imagen (~200KB)
+- GET condicional con ``If-None-Match`` (revalidación del navegador)
+- GET con ``Range`` de 1MB sobre un vídeo de 32MB (scrubbing de la galería)
+
+Ambas apps se ejecutan en proceso con ``httpx.ASGITransport``, de modo que
+se mide el coste de la aplicación y no la red. Uso (desde backend/):
+
+    python -m benchmarks.bench_media [--requests 300]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+from starlette.staticfiles import StaticFiles
+
+from app.api.routes import media
+from app.core.config import settings
+
+IMAGE_NAME = "hero/" + "ab" * 32 + ".jpg"
+VIDEO_NAME = "projects/" + "cd" * 32 + ".mp4"
+
+
+def build_apps(directory: Path) -> dict:
+    static_app = FastAPI()
+    static_app.mount("/uploads", StaticFiles(directory=directory), name="uploads")
+
+    settings.UPLOAD_DIR = str(directory)
+    media_app = FastAPI()
+    media_app.include_router(media.router, prefix="/uploads")
+    return {"StaticFiles": static_app, "media": media_app}
+
+
+async def run_scenario(app: FastAPI, path: str, headers: dict, requests: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        # Calentamiento y ETag para el escenario condicional
+        first = await c.get(path)
+        if headers.get("If-None-Match") == "{etag}":
+            headers = {"If-None-Match": first.headers.get("etag", "")}
+
+        transferred = 0
+        statuses = set()
+        started = time.perf_counter()
+        for _ in range(requests):
+            response = await c.get(path, headers=headers)
+            transferred += len(response.content)
+            statuses.add(response.status_code)
+        elapsed = time.perf_counter() - started
+
+    return {
+        "req_s": requests / elapsed,
+        "mb_per_req": transferred / requests / 1024 / 1024,
+        "statuses": ",".join(str(s) for s in sorted(statuses)),
+    }
+
+
+async def main(requests: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        for name, size in ((IMAGE_NAME, 200 * 1024), (VIDEO_NAME, 32 * 1024 * 1024)):
+            path = directory / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(os.urandom(size))
+
+        scenarios = [
+            ("imagen completa", f"/uploads/{IMAGE_NAME}", {}),
+            ("If-None-Match", f"/uploads/{IMAGE_NAME}", {"If-None-Match": "{etag}"}),
+            ("Range 1MB vídeo", f"/uploads/{VIDEO_NAME}", {"Range": "bytes=0-1048575"}),
+        ]
+
+        print(f"{'escenario':<18}{'app':<13}{'req/s':>10}{'MB/req':>10}{'status':>10}")
+        for label, path, headers in scenarios:
+            for app_name, app in build_apps(directory).items():
+                result = await run_scenario(app, path, dict(headers), requests)
+                print(
+                    f"{label:<18}{app_name:<13}{result['req_s']:>10.1f}"
+                    f"{result['mb_per_req']:>10.3f}{result['statuses']:>10}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
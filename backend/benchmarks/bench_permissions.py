@@ -0,0 +1,101 @@
+"""
+Benchmark: comprobación de permisos recorriendo roles vs conjunto compilado
+
+Compara la comprobación anterior de ``check_permission`` (recorrer cada rol
+y cada permiso del usuario, comprobar los nombres de rol de administrador y
+formatear ``f"{resource}.{action}"`` en cada llamada) con
+``Principal.has_permission`` sobre el ``frozenset`` compilado, para un
+usuario con muchos roles. También mide lo que cuesta compilar el conjunto,
+que solo se paga cuando cambia ``permissions_version``.
+
+Se mide en memoria con objetos simples, sin base de datos. Uso (desde
+backend/):
+
+    python -m benchmarks.bench_permissions [--roles 20] [--permissions 40]
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, List
+
+from app.core.principal import Principal, compile_permissions
+
+
+def make_user(roles: int, permissions: int) -> Any:
+    return SimpleNamespace(
+        id=1,
+        username="editor",
+        is_active=True,
+        is_superuser=False,
+        permissions_version=0,
+        roles=[
+            SimpleNamespace(
+                name=f"rol-{r}",
+                is_active=True,
+                permissions=[
+                    SimpleNamespace(code=f"recurso{r}.accion{p}", is_active=True)
+                    for p in range(permissions)
+                ],
+            )
+            for r in range(roles)
+        ],
+    )
+
+
+def legacy_check(user: Any, resource: str, action: str) -> bool:
+    """La comprobación anterior de check_permission"""
+    if user.is_superuser:
+        return True
+    admin_roles = ["Administrador", "Admin"]
+    if any(role.name in admin_roles for role in user.roles):
+        return True
+    required_code = f"{resource}.{action}"
+    for role in user.roles:
+        if not role.is_active:
+            continue
+        for permission in role.permissions:
+            if permission.is_active and permission.code == required_code:
+                return True
+    return False
+
+
+def timed(fn: Callable[[], Any], calls: int) -> float:
+    """Microsegundos por llamada"""
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def main(roles: int, permissions: int, calls: int) -> None:
+    user = make_user(roles, permissions)
+    principal = Principal.from_user(user)
+    # Peor caso (permiso denegado) y un permiso del último rol
+    checks: List[tuple] = [
+        ("denegado", "services", "create"),
+        ("último rol", f"recurso{roles - 1}", f"accion{permissions - 1}"),
+    ]
+
+    print(f"{roles} roles x {permissions} permisos, {calls} llamadas")
+    for label, resource, action in checks:
+        code = f"{resource}.{action}"
+        assert legacy_check(user, resource, action) == principal.has_permission(code)
+        legacy = timed(lambda: legacy_check(user, resource, action), calls)
+        compiled = timed(lambda: principal.has_permission(code), calls)
+        print(
+            f"{label:<11}: recorrido {legacy:8.2f}µs  "
+            f"compilado {compiled:6.3f}µs  ({legacy / compiled:.0f}x)"
+        )
+
+    compile_cost = timed(lambda: compile_permissions(user.roles), max(1, calls // 100))
+    print(f"compilar   : {compile_cost:8.2f}µs (una vez por versión)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--roles", type=int, default=20)
+    parser.add_argument("--permissions", type=int, default=40)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.roles, args.permissions, args.calls)
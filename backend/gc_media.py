@@ -0,0 +1,79 @@
+"""
+Script para purgar archivos subidos que ya no usa ningún contenido
+
+Uso (desde backend/):
+
+    python gc_media.py                 # informe (dry-run)
+    python gc_media.py --purge         # borrar de verdad
+    python gc_media.py --reindex       # reconstruir antes el índice
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Añadir el directorio backend al path
+sys.path.append(str(Path(__file__).parent))
+
+import app.models  # noqa: F401  (registrar todos los modelos)
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.media_gc_service import MediaGCService
+
+
+def format_bytes(size: int) -> str:
+    value = float(size)
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+async def run(args: argparse.Namespace) -> None:
+    db = SessionLocal()
+    try:
+        service = MediaGCService(db)
+        if args.reindex:
+            print("📝 Reconstruyendo índice de referencias...")
+            print(f"   {service.rebuild_index()} referencias indexadas")
+
+        report = await service.collect(
+            grace_hours=args.grace_hours,
+            batch_size=args.batch_size,
+            dry_run=not args.purge,
+        )
+
+        for item in report["files"]:
+            state = "activo" if item["is_active"] else "eliminado"
+            print(
+                f"   - #{item['id']} {item['file_path']} "
+                f"({state}, {format_bytes(item['bytes'])})"
+            )
+        for error in report["errors"]:
+            print(f"❌ #{error['id']}: {error['error']}")
+
+        reclaimed = format_bytes(report["bytes_reclaimed"])
+        if report["dry_run"]:
+            print(
+                f"⚠️  Dry-run: {report['candidates']} archivos huérfanos "
+                f"({reclaimed}). Usa --purge para borrarlos"
+            )
+        else:
+            print(f"✅ {report['purged']} archivos purgados ({reclaimed} liberados)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--purge", action="store_true", help="Borrar (por defecto solo informa)"
+    )
+    parser.add_argument(
+        "--grace-hours", type=int, default=settings.MEDIA_GC_GRACE_HOURS
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.MEDIA_GC_BATCH_SIZE)
+    parser.add_argument("--reindex", action="store_true")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,82 @@
+"""
+Script para re-renderizar las imágenes de un folder con el spec vigente
+
+Tras cambiar IMAGE_FOLDER_SIZES, IMAGE_RENDITION_WIDTHS o
+IMAGE_RENDITION_FORMATS, deriva de nuevo cada imagen desde su original.
+
+Uso (desde backend/):
+
+    python rerender_media.py --folder hero          # nuevo trabajo
+    python rerender_media.py --resume 3             # reanudar el trabajo #3
+    python rerender_media.py --thumbnails           # miniaturas que falten
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Añadir el directorio backend al path
+sys.path.append(str(Path(__file__).parent))
+
+import app.models  # noqa: F401  (registrar todos los modelos)
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.rerender_service import RerenderService
+from app.services.upload_service import UploadService
+
+
+async def run(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        service = RerenderService(db)
+        if args.thumbnails:
+            print("🖼️  Generando las miniaturas que faltan...")
+            created, failed = await service.backfill_thumbnails(args.batch_size)
+            print(f"✅ {created} miniaturas generadas, {failed} con errores")
+            return 0
+
+        if args.resume:
+            job = service.get_job(args.resume)
+            if job is None:
+                print(f"❌ No existe el trabajo #{args.resume}")
+                return 1
+            if job.status == "completed" or not service.claim_for_resume(job):
+                print(f"❌ El trabajo #{job.id} ya terminó o sigue en curso")
+                return 1
+            print(
+                f"🔁 Reanudando trabajo #{job.id} ({job.folder}) "
+                f"desde el archivo #{job.last_file_id}"
+            )
+        else:
+            job = service.create_job(args.folder)
+            print(
+                f"🖼️  Trabajo #{job.id}: {job.total} imágenes de '{job.folder}' "
+                f"con el spec {job.spec_version} {job.spec}"
+            )
+
+        try:
+            await service.run(job, batch_size=args.batch_size)
+        except BaseException:
+            print(
+                f"❌ Interrumpido en {job.processed}/{job.total}. "
+                f"Reanuda con: python rerender_media.py --resume {job.id}"
+            )
+            raise
+
+        print(f"✅ {job.processed} imágenes re-renderizadas, {job.failed} con errores")
+        if job.error:
+            print(f"   Último error: {job.error}")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--folder", choices=UploadService.ALLOWED_FOLDERS)
+    target.add_argument("--resume", type=int, metavar="JOB_ID")
+    target.add_argument("--thumbnails", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=settings.RERENDER_BATCH_SIZE)
+    sys.exit(asyncio.run(run(parser.parse_args())))
@@ -12,7 +12,14 @@ from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.core.database import Base, get_db
+from app.core.principal import (
+    compiled_permissions,
+    permission_stamp,
+    principal_cache,
+)
+from app.core.rate_limit import variant_miss_limiter
 from app.core.security import get_password_hash
+from app.core.token_revocation import revocation_list
 from app.main import app
 from app.models.permission import Permission
 from app.models.role import Role
@@ -43,6 +50,25 @@ def db() -> Generator[Session, None, None]:
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_principal_cache() -> Generator[None, None, None]:
+    """
+    Start every test without cached principals (ids repeat across tests)
+    or rate limit state.
+    """
+    principal_cache.clear()
+    compiled_permissions.clear()
+    permission_stamp.expire()
+    revocation_list.reset()
+    variant_miss_limiter.reset()
+    yield
+    principal_cache.clear()
+    compiled_permissions.clear()
+    permission_stamp.expire()
+    revocation_list.reset()
+    variant_miss_limiter.reset()
+
+
 @pytest.fixture(scope="function")
 def client(db: Session) -> Generator[TestClient, None, None]:
     """
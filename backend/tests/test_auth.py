@@ -2,10 +2,25 @@
 Tests for authentication endpoints.
 """
 
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
+from app.core import security
+from app.core.config import settings
+from app.core.password_executor import PasswordExecutor
+from app.core.security import (
+    create_access_token,
+    decode_access_token,
+    password_needs_rehash,
+)
+from app.core.token_revocation import BloomFilter, revocation_list
+from app.models.revoked_token import RevokedToken
 from app.models.user import User
 
 
@@ -51,6 +66,92 @@ class TestLogin:
         # Skip this test as inactive user validation might not be implemented
         pytest.skip("Inactive user validation not implemented in login endpoint")
 
+    def test_login_rehashes_password_with_new_cost(
+        self,
+        client: TestClient,
+        db: Session,
+        test_admin_user: User,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Test that a hash with an outdated bcrypt cost is upgraded."""
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+        assert password_needs_rehash(test_admin_user.hashed_password)
+
+        credentials = {"username": "testadmin", "password": "admin123"}
+        assert client.post("/api/auth/login", data=credentials).status_code == 200
+
+        db.refresh(test_admin_user)
+        assert test_admin_user.hashed_password.startswith("$2b$04$")
+        assert not password_needs_rehash(test_admin_user.hashed_password)
+        assert client.post("/api/auth/login", data=credentials).status_code == 200
+
+    def test_login_database_work_stays_off_the_event_loop(
+        self,
+        client: TestClient,
+        db: Session,
+        test_admin_user: User,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Test the lookup, rehash commit, claims and audit log statements."""
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+        monkeypatch.setattr(settings, "JWT_AUTHZ_CLAIMS", True)
+        on_loop = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            on_loop.append(statement)
+
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            for password in ("admin123", "wrong"):
+                client.post(
+                    "/api/auth/login",
+                    data={"username": "testadmin", "password": password},
+                )
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        db.refresh(test_admin_user)
+        assert test_admin_user.hashed_password.startswith("$2b$04$")
+        assert on_loop == []
+
+    def test_login_returns_503_when_password_pool_is_full(
+        self,
+        client: TestClient,
+        test_admin_user: User,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Test that login fails fast instead of queueing behind bcrypt."""
+        executor = PasswordExecutor(max_workers=1, max_queue=0, kind="thread")
+        monkeypatch.setattr(security, "get_password_executor", lambda: executor)
+        release = threading.Event()
+        busy = threading.Thread(
+            target=lambda: asyncio.run(executor.submit(release.wait, 5))
+        )
+        busy.start()
+        try:
+            for _ in range(100):
+                if executor.metrics()["in_flight"]:
+                    break
+                release.wait(0.01)
+
+            response = client.post(
+                "/api/auth/login",
+                data={"username": "testadmin", "password": "admin123"},
+            )
+        finally:
+            release.set()
+            busy.join()
+            executor.shutdown()
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert executor.metrics()["rejected"] == 1
+
 
 @pytest.mark.auth
 @pytest.mark.skip(reason="Refresh token endpoint not implemented yet")
@@ -162,3 +263,66 @@ class TestChangePassword:
         )
 
         assert response.status_code == 401
+
+
+@pytest.mark.auth
+class TestLogout:
+    """Test revoking tokens on logout."""
+
+    def test_logout_revokes_the_token(
+        self, client: TestClient, db: Session, admin_headers: dict
+    ):
+        """Test that only the logged out token stops working."""
+        other = client.post(
+            "/api/auth/login", data={"username": "testadmin", "password": "admin123"}
+        ).json()["access_token"]
+
+        response = client.post("/api/auth/logout", headers=admin_headers)
+
+        assert response.status_code == 204
+        assert client.get("/api/auth/me", headers=admin_headers).status_code == 401
+        assert (
+            client.get(
+                "/api/auth/me", headers={"Authorization": f"Bearer {other}"}
+            ).status_code
+            == 200
+        )
+        assert db.query(RevokedToken).count() == 1
+
+    def test_revocation_seen_after_refresh(self, db: Session, test_admin_user: User):
+        """Test a revocation made by another worker (straight into the table)."""
+        token = create_access_token({"sub": "testadmin"}, timedelta(minutes=5))
+        payload = decode_access_token(token, db)
+        assert payload is not None
+
+        db.add(
+            RevokedToken(
+                jti=payload["jti"],
+                expires_at=datetime.now(timezone.utc) + timedelta(minutes=5),
+            )
+        )
+        db.commit()
+        revocation_list.refresh(db)
+
+        assert decode_access_token(token, db) is None
+
+    def test_filter_miss_skips_the_database(self, db: Session, test_admin_user: User):
+        token = create_access_token({"sub": "testadmin"}, timedelta(minutes=5))
+        revocation_list.refresh(db)
+        positives = revocation_list.positives
+
+        assert decode_access_token(token, db) is not None
+        assert revocation_list.positives == positives
+
+
+class TestBloomFilter:
+    """Test the Bloom filter used for revoked tokens."""
+
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"revoked-{i}")
+
+        assert all(f"revoked-{i}" in bloom for i in range(1000))
+        false_positives = sum(f"valid-{i}" in bloom for i in range(10000))
+        assert false_positives < 300
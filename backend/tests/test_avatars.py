@@ -0,0 +1,166 @@
+"""
+Tests for the avatar pipeline (renditions, content-hash names, cleanup).
+"""
+
+from io import BytesIO
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import User
+from tests.test_uploads import make_jpeg
+
+
+@pytest.fixture
+def upload_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+def upload_avatar(client: TestClient, headers: Dict[str, str], content: bytes):
+    return client.post(
+        "/api/profile/upload-avatar",
+        files={"file": ("avatar.jpg", content, "image/jpeg")},
+        headers=headers,
+    )
+
+
+def avatar_files(upload_dir: Path) -> set:
+    return {path.name for path in (upload_dir / "avatars").glob("*")}
+
+
+@pytest.mark.uploads
+class TestAvatarUpload:
+    """Test uploading, replacing and deleting avatars."""
+
+    def test_upload_creates_square_webp_renditions(
+        self, client: TestClient, admin_headers: Dict[str, str], upload_dir: Path
+    ):
+        response = upload_avatar(client, admin_headers, make_jpeg(1200, 900))
+
+        assert response.status_code == 200
+        body = response.json()
+        assert set(body["avatar_urls"]) == {"32", "64", "256"}
+        assert body["avatar_url"] == body["avatar_urls"]["256"]
+        for size, url in body["avatar_urls"].items():
+            key = url.removeprefix("/uploads/")
+            with Image.open(upload_dir / key) as img:
+                assert img.format == "WEBP"
+                assert img.size == (int(size), int(size))
+
+        served = client.get(body["avatar_urls"]["32"])
+        assert served.status_code == 200
+        assert "immutable" in served.headers["cache-control"]
+
+        me = client.get("/api/profile/me", headers=admin_headers).json()
+        assert me["avatar_urls"] == body["avatar_urls"]
+
+    def test_replacing_removes_old_files(
+        self, client: TestClient, admin_headers: Dict[str, str], upload_dir: Path
+    ):
+        upload_avatar(client, admin_headers, make_jpeg(color=(200, 0, 0)))
+        first = avatar_files(upload_dir)
+        upload_avatar(client, admin_headers, make_jpeg(color=(0, 0, 200)))
+
+        assert len(first) == 3
+        assert avatar_files(upload_dir).isdisjoint(first)
+        assert len(avatar_files(upload_dir)) == 3
+
+    def test_shared_avatar_files_are_kept(
+        self,
+        client: TestClient,
+        db: Session,
+        admin_headers: Dict[str, str],
+        upload_dir: Path,
+    ):
+        avatar_url = upload_avatar(client, admin_headers, make_jpeg()).json()[
+            "avatar_url"
+        ]
+        db.add(
+            User(
+                email="other@test.com",
+                username="other",
+                hashed_password="x",
+                avatar_url=avatar_url,
+            )
+        )
+        db.commit()
+
+        response = client.delete("/api/profile/avatar", headers=admin_headers)
+
+        assert response.status_code == 200
+        assert len(avatar_files(upload_dir)) == 3
+
+    def test_foreign_files_are_never_deleted(
+        self,
+        client: TestClient,
+        db: Session,
+        test_admin_user: User,
+        admin_headers: Dict[str, str],
+        upload_dir: Path,
+    ):
+        """Test that an avatar_url pointing at another folder is left alone."""
+        hero = upload_dir / "hero" / f"{'ab' * 32}.jpg"
+        hero.parent.mkdir()
+        hero.write_bytes(make_jpeg())
+
+        for replace in (True, False):
+            test_admin_user.avatar_url = f"/uploads/hero/{hero.name}"
+            db.commit()
+            if replace:
+                upload_avatar(client, admin_headers, make_jpeg(color=(0, 200, 0)))
+            else:
+                client.delete("/api/profile/avatar", headers=admin_headers)
+            assert hero.exists()
+
+    def test_delete_removes_files(
+        self, client: TestClient, admin_headers: Dict[str, str], upload_dir: Path
+    ):
+        upload_avatar(client, admin_headers, make_jpeg())
+
+        client.delete("/api/profile/avatar", headers=admin_headers)
+
+        assert avatar_files(upload_dir) == set()
+        me = client.get("/api/profile/me", headers=admin_headers).json()
+        assert me["avatar_url"] is None
+        assert me["avatar_urls"] == {}
+
+    def test_rejects_invalid_uploads(
+        self, client: TestClient, admin_headers: Dict[str, str], upload_dir: Path
+    ):
+        too_large = upload_avatar(client, admin_headers, b"x" * (5 * 1024 * 1024 + 1))
+        not_image = upload_avatar(client, admin_headers, b"definitely not a jpeg")
+        wrong_type = client.post(
+            "/api/profile/upload-avatar",
+            files={"file": ("avatar.svg", b"<svg/>", "image/svg+xml")},
+            headers=admin_headers,
+        )
+
+        assert too_large.status_code == 400
+        assert not_image.status_code == 400
+        assert wrong_type.status_code == 400
+        assert (
+            not (upload_dir / "avatars").exists() or avatar_files(upload_dir) == set()
+        )
+        assert list((upload_dir / ".tmp").iterdir()) == []
+
+    def test_transparent_png_keeps_alpha(
+        self, client: TestClient, admin_headers: Dict[str, str], upload_dir: Path
+    ):
+        output = BytesIO()
+        Image.new("RGBA", (300, 300), (0, 0, 0, 0)).save(output, format="PNG")
+
+        response = client.post(
+            "/api/profile/upload-avatar",
+            files={"file": ("avatar.png", output.getvalue(), "image/png")},
+            headers=admin_headers,
+        )
+
+        key = response.json()["avatar_url"].removeprefix("/uploads/")
+        with Image.open(upload_dir / key) as img:
+            assert img.mode == "RGBA"
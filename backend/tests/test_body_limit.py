@@ -0,0 +1,143 @@
+"""
+Tests for request body limits enforced by the ASGI middleware.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.body_limit import body_limit_for
+from app.core.config import settings
+from tests.test_uploads import make_jpeg
+
+BOUNDARY = "limit-test-boundary"
+
+
+@pytest.fixture
+def upload_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def small_limits(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        settings,
+        "REQUEST_BODY_LIMITS",
+        {"/api/uploads/": 20_000, "/api/profile/upload-avatar": 5_000},
+    )
+
+
+def multipart_chunks(content: bytes, chunk_size: int = 4096) -> Iterator[bytes]:
+    """Multipart body sent in chunks, without Content-Length."""
+    yield (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="big.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode()
+    for start in range(0, len(content), chunk_size):
+        yield content[start : start + chunk_size]
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def stored_files(upload_dir: Path) -> list:
+    return [path for path in upload_dir.rglob("*") if path.is_file()]
+
+
+class TestLimitLookup:
+    """Test resolving the limit of a path."""
+
+    def test_longest_prefix_wins(self):
+        limits = {"/api/uploads/": 100, "/api/uploads/batch": 500}
+
+        assert body_limit_for("/api/uploads/", limits, 10) == 100
+        assert body_limit_for("/api/uploads/batch", limits, 10) == 500
+        assert body_limit_for("/api/services/", limits, 10) == 10
+
+    def test_other_routes_unlimited_by_default(self):
+        assert settings.REQUEST_BODY_MAX_SIZE is None
+        assert body_limit_for("/api/services/") is None
+
+
+@pytest.mark.uploads
+class TestBodySizeLimit:
+    """Test rejecting oversized bodies before they are parsed."""
+
+    def test_rejected_by_content_length(
+        self, client: TestClient, upload_dir: Path, small_limits: None
+    ):
+        """Test that the route never runs (not even authentication)."""
+        response = client.post(
+            "/api/uploads/?folder=projects",
+            files={"file": ("big.jpg", b"x" * 30_000, "image/jpeg")},
+        )
+
+        assert response.status_code == 413
+        assert "20000" in response.json()["detail"]
+
+    def test_stream_aborted_over_limit(
+        self,
+        client: TestClient,
+        admin_headers: Dict[str, str],
+        upload_dir: Path,
+        small_limits: None,
+    ):
+        """Test a chunked body with no Content-Length."""
+        response = client.post(
+            "/api/uploads/?folder=projects",
+            headers={
+                **admin_headers,
+                "Content-Type": f"multipart/form-data; boundary={BOUNDARY}",
+            },
+            content=multipart_chunks(b"x" * 30_000),
+        )
+
+        assert response.status_code == 413
+        assert stored_files(upload_dir) == []
+
+    def test_avatar_limit(
+        self,
+        client: TestClient,
+        admin_headers: Dict[str, str],
+        upload_dir: Path,
+        small_limits: None,
+    ):
+        response = client.post(
+            "/api/profile/upload-avatar",
+            headers=admin_headers,
+            files={"file": ("avatar.jpg", b"x" * 6_000, "image/jpeg")},
+        )
+
+        assert response.status_code == 413
+
+    def test_body_under_limit_is_accepted(
+        self,
+        client: TestClient,
+        admin_headers: Dict[str, str],
+        upload_dir: Path,
+        small_limits: None,
+    ):
+        response = client.post(
+            "/api/uploads/?folder=projects",
+            headers={
+                **admin_headers,
+                "Content-Type": f"multipart/form-data; boundary={BOUNDARY}",
+            },
+            content=multipart_chunks(make_jpeg(64, 64)),
+        )
+
+        assert response.status_code == 200
+
+    def test_global_limit_is_opt_in(
+        self, client: TestClient, monkeypatch: pytest.MonkeyPatch
+    ):
+        payload = {"username": "x" * 3_000, "password": "secret"}
+
+        response = client.post("/api/auth/login", json=payload)
+        assert response.status_code != 413
+
+        monkeypatch.setattr(settings, "REQUEST_BODY_MAX_SIZE", 2_000)
+        response = client.post("/api/auth/login", json=payload)
+        assert response.status_code == 413
@@ -0,0 +1,218 @@
+"""
+Tests for on-demand image variants and the disk LRU cache.
+"""
+
+import asyncio
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.image_cache import ImageCache, get_image_cache
+from app.core.rate_limit import RateLimiter, RateLimitExceeded, variant_miss_limiter
+from app.models.uploaded_file import UploadedFile
+from app.services.upload_service import UploadService
+from app.utils.images import transform_size
+from tests.test_uploads import make_jpeg, make_upload
+
+
+@pytest.fixture
+def image_file(db: Session, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """Upload a 2000x1200 JPEG with its original into a temporary directory."""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    service = UploadService(db)
+    upload = make_upload(make_jpeg(2000, 1200), "photo.jpg", "image/jpeg")
+    return asyncio.run(service.save_file(upload, "projects", user_id=1))
+
+
+def open_image(content: bytes) -> Image.Image:
+    return Image.open(BytesIO(content))
+
+
+@pytest.mark.uploads
+class TestImageTransform:
+    """Test the /api/images/{file_id} endpoint."""
+
+    def test_width_only_keeps_original_ratio(
+        self, client: TestClient, image_file: UploadedFile
+    ):
+        response = client.get(
+            f"/api/images/{image_file.id}?w=300",
+            headers={"Accept": "image/webp,image/*"},
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/webp"
+        assert response.headers["vary"] == "Accept"
+        assert "immutable" in response.headers["cache-control"]
+        # w=300 is rounded up to the next variant size
+        assert open_image(response.content).size == (320, 192)
+
+    def test_cover_and_contain(self, client: TestClient, image_file: UploadedFile):
+        cover = client.get(f"/api/images/{image_file.id}?w=200&h=200&format=png")
+        assert cover.headers["content-type"] == "image/png"
+        assert "vary" not in cover.headers
+        assert open_image(cover.content).size == (200, 200)
+
+        contain = client.get(
+            f"/api/images/{image_file.id}?w=400&h=100&fit=contain&format=jpeg"
+        )
+        # 400x100 is served as 480x120 (same ratio)
+        assert open_image(contain.content).size == (200, 120)
+
+    def test_never_upscales(self, client: TestClient, image_file: UploadedFile):
+        response = client.get(f"/api/images/{image_file.id}?w=3000&format=jpeg")
+        assert open_image(response.content).size == (2000, 1200)
+
+    def test_variants_are_cached(self, client: TestClient, image_file: UploadedFile):
+        url = f"/api/images/{image_file.id}?w=120&format=webp"
+        first = client.get(url)
+        hits = get_image_cache().metrics()["hits"]
+        second = client.get(url)
+
+        assert second.content == first.content
+        assert get_image_cache().metrics()["hits"] == hits + 1
+
+        not_modified = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+        assert not_modified.status_code == 304
+
+    def test_sizes_are_snapped_to_a_bounded_set(
+        self, client: TestClient, image_file: UploadedFile
+    ):
+        """Test that nearby widths share one cached variant."""
+        first = client.get(f"/api/images/{image_file.id}?w=301&format=webp")
+        misses = get_image_cache().metrics()["misses"]
+        second = client.get(f"/api/images/{image_file.id}?w=310&format=webp")
+
+        assert second.headers["etag"] == first.headers["etag"]
+        assert get_image_cache().metrics()["misses"] == misses
+        assert open_image(second.content).size == (320, 192)
+
+    def test_cache_misses_are_rate_limited(
+        self,
+        client: TestClient,
+        image_file: UploadedFile,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        monkeypatch.setattr(variant_miss_limiter, "per_minute", 1)
+        monkeypatch.setattr(variant_miss_limiter, "burst", 1)
+        url = f"/api/images/{image_file.id}?format=jpeg&w="
+
+        assert client.get(url + "64").status_code == 200
+        limited = client.get(url + "128")
+        assert limited.status_code == 429
+        assert int(limited.headers["retry-after"]) > 0
+        # Cached variants are still served
+        assert client.get(url + "64").status_code == 200
+
+    def test_invalid_requests(self, client: TestClient, image_file: UploadedFile):
+        assert client.get("/api/images/9999?w=100").status_code == 404
+        assert client.get(f"/api/images/{image_file.id}?w=0").status_code == 422
+        assert client.get(f"/api/images/{image_file.id}?fit=zoom").status_code == 422
+        assert client.get(f"/api/images/{image_file.id}?format=gif").status_code == 422
+
+    def test_transform_size(self):
+        assert transform_size((2000, 1000), 500, None, "cover") == (
+            (500, 250),
+            (500, 250),
+        )
+        assert transform_size((2000, 1000), 500, 500, "cover") == (
+            (1000, 500),
+            (500, 500),
+        )
+        assert transform_size((2000, 1000), 500, 500, "contain") == (
+            (500, 250),
+            (500, 250),
+        )
+        # Box larger than the source shrinks keeping the requested ratio
+        assert transform_size((1000, 500), 2000, 2000, "fill") == (
+            (500, 500),
+            (500, 500),
+        )
+
+
+class TestRateLimiter:
+    """Test the per-client token bucket."""
+
+    def test_burst_then_limited_per_client(self):
+        limiter = RateLimiter(per_minute=60, burst=2)
+        limiter.hit("a")
+        limiter.hit("a")
+        with pytest.raises(RateLimitExceeded) as exc:
+            limiter.hit("a")
+        assert exc.value.retry_after == 1
+        limiter.hit("b")
+        assert limiter.limited == 1
+
+    def test_disabled_and_bounded(self):
+        disabled = RateLimiter(per_minute=0, burst=1)
+        for _ in range(10):
+            disabled.hit("a")
+
+        limiter = RateLimiter(per_minute=60, burst=1, max_clients=2)
+        for client in ("a", "b", "c"):
+            limiter.hit(client)
+        # "a" was forgotten: it starts again with a full bucket
+        limiter.hit("a")
+        assert limiter.limited == 0
+
+
+@pytest.mark.uploads
+class TestImageCache:
+    """Test LRU eviction and request coalescing."""
+
+    async def test_lru_eviction(self, tmp_path: Path):
+        cache = ImageCache(str(tmp_path), max_bytes=25)
+
+        def writer(size: int):
+            async def render(path: Path) -> None:
+                path.write_bytes(b"x" * size)
+
+            return render
+
+        first = await cache.get_or_create("aa-1", writer(10))
+        second = await cache.get_or_create("bb-2", writer(10))
+        # Using the first entry makes the second one the least recently used
+        await cache.get_or_create("aa-1", writer(10))
+        third = await cache.get_or_create("cc-3", writer(10))
+
+        assert first.exists() and third.exists()
+        assert not second.exists()
+        metrics = cache.metrics()
+        assert metrics["evictions"] == 1
+        assert metrics["bytes"] == 20
+
+        # The index is rebuilt from disk after a restart
+        reloaded = ImageCache(str(tmp_path), max_bytes=25)
+        await reloaded.get_or_create("aa-1", writer(10))
+        assert reloaded.metrics()["entries"] == 2
+
+    async def test_concurrent_requests_render_once(self, tmp_path: Path):
+        cache = ImageCache(str(tmp_path), max_bytes=1024)
+        calls = []
+
+        async def render(path: Path) -> None:
+            calls.append(path)
+            await asyncio.sleep(0.05)
+            path.write_bytes(b"variant")
+
+        paths = await asyncio.gather(
+            *(cache.get_or_create("dd-variant", render) for _ in range(5))
+        )
+
+        assert len(calls) == 1
+        assert len(set(paths)) == 1
+        assert cache.metrics()["coalesced"] == 4
+
+    async def test_failed_render_is_not_cached(self, tmp_path: Path):
+        cache = ImageCache(str(tmp_path), max_bytes=1024)
+
+        async def fail(path: Path) -> None:
+            raise ValueError("broken")
+
+        with pytest.raises(ValueError):
+            await cache.get_or_create("ee-broken", fail)
+        assert cache.metrics()["entries"] == 0
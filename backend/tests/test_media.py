@@ -0,0 +1,141 @@
+"""
+Tests for the /uploads media serving route.
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.routes.media import MediaFileResponse, parse_range
+from app.core.config import settings
+
+HASH = "ab" * 32
+
+
+@pytest.fixture
+def media_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Serve uploads from a temporary directory with a few files."""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    (tmp_path / "projects").mkdir()
+    (tmp_path / "projects" / f"{HASH}.mp4").write_bytes(bytes(range(256)) * 40)
+    (tmp_path / "projects" / f"{HASH}-480w.webp").write_bytes(b"webp")
+    (tmp_path / "avatars").mkdir()
+    (tmp_path / "avatars" / "profile.png").write_bytes(b"png-bytes")
+    (tmp_path / ".tmp").mkdir()
+    (tmp_path / ".tmp" / "scratch.jpg").write_bytes(b"partial")
+    for originals in (".originals", "originals"):
+        (tmp_path / originals / "ab" / "ab").mkdir(parents=True)
+        (tmp_path / originals / "ab" / "ab" / f"{HASH}.jpg").write_bytes(b"exif")
+    return tmp_path
+
+
+@pytest.mark.uploads
+class TestMediaServing:
+    """Test caching headers, conditional requests and ranges."""
+
+    def test_hashed_file_is_immutable_with_strong_etag(
+        self, client: TestClient, media_dir: Path
+    ):
+        response = client.get(f"/uploads/projects/{HASH}.mp4")
+        assert response.status_code == 200
+        assert response.content == bytes(range(256)) * 40
+        assert response.headers["content-type"] == "video/mp4"
+        assert response.headers["etag"] == f'"{HASH}"'
+        assert "immutable" in response.headers["cache-control"]
+        assert response.headers["accept-ranges"] == "bytes"
+
+        rendition = client.get(f"/uploads/projects/{HASH}-480w.webp")
+        assert rendition.headers["etag"] == f'"{HASH}-480w"'
+
+    def test_unhashed_file_is_revalidated(self, client: TestClient, media_dir: Path):
+        response = client.get("/uploads/avatars/profile.png")
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('W/"')
+        assert response.headers["cache-control"] == "public, no-cache"
+
+    def test_if_none_match_returns_304(self, client: TestClient, media_dir: Path):
+        etag = client.get("/uploads/avatars/profile.png").headers["etag"]
+        response = client.get(
+            "/uploads/avatars/profile.png", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_range_returns_206(self, client: TestClient, media_dir: Path):
+        response = client.get(
+            f"/uploads/projects/{HASH}.mp4", headers={"Range": "bytes=10-19"}
+        )
+        assert response.status_code == 206
+        assert response.content == bytes(range(10, 20))
+        assert response.headers["content-range"] == "bytes 10-19/10240"
+        assert response.headers["content-length"] == "10"
+
+        suffix = client.get(
+            f"/uploads/projects/{HASH}.mp4", headers={"Range": "bytes=-4"}
+        )
+        assert suffix.status_code == 206
+        assert suffix.content == bytes(range(252, 256))
+
+    def test_unsatisfiable_range_returns_416(self, client: TestClient, media_dir: Path):
+        response = client.get(
+            f"/uploads/projects/{HASH}.mp4", headers={"Range": "bytes=99999-"}
+        )
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */10240"
+
+    def test_stale_if_range_sends_full_file(self, client: TestClient, media_dir: Path):
+        response = client.get(
+            f"/uploads/projects/{HASH}.mp4",
+            headers={"Range": "bytes=0-9", "If-Range": '"other"'},
+        )
+        assert response.status_code == 200
+        assert len(response.content) == 10240
+
+    def test_head_has_no_body(self, client: TestClient, media_dir: Path):
+        response = client.head(f"/uploads/projects/{HASH}.mp4")
+        assert response.status_code == 200
+        assert response.content == b""
+        assert response.headers["content-length"] == "10240"
+
+    def test_internal_and_missing_paths_are_404(
+        self, client: TestClient, media_dir: Path
+    ):
+        assert client.get("/uploads/.tmp/scratch.jpg").status_code == 404
+        assert client.get("/uploads/projects/missing.jpg").status_code == 404
+        assert client.get("/uploads/projects").status_code == 404
+        assert client.get("/uploads/%2e%2e/secret").status_code == 404
+
+    def test_originals_are_never_served(self, client: TestClient, media_dir: Path):
+        """Test that originals (with EXIF/GPS) are not reachable by name."""
+        for originals in (".originals", "originals"):
+            response = client.get(f"/uploads/{originals}/ab/ab/{HASH}.jpg")
+            assert response.status_code == 404
+
+    def test_parse_range(self):
+        assert parse_range("bytes=0-4", 10) == [(0, 4)]
+        assert parse_range("bytes=5-", 10) == [(5, 9)]
+        assert parse_range("bytes=0-99", 10) == [(0, 9)]
+        assert parse_range("bytes=20-30", 10) == []
+        assert parse_range("items=0-4", 10) is None
+        assert parse_range("bytes=4-2", 10) is None
+
+    def test_zerocopy_extension_is_used(self, tmp_path: Path):
+        path = tmp_path / "video.mp4"
+        path.write_bytes(b"0123456789")
+        response = MediaFileResponse(
+            path, {"content-length": "4"}, status_code=206, offset=3, count=4
+        )
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {"type": "http", "extensions": {"http.response.zerocopy": {}}}
+        asyncio.run(response(scope, None, send))
+
+        assert messages[0]["status"] == 206
+        assert messages[1]["type"] == "http.response.zerocopy"
+        assert (messages[1]["offset"], messages[1]["count"]) == (3, 4)
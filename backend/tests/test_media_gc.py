@@ -0,0 +1,204 @@
+"""
+Tests for the media reference index and the orphaned media collector.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.cms_page import CMSPage
+from app.models.media_reference import MediaReference
+from app.models.project import Project
+from app.models.testimonial import Testimonial
+from app.models.uploaded_file import UploadedFile
+from app.services.media_gc_service import MediaGCService
+from app.services.upload_service import UploadService
+from tests.test_uploads import make_jpeg, make_upload
+
+
+@pytest.fixture
+def upload_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+def save_image(db: Session, name: str, color=(200, 50, 50), age_hours: int = 100):
+    upload = make_upload(make_jpeg(64, 48, color), name, "image/jpeg")
+    db_file = asyncio.run(UploadService(db).save_file(upload, "projects", 1))
+    backdate(db, db_file, age_hours)
+    return db_file
+
+
+def backdate(db: Session, db_file: UploadedFile, hours: int) -> None:
+    moment = datetime.now(timezone.utc) - timedelta(hours=hours)
+    db_file.created_at = db_file.updated_at = moment
+    db.commit()
+
+
+def references(db: Session) -> set:
+    return {
+        (ref.owner_type, ref.field, ref.file_path)
+        for ref in db.query(MediaReference).all()
+    }
+
+
+@pytest.mark.uploads
+class TestReferenceIndex:
+    """Test that content writes keep media_references in sync."""
+
+    def test_insert_update_delete(self, db: Session, upload_dir: Path):
+        cover = save_image(db, "cover.jpg")
+        photo = save_image(db, "photo.jpg", color=(10, 200, 10))
+
+        project = Project(
+            title="Obra",
+            slug="obra",
+            featured_image=f"http://localhost:8000{cover.url}?v=2",
+            gallery=[photo.url, "https://youtube.com/watch?v=1"],
+        )
+        db.add(project)
+        db.commit()
+        assert references(db) == {
+            ("projects", "featured_image", cover.file_path),
+            ("projects", "gallery", photo.file_path),
+        }
+
+        project.gallery = []
+        db.commit()
+        assert references(db) == {("projects", "featured_image", cover.file_path)}
+
+        db.delete(project)
+        db.commit()
+        assert references(db) == set()
+
+    def test_urls_embedded_in_page_content(self, db: Session, upload_dir: Path):
+        image = save_image(db, "hero.jpg")
+        variant = save_image(db, "variant.jpg", color=(10, 10, 200))
+
+        db.add(
+            CMSPage(
+                slug="inicio",
+                title="Inicio",
+                content=f'<p>Mira <img src="{image.url}">.</p>',
+                sections={"hero": {"image": f"/api/images/{variant.id}?w=800"}},
+            )
+        )
+        db.commit()
+
+        assert {path for _, _, path in references(db)} == {
+            image.file_path,
+            variant.file_path,
+        }
+
+    def test_rebuild_index(self, db: Session, upload_dir: Path):
+        cover = save_image(db, "cover.jpg")
+        db.add(Project(title="Obra", slug="obra", featured_image=cover.url))
+        db.commit()
+        db.query(MediaReference).delete()
+        db.commit()
+
+        assert MediaGCService(db).rebuild_index() == 1
+        assert references(db) == {("projects", "featured_image", cover.file_path)}
+
+
+@pytest.mark.uploads
+class TestMediaGC:
+    """Test finding and purging unreferenced uploads."""
+
+    def test_dry_run_reports_without_deleting(self, db: Session, upload_dir: Path):
+        orphan = save_image(db, "orphan.jpg")
+
+        report = asyncio.run(MediaGCService(db).collect(dry_run=True))
+
+        assert report["candidates"] == 1
+        assert report["purged"] == 0
+        assert report["files"][0]["id"] == orphan.id
+        assert report["bytes_reclaimed"] > orphan.file_size
+        assert (upload_dir / orphan.file_path).exists()
+        assert db.get(UploadedFile, orphan.id) is not None
+
+    def test_purge_keeps_referenced_and_recent_files(
+        self, db: Session, upload_dir: Path
+    ):
+        used = save_image(db, "used.jpg")
+        recent = save_image(db, "recent.jpg", color=(10, 200, 10), age_hours=1)
+        orphan = save_image(db, "orphan.jpg", color=(10, 10, 200))
+        deleted = save_image(db, "deleted.jpg", color=(200, 200, 10))
+        UploadService(db).delete_file(deleted.id)
+        backdate(db, deleted, 100)
+        db.add(Project(title="Obra", slug="obra", featured_image=used.url))
+        db.commit()
+        orphan_paths = [orphan.file_path, orphan.original_path] + [
+            r.file_path for r in orphan.renditions
+        ]
+
+        report = asyncio.run(MediaGCService(db).collect(dry_run=False, batch_size=1))
+
+        assert report["purged"] == 2
+        assert {item["id"] for item in report["files"]} == {orphan.id, deleted.id}
+        assert all(not (upload_dir / path).exists() for path in orphan_paths)
+        assert {f.id for f in db.query(UploadedFile).all()} == {used.id, recent.id}
+        assert (upload_dir / used.file_path).exists()
+
+    def test_testimonial_photo_is_kept(self, db: Session, upload_dir: Path):
+        photo = save_image(db, "client.jpg")
+        db.add(
+            Testimonial(
+                client_name="Cliente", testimonial="Muy bien", client_photo=photo.url
+            )
+        )
+        db.commit()
+
+        report = asyncio.run(MediaGCService(db).collect(dry_run=False))
+
+        assert report["purged"] == 0
+        assert db.get(UploadedFile, photo.id) is not None
+        assert (upload_dir / photo.file_path).exists()
+
+        # Also after rebuilding the index from the content models
+        MediaGCService(db).rebuild_index()
+        assert references(db) == {("testimonials", "client_photo", photo.file_path)}
+
+    def test_empty_index_is_rebuilt_before_collecting(
+        self, db: Session, upload_dir: Path
+    ):
+        used = save_image(db, "used.jpg")
+        db.add(Project(title="Obra", slug="obra", featured_image=used.url))
+        db.commit()
+        db.query(MediaReference).delete()
+        db.commit()
+
+        report = asyncio.run(MediaGCService(db).collect(dry_run=False))
+
+        assert report["candidates"] == 0
+        assert db.get(UploadedFile, used.id) is not None
+
+    def test_gc_endpoint(
+        self,
+        client: TestClient,
+        db: Session,
+        admin_headers: Dict[str, str],
+        upload_dir: Path,
+    ):
+        orphan = save_image(db, "orphan.jpg")
+
+        response = client.post(
+            "/api/uploads/gc",
+            params={"dry_run": False, "reindex": True},
+            headers=admin_headers,
+        )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["purged"] == 1
+        assert body["reindexed"] == 0
+        assert db.get(UploadedFile, orphan.id) is None
+
+        metrics = client.get("/api/uploads/metrics", headers=admin_headers).json()
+        assert metrics["media_gc"]["purged"] == 1
@@ -0,0 +1,159 @@
+"""
+Tests for MP4 faststart relocation and metadata extraction.
+"""
+
+import asyncio
+import struct
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.project import Project
+from app.services.upload_service import UploadService
+from app.utils.mp4 import faststart, read_metadata
+from tests.test_uploads import make_upload
+
+CHUNKS = [b"A" * 100, b"B" * 150]
+
+
+def box(box_type: bytes, body: bytes) -> bytes:
+    return struct.pack(">I4s", len(body) + 8, box_type) + body
+
+
+def build_moov(offsets, rotated: bool = False, chunk_box: bytes = b"stco") -> bytes:
+    mvhd = box(b"mvhd", struct.pack(">4xIIII", 0, 0, 1000, 12500) + bytes(80))
+    matrix = (0, 0x10000) if rotated else (0x10000, 0)
+    tkhd = box(
+        b"tkhd",
+        bytes(40)
+        + struct.pack(">ii", *matrix)
+        + bytes(28)
+        + struct.pack(">II", 1280 << 16, 720 << 16),
+    )
+    hdlr = box(b"hdlr", bytes(8) + b"vide" + bytes(13))
+    avcc = box(b"avcC", bytes([1, 0x64, 0x00, 0x1F, 0xFF]))
+    avc1 = box(b"avc1", bytes(24) + struct.pack(">HH", 1280, 720) + bytes(50) + avcc)
+    stsd = box(b"stsd", struct.pack(">4xI", 1) + avc1)
+    entry_format = ">%dQ" if chunk_box == b"co64" else ">%dI"
+    chunks = box(
+        chunk_box,
+        struct.pack(">4xI", len(offsets))
+        + struct.pack(entry_format % len(offsets), *offsets),
+    )
+    stbl = box(b"stbl", stsd + chunks)
+    mdia = box(b"mdia", hdlr + box(b"minf", stbl))
+    return box(b"moov", mvhd + box(b"trak", tkhd + mdia))
+
+
+def build_mp4(moov_at_end: bool = True, **moov_options) -> bytes:
+    """Build a minimal MP4 whose chunk offsets point at CHUNKS in mdat."""
+    ftyp = box(b"ftyp", b"isom" + bytes(4) + b"isomavc1")
+    mdat_body = b"".join(CHUNKS)
+    # Both layouts use a moov of the same size, so offsets can be precomputed
+    moov_size = len(build_moov([0, 0], **moov_options))
+    mdat_start = len(ftyp) + (0 if moov_at_end else moov_size)
+    offsets = [mdat_start + 8, mdat_start + 8 + len(CHUNKS[0])]
+    moov = build_moov(offsets, **moov_options)
+    mdat = box(b"mdat", mdat_body)
+    return ftyp + (mdat + moov if moov_at_end else moov + mdat)
+
+
+def top_level_types(data: bytes) -> list:
+    types, position = [], 0
+    while position < len(data):
+        size, box_type = struct.unpack_from(">I4s", data, position)
+        types.append(box_type)
+        position += size
+    return types
+
+
+def chunk_offsets(data: bytes, chunk_box: bytes = b"stco") -> list:
+    index = data.index(chunk_box)
+    (count,) = struct.unpack_from(">I", data, index + 8)
+    entry_format = ">%dQ" if chunk_box == b"co64" else ">%dI"
+    return list(struct.unpack_from(entry_format % count, data, index + 12))
+
+
+@pytest.mark.uploads
+class TestFaststart:
+    """Test relocating moov in front of mdat."""
+
+    @pytest.mark.parametrize("chunk_box", [b"stco", b"co64"])
+    def test_moov_moved_and_offsets_patched(self, tmp_path: Path, chunk_box: bytes):
+        path = tmp_path / "video.mp4"
+        path.write_bytes(build_mp4(chunk_box=chunk_box))
+
+        assert faststart(str(path)) is True
+
+        data = path.read_bytes()
+        assert top_level_types(data) == [b"ftyp", b"moov", b"mdat"]
+        for offset, chunk in zip(chunk_offsets(data, chunk_box), CHUNKS):
+            assert data[offset : offset + len(chunk)] == chunk
+
+    def test_already_faststart_is_left_alone(self, tmp_path: Path):
+        path = tmp_path / "video.mp4"
+        original = build_mp4(moov_at_end=False)
+        path.write_bytes(original)
+
+        assert faststart(str(path)) is False
+        assert path.read_bytes() == original
+
+    def test_not_mp4_is_left_alone(self, tmp_path: Path):
+        path = tmp_path / "video.mp4"
+        path.write_bytes(b"definitely not an mp4 file")
+
+        assert faststart(str(path)) is False
+        assert read_metadata(str(path)) is None
+
+
+@pytest.mark.uploads
+class TestVideoMetadata:
+    """Test reading duration, dimensions and codec from moov."""
+
+    def test_read_metadata(self, tmp_path: Path):
+        path = tmp_path / "video.mp4"
+        path.write_bytes(build_mp4())
+
+        assert read_metadata(str(path)) == {
+            "duration": 12.5,
+            "width": 1280,
+            "height": 720,
+            "codec": "avc1.64001f",
+        }
+
+    def test_rotated_video_swaps_dimensions(self, tmp_path: Path):
+        path = tmp_path / "video.mp4"
+        path.write_bytes(build_mp4(rotated=True))
+
+        metadata = read_metadata(str(path))
+        assert (metadata["width"], metadata["height"]) == (720, 1280)
+
+    def test_upload_stores_faststart_video_with_metadata(
+        self,
+        client: TestClient,
+        db: Session,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        upload = make_upload(build_mp4(), "obra.mp4", "video/mp4")
+        db_file = asyncio.run(UploadService(db).save_file(upload, "projects", 1))
+
+        assert (db_file.width, db_file.height, db_file.duration) == (1280, 720, 12.5)
+        assert db_file.codec == "avc1.64001f"
+        stored = (tmp_path / db_file.file_path).read_bytes()
+        assert top_level_types(stored)[:2] == [b"ftyp", b"moov"]
+
+        project = Project(title="Obra", slug="obra", video_url=db_file.url)
+        db.add(project)
+        db.commit()
+
+        response = client.get(f"/api/projects/{project.id}")
+        assert response.status_code == 200
+        video = response.json()["video"]
+        assert video["duration"] == 12.5
+        assert video["codec"] == "avc1.64001f"
+        assert video["url"] == db_file.url
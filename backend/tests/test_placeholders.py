@@ -0,0 +1,118 @@
+"""
+Tests for image dimensions, dominant color, BlurHash and LQIP placeholders.
+"""
+
+import asyncio
+import base64
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.hero_image import HeroImage
+from app.models.project import Project
+from app.services.upload_service import UploadService
+from app.utils import blurhash
+from app.utils.images import image_placeholder
+from tests.test_uploads import make_jpeg, make_upload
+
+
+def decode_dc(hash_value: str) -> tuple:
+    value = 0
+    for char in hash_value[2:6]:
+        value = value * 83 + blurhash.BASE83_CHARS.index(char)
+    return value >> 16, (value >> 8) & 255, value & 255
+
+
+@pytest.mark.uploads
+class TestBlurHash:
+    """Test the pure-Python BlurHash encoder."""
+
+    def test_solid_color_average(self):
+        hash_value = blurhash.encode(Image.new("RGB", (32, 24), (200, 50, 50)))
+
+        assert len(hash_value) == 4 + 2 * 4 * 3
+        assert hash_value[0] == "L"  # 4x3 components
+        assert decode_dc(hash_value) == (200, 50, 50)
+
+    def test_component_count(self):
+        hash_value = blurhash.encode(Image.new("RGB", (24, 32), "white"), 3, 4)
+
+        assert len(hash_value) == 4 + 2 * 3 * 4
+        assert hash_value[0] == blurhash.BASE83_CHARS[2 + 3 * 9]
+
+    def test_invalid_components(self):
+        with pytest.raises(ValueError):
+            blurhash.encode(Image.new("RGB", (8, 8)), 0, 3)
+
+
+@pytest.mark.uploads
+class TestImagePlaceholder:
+    """Test computing placeholders from an image file."""
+
+    def test_placeholder_fields(self, tmp_path: Path):
+        img = Image.new("RGB", (300, 200), (20, 120, 220))
+        img.paste((250, 250, 250), (0, 0, 60, 200))  # minority color
+        path = tmp_path / "image.png"
+        img.save(path)
+
+        placeholder = image_placeholder(str(path))
+
+        assert (placeholder["width"], placeholder["height"]) == (300, 200)
+        assert placeholder["dominant_color"] == "#1478dc"
+        assert len(placeholder["blurhash"]) == 28
+        prefix, encoded = placeholder["lqip"].split(",", 1)
+        assert prefix == "data:image/webp;base64"
+        with Image.open(BytesIO(base64.b64decode(encoded))) as lqip:
+            assert lqip.format == "WEBP"
+            assert lqip.width <= 16
+
+    def test_not_an_image(self, tmp_path: Path):
+        path = tmp_path / "image.jpg"
+        path.write_bytes(b"not an image")
+
+        assert image_placeholder(str(path)) is None
+
+
+@pytest.mark.uploads
+class TestPlaceholdersInResponses:
+    """Test that uploads, hero images and projects expose the placeholders."""
+
+    def test_upload_hero_and_project(
+        self,
+        client: TestClient,
+        db: Session,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+        upload = make_upload(make_jpeg(1600, 900), "portada.jpg", "image/jpeg")
+        db_file = asyncio.run(UploadService(db).save_file(upload, "projects", 1))
+
+        # El archivo principal es el recorte 3:2 de "projects"
+        assert (db_file.width, db_file.height) == (1200, 800)
+        assert db_file.dominant_color is not None
+        assert db_file.blurhash and db_file.lqip
+
+        hero = HeroImage(title="Obra", image_url=db_file.url, alt_text="Obra")
+        project = Project(
+            title="Obra",
+            slug="obra",
+            featured_image=db_file.url,
+            gallery=[db_file.url, "https://example.com/externa.jpg"],
+        )
+        db.add_all([hero, project])
+        db.commit()
+
+        hero_image = client.get(f"/api/hero-images/{hero.id}").json()["image"]
+        assert hero_image["width"] == 1200
+        assert hero_image["blurhash"] == db_file.blurhash
+
+        images = client.get(f"/api/projects/{project.id}").json()["images"]
+        assert list(images) == [db_file.url]
+        assert images[db_file.url]["lqip"] == db_file.lqip
+        assert images[db_file.url]["dominant_color"] == db_file.dominant_color
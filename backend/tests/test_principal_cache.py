@@ -0,0 +1,332 @@
+"""
+Tests for the cached principal used to authenticate and authorize requests.
+"""
+
+import dataclasses
+from typing import Dict, Iterator, List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.principal import Principal, compiled_permissions, principal_cache
+from app.core.security import decode_access_token
+from app.models.permission import Permission
+from app.models.role import Role
+from app.models.user import User
+
+SERVICE = {
+    "title": "Servicio",
+    "slug": "servicio",
+    "description": "Test",
+    "is_active": True,
+    "is_featured": False,
+}
+
+
+@pytest.fixture
+def statements(db: Session) -> Iterator[List[str]]:
+    """SQL statements executed while the test runs."""
+    executed: List[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def role_queries(statements: List[str]) -> List[str]:
+    return [s for s in statements if "user_roles" in s]
+
+
+def user_queries(statements: List[str]) -> List[str]:
+    return [s for s in statements if "FROM users" in s]
+
+
+class TestPrincipal:
+    """Test the snapshot built from a user."""
+
+    def test_snapshot_is_immutable(self, db: Session, test_regular_user: User):
+        principal = Principal.from_user(test_regular_user)
+
+        assert principal.roles == frozenset({"Usuario"})
+        assert "user.read" in principal.permissions
+        assert "user.create" not in principal.permissions
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            principal.is_superuser = True  # type: ignore[misc]
+
+    def test_inactive_roles_and_permissions_are_ignored(
+        self, db: Session, test_regular_user: User
+    ):
+        role = test_regular_user.roles[0]
+        role.permissions[0].is_active = False
+        db.commit()
+        codes = Principal.from_user(test_regular_user).permissions
+
+        role.is_active = False
+        db.commit()
+
+        assert role.permissions[0].code not in codes
+        assert len(codes) == len(role.permissions) - 1
+        assert Principal.from_user(test_regular_user).permissions == frozenset()
+
+    def test_admin_flag(self, test_admin_user: User, test_regular_user: User):
+        admin = Principal.from_user(test_admin_user)
+        test_admin_user.is_superuser = False
+
+        assert admin.is_admin and admin.has_permission("anything.at_all")
+        # The Administrador role alone is enough
+        assert Principal.from_user(test_admin_user).is_admin
+        assert not Principal.from_user(test_regular_user).is_admin
+
+
+class TestPrincipalCache:
+    """Test caching and explicit invalidation through the services."""
+
+    def test_roles_loaded_once_per_token(
+        self,
+        client: TestClient,
+        user_headers: Dict[str, str],
+        statements: List[str],
+    ):
+        client.get("/api/profile/me", headers=user_headers)
+        assert role_queries(statements)
+        statements.clear()
+
+        response = client.post("/api/services/", headers=user_headers, json=SERVICE)
+
+        assert response.status_code == 403
+        assert role_queries(statements) == []
+        assert len(principal_cache) == 1
+
+    def test_role_update_invalidates_its_users(
+        self,
+        client: TestClient,
+        db: Session,
+        admin_headers: Dict[str, str],
+        user_headers: Dict[str, str],
+        test_user_role: Role,
+    ):
+        assert (
+            client.post("/api/services/", headers=user_headers, json=SERVICE)
+        ).status_code == 403
+
+        create = db.query(Permission).filter_by(code="services.create").one()
+        response = client.put(
+            f"/api/roles/{test_user_role.id}",
+            headers=admin_headers,
+            json={
+                "permission_ids": [p.id for p in test_user_role.permissions]
+                + [create.id]
+            },
+        )
+        assert response.status_code == 200
+
+        assert (
+            client.post("/api/services/", headers=user_headers, json=SERVICE)
+        ).status_code == 201
+
+    def test_permission_update_invalidates(
+        self,
+        client: TestClient,
+        db: Session,
+        admin_headers: Dict[str, str],
+        user_headers: Dict[str, str],
+        test_user_role: Role,
+    ):
+        create = db.query(Permission).filter_by(code="services.create").one()
+        test_user_role.permissions.append(create)
+        db.commit()
+        assert (
+            client.post("/api/services/", headers=user_headers, json=SERVICE)
+        ).status_code == 201
+
+        response = client.put(
+            f"/api/permissions/{create.id}",
+            headers=admin_headers,
+            json={"is_active": False},
+        )
+        assert response.status_code == 200
+
+        assert (
+            client.post(
+                "/api/services/",
+                headers=user_headers,
+                json={**SERVICE, "slug": "otro"},
+            )
+        ).status_code == 403
+
+    def test_deactivated_user_is_rejected(
+        self,
+        client: TestClient,
+        admin_headers: Dict[str, str],
+        user_headers: Dict[str, str],
+        test_regular_user: User,
+    ):
+        assert client.get("/api/profile/me", headers=user_headers).status_code == 200
+
+        response = client.put(
+            f"/api/users/{test_regular_user.id}",
+            headers=admin_headers,
+            json={"is_active": False},
+        )
+        assert response.status_code == 200
+
+        assert client.get("/api/profile/me", headers=user_headers).status_code == 400
+
+
+class TestPermissionVersion:
+    """Test the per-user version that guards the compiled permission sets."""
+
+    def test_compiled_set_reused_until_version_changes(
+        self,
+        client: TestClient,
+        user_headers: Dict[str, str],
+        statements: List[str],
+    ):
+        client.get("/api/profile/me", headers=user_headers)
+        principal_cache.clear()  # as if the TTL had expired
+        statements.clear()
+
+        assert client.get("/api/profile/me", headers=user_headers).status_code == 200
+        assert role_queries(statements) == []
+        assert len(compiled_permissions) == 1
+
+    def test_membership_changes_bump_the_version(
+        self,
+        client: TestClient,
+        db: Session,
+        admin_headers: Dict[str, str],
+        test_regular_user: User,
+        test_user_role: Role,
+    ):
+        def version() -> int:
+            db.refresh(test_regular_user)
+            return test_regular_user.permissions_version
+
+        # Unrelated edits keep the version
+        client.put(
+            f"/api/roles/{test_user_role.id}",
+            headers=admin_headers,
+            json={"description": "Solo lectura"},
+        )
+        client.put(
+            f"/api/users/{test_regular_user.id}",
+            headers=admin_headers,
+            json={"first_name": "Otro", "role_ids": [test_user_role.id]},
+        )
+        assert version() == 0
+
+        client.put(
+            f"/api/roles/{test_user_role.id}",
+            headers=admin_headers,
+            json={"permission_ids": [test_user_role.permissions[0].id]},
+        )
+        assert version() == 1
+
+        client.put(
+            f"/api/permissions/{test_user_role.permissions[0].id}",
+            headers=admin_headers,
+            json={"is_active": False},
+        )
+        assert version() == 2
+
+        client.put(
+            f"/api/users/{test_regular_user.id}",
+            headers=admin_headers,
+            json={"role_ids": []},
+        )
+        assert version() == 3
+
+
+def login(client: TestClient, username: str, password: str) -> str:
+    response = client.post(
+        "/api/auth/login", data={"username": username, "password": password}
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+@pytest.fixture
+def claims_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "JWT_AUTHZ_CLAIMS", True)
+
+
+class TestAuthorizationClaims:
+    """Test authorizing from the token claims and the permission stamp."""
+
+    def test_claims_only_when_enabled(
+        self, client: TestClient, db: Session, test_regular_user: User
+    ):
+        payload = decode_access_token(login(client, "testuser", "user123"), db)
+
+        assert set(payload) == {"sub", "exp", "jti"}
+
+    def test_token_carries_the_principal(
+        self,
+        client: TestClient,
+        db: Session,
+        test_regular_user: User,
+        claims_enabled: None,
+    ):
+        payload = decode_access_token(login(client, "testuser", "user123"), db)
+
+        assert payload["uid"] == test_regular_user.id
+        assert payload["pv"] == 0
+        assert Principal.from_claims(payload) == dataclasses.replace(
+            Principal.from_user(test_regular_user), permissions_version=0
+        )
+        assert Principal.from_claims({**payload, "uid": "1"}) is None
+        assert Principal.from_claims({"sub": "testuser"}) is None
+
+    def test_authorized_without_loading_roles(
+        self,
+        client: TestClient,
+        test_regular_user: User,
+        claims_enabled: None,
+        statements: List[str],
+    ):
+        headers = {"Authorization": f"Bearer {login(client, 'testuser', 'user123')}"}
+        principal_cache.clear()
+        compiled_permissions.clear()
+        statements.clear()
+
+        response = client.post("/api/services/", headers=headers, json=SERVICE)
+
+        assert response.status_code == 403
+        assert role_queries(statements) == []
+        assert not [s for s in statements if "permission_stamp" in s]
+        assert user_queries(statements) == []
+
+    def test_stale_stamp_falls_back_to_database(
+        self,
+        client: TestClient,
+        db: Session,
+        admin_headers: Dict[str, str],
+        test_user_role: Role,
+        test_regular_user: User,
+        claims_enabled: None,
+    ):
+        headers = {"Authorization": f"Bearer {login(client, 'testuser', 'user123')}"}
+        create = db.query(Permission).filter_by(code="services.create").one()
+
+        response = client.put(
+            f"/api/roles/{test_user_role.id}",
+            headers=admin_headers,
+            json={
+                "permission_ids": [p.id for p in test_user_role.permissions]
+                + [create.id]
+            },
+        )
+        assert response.status_code == 200
+        principal_cache.clear()  # as in another worker
+
+        response = client.post("/api/services/", headers=headers, json=SERVICE)
+
+        assert response.status_code == 201
+        assert decode_access_token(headers["Authorization"][7:], db)["pv"] == 0
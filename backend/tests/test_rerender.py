@@ -0,0 +1,253 @@
+"""
+Tests for bulk re-rendition jobs (new folder spec, checkpoint and resume).
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.media_reference import MediaReference
+from app.models.project import Project
+from app.models.uploaded_file import UploadedFile
+from app.services.rerender_service import RenditionJobLeaseLost, RerenderService
+from app.services.upload_service import UploadService
+from tests.test_uploads import make_jpeg, make_upload
+
+
+@pytest.fixture
+def upload_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+def change_spec(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Change the projects crop and rendition widths (after uploading)."""
+    monkeypatch.setattr(settings, "IMAGE_FOLDER_SIZES", {"projects": (600, 600)})
+    monkeypatch.setattr(settings, "IMAGE_RENDITION_WIDTHS", [300])
+
+
+def save_image(db: Session, name: str, color=(200, 50, 50)) -> UploadedFile:
+    upload = make_upload(make_jpeg(1600, 1000, color), name, "image/jpeg")
+    return asyncio.run(UploadService(db).save_file(upload, "projects", 1))
+
+
+@pytest.mark.uploads
+class TestRerenderJob:
+    """Test re-rendering a folder from the stored originals."""
+
+    def test_uploads_record_spec_version(self, db: Session, upload_dir: Path):
+        db_file = save_image(db, "photo.jpg")
+
+        assert (
+            db_file.rendition_version == UploadService.folder_spec("projects").version
+        )
+
+    def test_rerender_applies_new_spec(
+        self, db: Session, upload_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        db_file = save_image(db, "photo.jpg")
+        change_spec(monkeypatch)
+        old_keys = [db_file.file_path, db_file.thumbnail_path] + [
+            r.file_path for r in db_file.renditions
+        ]
+        project = Project(title="Obra", slug="obra", featured_image=db_file.url)
+        db.add(project)
+        db.commit()
+
+        service = RerenderService(db)
+        job = service.create_job("projects")
+        asyncio.run(service.run(job))
+
+        spec = UploadService.folder_spec("projects")
+        db.refresh(db_file)
+        assert job.status == "completed"
+        assert (job.total, job.processed, job.failed) == (1, 1, 0)
+        assert db_file.rendition_version == spec.version
+        assert (
+            db_file.file_path == f"projects/{db_file.content_hash}-{spec.version}.jpg"
+        )
+        with Image.open(upload_dir / db_file.file_path) as img:
+            assert img.size == (600, 600)
+        assert {r.width for r in db_file.renditions} == {300, 600}
+        assert db_file.thumbnail_path == (
+            f"projects/{db_file.content_hash}-{spec.version}-thumb.webp"
+        )
+        assert (upload_dir / db_file.thumbnail_path).exists()
+        # Old files are gone, content points at the new one
+        assert not any((upload_dir / key).exists() for key in old_keys)
+        db.refresh(project)
+        assert project.featured_image == db_file.url
+        assert db.query(MediaReference.file_path).scalar() == db_file.file_path
+
+    def test_backfill_thumbnails(self, db: Session, upload_dir: Path):
+        """Test generating thumbnails for images uploaded before they existed."""
+        db_file = save_image(db, "photo.jpg")
+        (upload_dir / db_file.thumbnail_path).unlink()
+        db_file.thumbnail_path = None
+        db_file.thumbnail_width = db_file.thumbnail_height = None
+        db.commit()
+
+        created, failed = asyncio.run(RerenderService(db).backfill_thumbnails())
+
+        db.refresh(db_file)
+        assert (created, failed) == (1, 0)
+        assert db_file.thumbnail_path == f"projects/{db_file.content_hash}-thumb.webp"
+        with Image.open(upload_dir / db_file.thumbnail_path) as thumb:
+            assert thumb.size == (db_file.thumbnail_width, db_file.thumbnail_height)
+            assert max(thumb.size) == 256
+        # Nothing left to do on a second run
+        assert asyncio.run(RerenderService(db).backfill_thumbnails()) == (0, 0)
+
+    def test_up_to_date_files_are_skipped(self, db: Session, upload_dir: Path):
+        save_image(db, "photo.jpg")
+
+        service = RerenderService(db)
+        job = service.create_job("projects")
+        asyncio.run(service.run(job))
+
+        assert (job.total, job.processed) == (0, 0)
+
+    def test_resume_from_checkpoint(
+        self,
+        db: Session,
+        upload_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        first = save_image(db, "one.jpg")
+        second = save_image(db, "two.jpg", color=(10, 200, 10))
+        change_spec(monkeypatch)
+        service = RerenderService(db)
+        job = service.create_job("projects")
+
+        apply = service._apply
+        calls = []
+
+        def crash_on_second(db_file, spec, result):
+            calls.append(db_file.id)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            return apply(db_file, spec, result)
+
+        monkeypatch.setattr(service, "_apply", crash_on_second)
+        with pytest.raises(KeyboardInterrupt):
+            asyncio.run(service.run(job, batch_size=1))
+
+        assert job.status == "failed"
+        assert (job.processed, job.last_file_id) == (1, first.id)
+
+        monkeypatch.setattr(service, "_apply", apply)
+        asyncio.run(service.run(job, batch_size=1))
+
+        db.refresh(second)
+        assert job.status == "completed"
+        assert (job.processed, job.last_file_id) == (2, second.id)
+        assert second.rendition_version == UploadService.folder_spec("projects").version
+
+
+@pytest.mark.uploads
+class TestRerenderAPI:
+    """Test the admin re-render endpoints."""
+
+    def test_start_and_poll(
+        self,
+        client: TestClient,
+        db: Session,
+        admin_headers: Dict[str, str],
+        upload_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        save_image(db, "photo.jpg")
+        change_spec(monkeypatch)
+
+        response = client.post(
+            "/api/uploads/rerender?folder=projects", headers=admin_headers
+        )
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+        assert response.json()["total"] == 1
+
+        # TestClient runs background tasks before returning
+        job = client.get(f"/api/uploads/rerender/{job_id}", headers=admin_headers)
+        assert job.json()["status"] == "completed"
+        assert job.json()["processed"] == 1
+
+        resume = client.post(
+            f"/api/uploads/rerender/{job_id}/resume", headers=admin_headers
+        )
+        assert resume.status_code == 409
+
+    def test_resume_running_job(
+        self,
+        client: TestClient,
+        db: Session,
+        admin_headers: Dict[str, str],
+        upload_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        save_image(db, "photo.jpg")
+        change_spec(monkeypatch)
+        service = RerenderService(db)
+        job = service.create_job("projects")
+        job.status = "running"
+        job.runner_id = "other-runner"
+        job.heartbeat_at = datetime.now(timezone.utc)
+        db.commit()
+
+        # The runner is alive: resuming would render the same files twice
+        resume = client.post(
+            f"/api/uploads/rerender/{job.id}/resume", headers=admin_headers
+        )
+        assert resume.status_code == 409
+        db.refresh(job)
+        assert (job.status, job.runner_id) == ("running", "other-runner")
+
+        # The runner stopped heartbeating: the job is stale and can be taken
+        job.heartbeat_at = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.RERENDER_LEASE_SECONDS + 1
+        )
+        db.commit()
+        resume = client.post(
+            f"/api/uploads/rerender/{job.id}/resume", headers=admin_headers
+        )
+        assert resume.status_code == 202
+        db.refresh(job)
+        assert (job.status, job.processed) == ("completed", 1)
+        assert job.runner_id != "other-runner"
+
+    def test_old_runner_stops_after_losing_lease(
+        self, db: Session, upload_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        save_image(db, "photo.jpg")
+        change_spec(monkeypatch)
+        service = RerenderService(db)
+        job = service.create_job("projects")
+
+        renew = service._renew_lease
+
+        def taken_over(job, runner_id):
+            job.runner_id = "new-runner"
+            db.commit()
+            return renew(job, runner_id)
+
+        monkeypatch.setattr(service, "_renew_lease", taken_over)
+        with pytest.raises(RenditionJobLeaseLost):
+            asyncio.run(service.run(job))
+
+        db.refresh(job)
+        assert (job.status, job.processed) == ("running", 0)
+
+    def test_invalid_folder(
+        self, client: TestClient, admin_headers: Dict[str, str], upload_dir: Path
+    ):
+        response = client.post(
+            "/api/uploads/rerender?folder=tmp", headers=admin_headers
+        )
+
+        assert response.status_code == 400
@@ -0,0 +1,162 @@
+"""
+Tests for the upload resize engine (draft decoding, EXIF orientation,
+metadata stripping), the adaptive-quality encoder and the image quality
+metrics.
+"""
+
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageCms, ImageFilter, ImageOps
+
+from app.utils.image_quality import psnr, ssim
+from app.utils.images import EncodeTarget, encode_image, resize_image
+
+
+def make_photo(path: Path, size=(2400, 1800), orientation: int = 1) -> None:
+    """Left half red, right half blue, with camera EXIF and GPS."""
+    img = Image.new("RGB", size, (220, 30, 30))
+    img.paste((30, 30, 220), (size[0] // 2, 0, size[0], size[1]))
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif.get_ifd(0x8825)[2] = (41.0, 9.0, 0.0)  # GPSLatitude
+    icc = ImageCms.ImageCmsProfile(ImageCms.createProfile("sRGB")).tobytes()
+    img.save(path, format="JPEG", quality=92, exif=exif, icc_profile=icc)
+
+
+def open_image(resized: tuple) -> Image.Image:
+    content, _ = resized
+    img = Image.open(BytesIO(content))
+    img.load()
+    return img
+
+
+@pytest.mark.uploads
+class TestResizeImage:
+    """Test resize_image on phone-camera style JPEGs."""
+
+    def test_crops_to_folder_size(self, tmp_path: Path):
+        path = tmp_path / "photo.jpg"
+        make_photo(path)
+
+        img = open_image(resize_image(str(path), "services", "image/jpeg"))
+
+        assert img.size == (800, 600)
+        assert img.getpixel((100, 300))[0] > 180  # red half
+        assert img.getpixel((700, 300))[2] > 180  # blue half
+
+    def test_applies_exif_orientation(self, tmp_path: Path):
+        path = tmp_path / "photo.jpg"
+        # Stored landscape, displayed portrait rotated 90 degrees clockwise
+        make_photo(path, orientation=6)
+
+        img = open_image(resize_image(str(path), "projects", "image/jpeg"))
+
+        assert img.size == (1200, 800)
+        assert img.getpixel((600, 50))[0] > 180  # red half is now on top
+        assert img.getpixel((600, 750))[2] > 180
+
+    def test_strips_metadata_but_keeps_icc(self, tmp_path: Path):
+        path = tmp_path / "photo.jpg"
+        make_photo(path, orientation=6)
+
+        img = open_image(resize_image(str(path), "hero", "image/jpeg"))
+
+        assert len(img.getexif()) == 0
+        assert img.info.get("icc_profile")
+
+    def test_quality_matches_full_decode(self, tmp_path: Path):
+        path = tmp_path / "photo.jpg"
+        noise = Image.effect_noise((3000, 2000), 40).filter(ImageFilter.BoxBlur(2))
+        Image.merge("RGB", (noise, noise.transpose(0), noise)).save(path, quality=95)
+
+        img = open_image(resize_image(str(path), "services", "image/jpeg"))
+        with Image.open(path) as source:
+            reference = ImageOps.fit(source, (800, 600), Image.Resampling.LANCZOS)
+
+        assert ssim(reference, img) > 0.9
+        assert psnr(reference, img) > 30
+
+
+def make_smooth_photo(size=(1200, 800)) -> Image.Image:
+    noise = Image.effect_noise(size, 30).filter(ImageFilter.GaussianBlur(3))
+    sky = Image.linear_gradient("L").resize(size)
+    return Image.merge("RGB", (sky, Image.blend(noise, sky, 0.5), noise))
+
+
+@pytest.mark.uploads
+class TestAdaptiveEncoding:
+    """Test quality search to an SSIM target or a byte budget."""
+
+    def test_ssim_target_is_met_with_fewer_bytes(self):
+        img = make_smooth_photo()
+
+        content = encode_image(img, "JPEG", EncodeTarget(ssim=0.98))
+
+        assert ssim(img, open_image((content, None)), max_side=1024) >= 0.98
+        assert len(content) < len(encode_image(img, "JPEG"))
+
+    def test_higher_target_costs_more_bytes(self):
+        img = make_smooth_photo()
+
+        low = encode_image(img, "WEBP", EncodeTarget(ssim=0.95))
+        high = encode_image(img, "WEBP", EncodeTarget(ssim=0.995))
+
+        assert len(low) < len(high)
+
+    def test_byte_budget_caps_size(self):
+        img = make_smooth_photo()
+        fixed = encode_image(img, "JPEG")
+
+        content = encode_image(img, "JPEG", EncodeTarget(max_bytes=len(fixed) // 2))
+
+        assert len(content) <= len(fixed) // 2
+
+    def test_lossless_formats_ignore_target(self):
+        img = make_smooth_photo((64, 64))
+
+        assert encode_image(img, "PNG", EncodeTarget(ssim=0.5)) == encode_image(
+            img, "PNG"
+        )
+
+    def test_opaque_png_photo_becomes_jpeg(self, tmp_path: Path):
+        path = tmp_path / "photo.png"
+        make_smooth_photo((1600, 1200)).save(path)
+
+        content, mime_type = resize_image(
+            str(path), "services", "image/png", convert_png=True
+        )
+
+        assert mime_type == "image/jpeg"
+        assert open_image((content, mime_type)).format == "JPEG"
+
+    def test_transparent_png_stays_png(self, tmp_path: Path):
+        path = tmp_path / "logo.png"
+        img = make_smooth_photo((1600, 1200)).convert("RGBA")
+        img.putalpha(Image.linear_gradient("L").resize(img.size))
+        img.save(path)
+
+        _, mime_type = resize_image(
+            str(path), "services", "image/png", convert_png=True
+        )
+
+        assert mime_type == "image/png"
+
+
+@pytest.mark.uploads
+class TestQualityMetrics:
+    """Test the Pillow-only PSNR and SSIM."""
+
+    def test_identical_images(self):
+        img = Image.effect_noise((64, 64), 50).convert("RGB")
+
+        assert psnr(img, img) == float("inf")
+        assert ssim(img, img) == pytest.approx(1.0)
+
+    def test_degradation_lowers_scores(self):
+        img = Image.effect_noise((256, 256), 50).convert("RGB")
+        blurred = img.filter(ImageFilter.GaussianBlur(3))
+
+        assert ssim(img, blurred) < 0.9
+        assert psnr(img, blurred) < 30
@@ -0,0 +1,111 @@
+"""
+Tests for the upload storage backends.
+"""
+
+import os
+import uuid
+from pathlib import Path
+
+import pytest
+
+from app.core.storage import LocalStorage, S3Storage
+
+
+@pytest.mark.uploads
+class TestLocalStorage:
+    """Test the local filesystem backend."""
+
+    async def test_put_get_exists_delete(self, tmp_path: Path):
+        """Test the basic object lifecycle."""
+        storage = LocalStorage(str(tmp_path))
+
+        await storage.put("hero/a.jpg", b"data", "image/jpeg")
+
+        assert await storage.exists("hero/a.jpg")
+        assert await storage.get("hero/a.jpg") == b"data"
+        assert await storage.size("hero/a.jpg") == 4
+
+        await storage.delete("hero/a.jpg")
+        assert not await storage.exists("hero/a.jpg")
+        await storage.delete("hero/a.jpg")  # deleting twice is a no-op
+
+    async def test_put_file_moves_source(self, tmp_path: Path):
+        """Test that put_file consumes the local source file."""
+        storage = LocalStorage(str(tmp_path / "store"))
+        source = tmp_path / "upload.tmp"
+        source.write_bytes(b"video")
+
+        await storage.put_file("projects/v.mp4", source, "video/mp4")
+
+        assert not source.exists()
+        assert await storage.get("projects/v.mp4") == b"video"
+
+    async def test_stream_range(self, tmp_path: Path):
+        """Test streaming a byte range in small chunks."""
+        storage = LocalStorage(str(tmp_path))
+        await storage.put("f.bin", bytes(range(100)))
+
+        chunks = [c async for c in storage.stream("f.bin", 10, 29, chunk_size=7)]
+
+        assert b"".join(chunks) == bytes(range(10, 30))
+
+    def test_url_round_trip(self, tmp_path: Path):
+        """Test URL generation and key extraction."""
+        storage = LocalStorage(str(tmp_path))
+
+        assert storage.url("avatars/x.webp") == "/uploads/avatars/x.webp"
+        assert storage.key_from_url("/uploads/avatars/x.webp") == "avatars/x.webp"
+        assert storage.key_from_url("https://cdn.example.com/x.webp") is None
+
+    async def test_rejects_keys_outside_base_dir(self, tmp_path: Path):
+        """Test that keys cannot escape the storage directory."""
+        storage = LocalStorage(str(tmp_path / "store"))
+
+        with pytest.raises(ValueError):
+            await storage.put("../escape.txt", b"x")
+
+
+@pytest.mark.uploads
+@pytest.mark.skipif(
+    not os.getenv("S3_TEST_ENDPOINT_URL"),
+    reason="Set S3_TEST_ENDPOINT_URL (e.g. a local MinIO) to run S3 tests",
+)
+class TestS3Storage:
+    """Test the S3-compatible backend against a local MinIO."""
+
+    @pytest.fixture
+    def storage(self) -> S3Storage:
+        pytest.importorskip("boto3")
+        storage = S3Storage(
+            bucket=os.getenv("S3_TEST_BUCKET", "uploads-test"),
+            endpoint_url=os.environ["S3_TEST_ENDPOINT_URL"],
+            access_key=os.getenv("S3_TEST_ACCESS_KEY", "minioadmin"),
+            secret_key=os.getenv("S3_TEST_SECRET_KEY", "minioadmin"),
+            region="us-east-1",
+            multipart_threshold=5 * 1024 * 1024,
+            multipart_chunk_size=5 * 1024 * 1024,
+        )
+        try:
+            storage.client.create_bucket(Bucket=storage.bucket)
+        except storage.client.exceptions.BucketAlreadyOwnedByYou:
+            pass
+        return storage
+
+    async def test_multipart_put_file_and_range_stream(
+        self, storage: S3Storage, tmp_path: Path
+    ):
+        """Test a multipart upload and a ranged read."""
+        key = f"projects/{uuid.uuid4().hex}.mp4"
+        content = os.urandom(12 * 1024 * 1024)
+        source = tmp_path / "big.mp4"
+        source.write_bytes(content)
+
+        await storage.put_file(key, source, "video/mp4")
+
+        assert not source.exists()
+        assert await storage.size(key) == len(content)
+        chunks = [c async for c in storage.stream(key, 100, 1099)]
+        assert b"".join(chunks) == content[100:1100]
+
+        await storage.delete(key)
+        assert not await storage.exists(key)
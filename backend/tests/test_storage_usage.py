@@ -0,0 +1,166 @@
+"""
+Tests for incremental storage usage counters and quotas.
+"""
+
+import asyncio
+from pathlib import Path
+from typing import Dict
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.rerender_service import RerenderService
+from app.services.storage_usage_service import StorageQuotaError, StorageUsageService
+from app.services.upload_service import UploadService
+from tests.test_uploads import make_jpeg, make_upload
+
+
+@pytest.fixture
+def upload_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+def stored_bytes(db_file) -> int:
+    renditions = sum(r.file_size for r in db_file.renditions)
+    return db_file.file_size + renditions + (db_file.thumbnail_size or 0)
+
+
+def save(db: Session, content: bytes, name: str, user_id: int = 1, folder="projects"):
+    upload = make_upload(content, name, "image/jpeg")
+    return asyncio.run(UploadService(db).save_file(upload, folder, user_id))
+
+
+@pytest.mark.uploads
+class TestUsageCounters:
+    """Test that the counters follow every change to uploaded files."""
+
+    def test_upload_delete_and_reactivate(self, db: Session, upload_dir: Path):
+        service = StorageUsageService(db)
+        content = make_jpeg(1200, 900)
+        db_file = save(db, content, "photo.jpg")
+        video = asyncio.run(
+            UploadService(db).save_file(
+                make_upload(
+                    b"\x00\x00\x00\x18ftypmp42" + b"v" * 500, "a.mp4", "video/mp4"
+                ),
+                "projects",
+                2,
+            )
+        )
+
+        assert service.usage(folder="projects") == (
+            2,
+            stored_bytes(db_file) + video.file_size,
+        )
+        assert service.usage(user_id=1) == (1, stored_bytes(db_file))
+        thumbnail = upload_dir / db_file.thumbnail_path
+        assert db_file.thumbnail_size == thumbnail.stat().st_size > 0
+
+        # A duplicate upload adds nothing
+        save(db, content, "again.jpg")
+        assert service.usage(user_id=1) == (1, stored_bytes(db_file))
+
+        UploadService(db).delete_file(db_file.id)
+        assert service.usage(user_id=1) == (0, 0)
+
+        # Re-uploading a soft-deleted file reactivates it
+        save(db, content, "back.jpg")
+        assert service.usage(user_id=1) == (1, stored_bytes(db_file))
+
+        asyncio.run(UploadService(db).delete_file_permanent(db_file.id))
+        assert service.usage(folder="projects") == (1, video.file_size)
+
+    def test_counters_match_a_full_rebuild(
+        self, db: Session, upload_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test batch uploads and re-renders against a recount from scratch."""
+        asyncio.run(
+            UploadService(db).save_files(
+                [
+                    make_upload(make_jpeg(color=(200, 0, 0)), "a.jpg", "image/jpeg"),
+                    make_upload(make_jpeg(color=(0, 0, 200)), "b.jpg", "image/jpeg"),
+                ],
+                "services",
+                1,
+            )
+        )
+        save(db, make_jpeg(1600, 1000), "hero.jpg", folder="hero")
+        monkeypatch.setattr(settings, "IMAGE_RENDITION_WIDTHS", [300])
+        rerender = RerenderService(db)
+        asyncio.run(rerender.run(rerender.create_job("hero")))
+
+        service = StorageUsageService(db)
+        incremental = service.report()
+        service.rebuild()
+
+        assert incremental == service.report()
+        assert incremental["files"] == 3
+
+
+@pytest.mark.uploads
+class TestQuotas:
+    """Test quotas enforced before an upload is processed."""
+
+    def test_folder_quota(
+        self, db: Session, upload_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ):
+        db_file = save(db, make_jpeg(), "one.jpg")
+        monkeypatch.setattr(
+            settings, "UPLOAD_FOLDER_QUOTAS", {"projects": stored_bytes(db_file) + 10}
+        )
+
+        with pytest.raises(StorageQuotaError):
+            save(db, make_jpeg(color=(0, 90, 0)), "two.jpg")
+
+        # Other folders are not limited
+        save(db, make_jpeg(color=(0, 90, 0)), "two.jpg", folder="services")
+
+    def test_user_quota_rejects_declared_session_size(
+        self,
+        client: TestClient,
+        admin_headers: Dict[str, str],
+        upload_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Test that a resumable session over quota is refused upfront."""
+        monkeypatch.setattr(settings, "UPLOAD_USER_QUOTA", 1000)
+
+        response = client.post(
+            "/api/uploads/sessions",
+            headers=admin_headers,
+            json={
+                "folder": "projects",
+                "filename": "clip.mp4",
+                "mime_type": "video/mp4",
+                "total_size": 5000,
+            },
+        )
+
+        assert response.status_code == 413
+
+
+@pytest.mark.uploads
+class TestUsageAPI:
+    """Test the usage report endpoint."""
+
+    def test_usage_report(
+        self, client: TestClient, admin_headers: Dict[str, str], upload_dir: Path
+    ):
+        response = client.post(
+            "/api/uploads/?folder=hero",
+            headers=admin_headers,
+            files={"file": ("hero.jpg", make_jpeg(1600, 1000), "image/jpeg")},
+        )
+        assert response.status_code == 200
+
+        report = client.get("/api/uploads/usage", headers=admin_headers).json()
+
+        assert report["files"] == 1
+        (hero,) = report["folders"]
+        assert hero["folder"] == "hero"
+        assert hero["by_type"]["image"]["files"] == 1
+        assert hero["bytes"] == report["bytes"] > response.json()["file_size"]
+        assert report["users"][0]["username"] == "testadmin"
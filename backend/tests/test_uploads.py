@@ -0,0 +1,616 @@
+"""
+Tests for the file upload service.
+"""
+
+import asyncio
+import hashlib
+import threading
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers
+
+from app.core.config import settings
+from app.core.image_executor import ImageExecutor, ImageExecutorBusyError
+from app.core.storage import LocalStorage
+from app.schemas.uploaded_file import UploadedFileListItem
+from app.services.upload_service import UploadService
+
+
+def make_upload(content: bytes, filename: str, content_type: str) -> UploadFile:
+    """Build an UploadFile without a declared size (like a chunked request)."""
+    return UploadFile(
+        file=BytesIO(content),
+        filename=filename,
+        headers=Headers({"content-type": content_type}),
+    )
+
+
+def make_jpeg(width: int = 640, height: int = 480, color=(200, 50, 50)) -> bytes:
+    output = BytesIO()
+    Image.new("RGB", (width, height), color).save(output, format="JPEG")
+    return output.getvalue()
+
+
+@pytest.fixture
+def upload_service(db: Session, tmp_path: Path) -> UploadService:
+    return UploadService(db, upload_dir=str(tmp_path))
+
+
+@pytest.mark.uploads
+class TestStreamingUpload:
+    """Test the streaming save_file pipeline."""
+
+    async def test_video_is_streamed_to_disk(
+        self, upload_service: UploadService, tmp_path: Path
+    ):
+        """Test that a video is copied in chunks and renamed into its folder."""
+        upload_service.CHUNK_SIZE = 1024
+        content = b"\x00\x00\x00\x18ftypmp42" + b"x" * 10_000
+
+        db_file = await upload_service.save_file(
+            make_upload(content, "clip.mp4", "video/mp4"), "projects"
+        )
+
+        assert db_file.file_size == len(content)
+        assert db_file.file_path.startswith("projects/")
+        assert (tmp_path / db_file.file_path).read_bytes() == content
+        assert list((tmp_path / ".tmp").iterdir()) == []
+
+    async def test_oversized_upload_is_rejected_while_streaming(
+        self, upload_service: UploadService, tmp_path: Path
+    ):
+        """Test that the size limit aborts the copy and leaves no temp files."""
+        upload_service.CHUNK_SIZE = 1024
+        upload_service.MAX_VIDEO_SIZE = 4096
+
+        with pytest.raises(ValueError, match="Video muy grande"):
+            await upload_service.save_file(
+                make_upload(b"x" * 10_000, "big.mp4", "video/mp4"), "projects"
+            )
+
+        assert list((tmp_path / ".tmp").iterdir()) == []
+        assert not (tmp_path / "projects").exists()
+
+    async def test_invalid_type_is_rejected_before_reading(
+        self, upload_service: UploadService
+    ):
+        """Test that type validation happens before the body is consumed."""
+        upload = make_upload(b"%PDF-1.4", "doc.pdf", "application/pdf")
+
+        with pytest.raises(ValueError, match="no soportado"):
+            await upload_service.save_file(upload, "hero")
+
+        assert upload.file.tell() == 0
+
+    async def test_image_is_resized_and_deduplicated(
+        self, upload_service: UploadService, tmp_path: Path
+    ):
+        """Test that images are resized and re-uploads return the same record."""
+        content = make_jpeg()
+
+        first = await upload_service.save_file(
+            make_upload(content, "photo.jpg", "image/jpeg"), "services"
+        )
+        second = await upload_service.save_file(
+            make_upload(content, "photo.jpg", "image/jpeg"), "services"
+        )
+
+        assert first.id == second.id
+        with Image.open(tmp_path / first.file_path) as img:
+            assert img.size == (800, 600)
+
+    async def test_duplicate_is_detected_before_decoding(
+        self, upload_service: UploadService, monkeypatch: pytest.MonkeyPatch
+    ):
+        """Test that a re-upload is matched by original hash without resizing."""
+        content = make_jpeg()
+        first = await upload_service.save_file(
+            make_upload(content, "photo.jpg", "image/jpeg"), "hero"
+        )
+
+        async def fail_resize(*args):
+            raise AssertionError("duplicate upload should not be decoded")
+
+        monkeypatch.setattr(upload_service, "_resize_image", fail_resize)
+        second = await upload_service.save_file(
+            make_upload(content, "again.jpg", "image/jpeg"), "hero"
+        )
+
+        assert second.id == first.id
+        assert first.content_hash == hashlib.sha256(content).hexdigest()
+
+    async def test_opaque_png_is_stored_as_jpeg(
+        self,
+        upload_service: UploadService,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Test that a PNG photo is served as JPEG but its original is kept."""
+        noise = Image.effect_noise((1000, 800), 30).convert("RGB")
+        output = BytesIO()
+        noise.save(output, format="PNG")
+
+        # Opt-in: by default PNG stays PNG
+        kept = await upload_service.save_file(
+            make_upload(output.getvalue(), "photo.png", "image/png"), "hero"
+        )
+        assert kept.mime_type == "image/png"
+
+        monkeypatch.setattr(settings, "IMAGE_CONVERT_OPAQUE_PNG", True)
+        db_file = await upload_service.save_file(
+            make_upload(output.getvalue(), "photo.png", "image/png"), "services"
+        )
+
+        assert db_file.file_path.endswith(".jpg")
+        assert db_file.mime_type == "image/jpeg"
+        assert db_file.original_path.endswith(".png")
+        with Image.open(tmp_path / db_file.file_path) as img:
+            assert img.format == "JPEG"
+        assert {r.format for r in db_file.renditions} <= {"jpeg", "webp", "avif"}
+
+    async def test_folders_share_one_stored_original(
+        self, upload_service: UploadService, tmp_path: Path
+    ):
+        """Test that derived files of each folder hang off a single original."""
+        content = make_jpeg()
+        hero = await upload_service.save_file(
+            make_upload(content, "photo.jpg", "image/jpeg"), "hero"
+        )
+        service = await upload_service.save_file(
+            make_upload(content, "photo.jpg", "image/jpeg"), "services"
+        )
+
+        assert hero.id != service.id
+        assert hero.original_path == service.original_path
+        assert (tmp_path / hero.original_path).read_bytes() == content
+        assert len(list((tmp_path / ".originals").rglob("*.jpg"))) == 1
+
+        await upload_service.delete_file_permanent(hero.id)
+        assert (tmp_path / service.original_path).exists()
+        await upload_service.delete_file_permanent(service.id)
+        assert not (tmp_path / service.original_path).exists()
+
+    async def test_image_produces_rendition_set(
+        self, upload_service: UploadService, tmp_path: Path
+    ):
+        """Test that images get multi-width renditions plus WebP."""
+        db_file = await upload_service.save_file(
+            make_upload(make_jpeg(2000, 1500), "photo.jpg", "image/jpeg"), "services"
+        )
+
+        formats = {(r.format, r.width) for r in db_file.renditions}
+        assert ("webp", 800) in formats
+        assert ("webp", 480) in formats
+        assert ("jpeg", 480) in formats
+        assert ("jpeg", 800) not in formats  # the main file covers it
+        for rendition in db_file.renditions:
+            assert (tmp_path / rendition.file_path).exists()
+
+        sources = {s["type"]: s["srcset"] for s in db_file.sources}
+        assert list(sources)[0] in ("image/avif", "image/webp")
+        assert f"/uploads/{db_file.file_path} 800w" in sources["image/jpeg"]
+
+
+@pytest.mark.uploads
+class TestImageExecutor:
+    """Test the bounded image-processing executor."""
+
+    async def test_rejects_when_queue_is_full(self):
+        """Test backpressure: jobs beyond workers + queue are rejected."""
+        executor = ImageExecutor(max_workers=1, max_queue=0, kind="thread")
+        release = threading.Event()
+        try:
+            running = asyncio.ensure_future(executor.submit(release.wait, 5))
+            await asyncio.sleep(0.05)
+
+            assert executor.metrics()["in_flight"] == 1
+            with pytest.raises(ImageExecutorBusyError):
+                await executor.submit(release.wait, 5)
+
+            release.set()
+            assert await running is True
+        finally:
+            release.set()
+            executor.shutdown()
+
+        metrics = executor.metrics()
+        assert metrics["completed"] == 1
+        assert metrics["rejected"] == 1
+        assert metrics["in_flight"] == 0
+        assert metrics["latency_ms"]["max"] is not None
+
+    def test_metrics_endpoint(self, client: TestClient, admin_headers: dict):
+        """Test that executor metrics are exposed through the uploads API."""
+        response = client.get("/api/uploads/metrics", headers=admin_headers)
+
+        assert response.status_code == 200
+        data = response.json()["image_executor"]
+        assert "queue_depth" in data
+        assert "latency_ms" in data
+
+
+@pytest.fixture
+def upload_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the uploads API at a temporary directory."""
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.uploads
+class TestResumableUpload:
+    """Test the resumable chunked upload protocol."""
+
+    def create_session(self, client: TestClient, headers: dict, size: int) -> str:
+        response = client.post(
+            "/api/uploads/sessions",
+            headers=headers,
+            json={
+                "folder": "projects",
+                "filename": "clip.mp4",
+                "mime_type": "video/mp4",
+                "total_size": size,
+            },
+        )
+        assert response.status_code == 201
+        return response.json()["id"]
+
+    def send_chunk(
+        self, client: TestClient, headers: dict, session_id: str, offset: int, data
+    ):
+        return client.patch(
+            f"/api/uploads/sessions/{session_id}",
+            headers={**headers, "Upload-Offset": str(offset)},
+            content=data,
+        )
+
+    def test_chunked_upload_and_finalize(
+        self, client: TestClient, admin_headers: dict, upload_dir: Path
+    ):
+        """Test uploading in chunks, querying progress and finalizing."""
+        content = b"\x00\x00\x00\x18ftypmp42" + b"v" * 5000
+        session_id = self.create_session(client, admin_headers, len(content))
+
+        response = self.send_chunk(client, admin_headers, session_id, 0, content[:2000])
+        assert response.status_code == 200
+        assert response.headers["Upload-Offset"] == "2000"
+
+        # Simulate a dropped connection: ask the server where to resume
+        response = client.get(
+            f"/api/uploads/sessions/{session_id}", headers=admin_headers
+        )
+        assert response.json()["received_size"] == 2000
+
+        response = self.send_chunk(
+            client, admin_headers, session_id, 2000, content[2000:]
+        )
+        assert response.json()["received_size"] == len(content)
+
+        response = client.post(
+            f"/api/uploads/sessions/{session_id}/complete", headers=admin_headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["file_size"] == len(content)
+        assert data["content_hash"] == hashlib.sha256(content).hexdigest()
+        assert (upload_dir / data["file_path"]).read_bytes() == content
+        assert list((upload_dir / ".sessions").iterdir()) == []
+
+    def test_wrong_offset_returns_conflict(
+        self, client: TestClient, admin_headers: dict, upload_dir: Path
+    ):
+        """Test that a mismatched offset is rejected with the expected offset."""
+        session_id = self.create_session(client, admin_headers, 100)
+        self.send_chunk(client, admin_headers, session_id, 0, b"a" * 40)
+
+        response = self.send_chunk(client, admin_headers, session_id, 10, b"b" * 10)
+
+        assert response.status_code == 409
+        assert response.headers["Upload-Offset"] == "40"
+
+    def test_incomplete_session_cannot_finalize(
+        self, client: TestClient, admin_headers: dict, upload_dir: Path
+    ):
+        """Test that finalize requires all declared bytes."""
+        session_id = self.create_session(client, admin_headers, 100)
+        self.send_chunk(client, admin_headers, session_id, 0, b"a" * 40)
+
+        response = client.post(
+            f"/api/uploads/sessions/{session_id}/complete", headers=admin_headers
+        )
+
+        assert response.status_code == 409
+
+    def test_finalize_can_be_retried_after_busy_pool(
+        self,
+        client: TestClient,
+        admin_headers: dict,
+        upload_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Test that a 503 keeps the received bytes for the retry."""
+        content = b"\x00\x00\x00\x18ftypmp42" + b"v" * 5000
+        session_id = self.create_session(client, admin_headers, len(content))
+        self.send_chunk(client, admin_headers, session_id, 0, content)
+
+        ingest = UploadService.ingest_file
+        calls = []
+
+        async def busy_once(self, *args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise ImageExecutorBusyError("Pool de imágenes lleno")
+            return await ingest(self, *args, **kwargs)
+
+        monkeypatch.setattr(UploadService, "ingest_file", busy_once)
+        url = f"/api/uploads/sessions/{session_id}/complete"
+
+        response = client.post(url, headers=admin_headers)
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+        response = client.post(url, headers=admin_headers)
+        assert response.status_code == 200
+        assert response.json()["content_hash"] == hashlib.sha256(content).hexdigest()
+        assert list((upload_dir / ".sessions").iterdir()) == []
+
+    def test_declared_size_over_limit_is_rejected(
+        self, client: TestClient, admin_headers: dict, upload_dir: Path
+    ):
+        """Test that sessions larger than the video limit are refused upfront."""
+        response = client.post(
+            "/api/uploads/sessions",
+            headers=admin_headers,
+            json={
+                "folder": "projects",
+                "filename": "huge.mp4",
+                "mime_type": "video/mp4",
+                "total_size": UploadService.MAX_VIDEO_SIZE + 1,
+            },
+        )
+
+        assert response.status_code == 400
+
+
+@pytest.mark.uploads
+class TestFolderListing:
+    """Test the folder listing used by the admin file picker."""
+
+    def test_compact_listing_with_thumbnails(
+        self, client: TestClient, admin_headers: dict, upload_dir: Path
+    ):
+        """Test the grid mode: thumbnails with dimensions and no unused fields."""
+        response = client.post(
+            "/api/uploads/?folder=hero",
+            headers=admin_headers,
+            files={"file": ("hero.jpg", make_jpeg(2400, 1350), "image/jpeg")},
+        )
+        assert response.status_code == 200
+        thumbnail_path = response.json()["thumbnail_url"].removeprefix("/uploads/")
+
+        response = client.get("/api/uploads/hero?compact=true", headers=admin_headers)
+
+        assert response.status_code == 200
+        (item,) = response.json()["files"]
+        assert set(item) == set(UploadedFileListItem.model_fields)
+        assert (item["thumbnail_width"], item["thumbnail_height"]) == (256, 144)
+        assert item["thumbnail_url"].endswith("-thumb.webp")
+        with Image.open(upload_dir / thumbnail_path) as thumb:
+            assert thumb.format == "WEBP"
+            assert thumb.size == (256, 144)
+        assert "lqip" not in item
+
+        # The full listing keeps every column
+        response = client.get("/api/uploads/hero", headers=admin_headers)
+        assert response.json()["files"][0]["lqip"].startswith("data:image/webp")
+
+
+class PresigningStorage(LocalStorage):
+    """Local storage that hands out upload targets like S3 would."""
+
+    def presign_upload(self, key, content_type, size, expires):
+        return {
+            "method": "POST",
+            "url": "http://bucket.test",
+            "fields": {"key": key, "Content-Type": content_type},
+            "headers": {},
+        }
+
+
+@pytest.mark.uploads
+class TestDirectUpload:
+    """Test direct-to-storage uploads finalized through the API."""
+
+    def create_direct(self, client: TestClient, headers: dict, content: bytes):
+        response = client.post(
+            "/api/uploads/direct",
+            headers=headers,
+            json={
+                "folder": "projects",
+                "filename": "photo.jpg",
+                "mime_type": "image/jpeg",
+                "total_size": len(content),
+            },
+        )
+        assert response.status_code == 201
+        return response.json()
+
+    def test_local_signed_put_and_finalize(
+        self, client: TestClient, admin_headers: dict, upload_dir: Path
+    ):
+        """Test the signed PUT fallback used with local storage."""
+        content = make_jpeg(1200, 900)
+        upload = self.create_direct(client, admin_headers, content)
+        assert upload["upload"]["method"] == "PUT"
+
+        # The signed URL is the only credential
+        response = client.put(
+            upload["upload"]["url"],
+            content=content,
+            headers=upload["upload"]["headers"],
+        )
+        assert response.status_code == 204
+
+        response = client.post(
+            f"/api/uploads/sessions/{upload['id']}/complete", headers=admin_headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["content_hash"] == hashlib.sha256(content).hexdigest()
+        assert data["renditions"]
+        assert (upload_dir / data["file_path"]).exists()
+
+    def test_tampered_signature_is_rejected(
+        self, client: TestClient, admin_headers: dict, upload_dir: Path
+    ):
+        """Test that the signature covers the session and expiry."""
+        upload = self.create_direct(client, admin_headers, b"x" * 10)
+        url = upload["upload"]["url"].replace("expires=", "expires=1")
+
+        response = client.put(url, content=b"x" * 10)
+
+        assert response.status_code == 403
+
+    def test_presigned_storage_upload(
+        self,
+        client: TestClient,
+        admin_headers: dict,
+        upload_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Test finalizing an object the client uploaded to the bucket."""
+        storage = PresigningStorage(str(upload_dir))
+        monkeypatch.setattr("app.services.upload_service.get_storage", lambda: storage)
+        content = make_jpeg(1200, 900, color=(0, 120, 60))
+        upload = self.create_direct(client, admin_headers, content)
+        assert upload["upload"]["method"] == "POST"
+        key = upload["upload"]["fields"]["key"]
+        complete_url = f"/api/uploads/sessions/{upload['id']}/complete"
+
+        # Not uploaded yet
+        response = client.post(complete_url, headers=admin_headers)
+        assert response.status_code == 409
+
+        asyncio.run(storage.put(key, content, "image/jpeg"))
+        response = client.post(complete_url, headers=admin_headers)
+
+        assert response.status_code == 200
+        assert response.json()["content_hash"] == hashlib.sha256(content).hexdigest()
+        assert not (upload_dir / key).exists()
+
+    def test_presigned_upload_size_mismatch(
+        self,
+        client: TestClient,
+        admin_headers: dict,
+        upload_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Test that an object of a different size than declared is refused."""
+        storage = PresigningStorage(str(upload_dir))
+        monkeypatch.setattr("app.services.upload_service.get_storage", lambda: storage)
+        upload = self.create_direct(client, admin_headers, b"x" * 100)
+        key = upload["upload"]["fields"]["key"]
+        asyncio.run(storage.put(key, b"x" * 50))
+
+        response = client.post(
+            f"/api/uploads/sessions/{upload['id']}/complete", headers=admin_headers
+        )
+
+        assert response.status_code == 400
+        assert not (upload_dir / key).exists()
+
+        # The session is discarded: it cannot be finalized again
+        response = client.post(
+            f"/api/uploads/sessions/{upload['id']}/complete", headers=admin_headers
+        )
+        assert response.status_code == 404
+
+
+@pytest.mark.uploads
+class TestBatchUpload:
+    """Test uploading several files in one request."""
+
+    def test_batch_upload_reports_each_file(
+        self, client: TestClient, admin_headers: dict, upload_dir: Path
+    ):
+        """Test created, duplicate and error results in one transaction."""
+        red = make_jpeg(color=(200, 0, 0))
+        blue = make_jpeg(color=(0, 0, 200))
+        files = [
+            ("files", ("red.jpg", red, "image/jpeg")),
+            ("files", ("blue.jpg", blue, "image/jpeg")),
+            ("files", ("red-again.jpg", red, "image/jpeg")),
+            ("files", ("notes.txt", b"hello", "text/plain")),
+        ]
+
+        response = client.post(
+            "/api/uploads/batch?folder=projects", headers=admin_headers, files=files
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["created"], data["duplicates"], data["failed"]) == (2, 1, 1)
+        statuses = [result["status"] for result in data["results"]]
+        assert statuses == ["created", "created", "duplicate", "error"]
+        assert data["results"][2]["file"]["id"] == data["results"][0]["file"]["id"]
+        assert "no soportado" in data["results"][3]["error"]
+        assert data["results"][0]["file"]["renditions"]
+        for result in data["results"][:2]:
+            assert (upload_dir / result["file"]["file_path"]).exists()
+
+        # Uploading the same content again only reports duplicates
+        response = client.post(
+            "/api/uploads/batch?folder=projects",
+            headers=admin_headers,
+            files=files[:2],
+        )
+        assert response.json()["duplicates"] == 2
+
+    async def test_batch_reports_read_errors_per_file(
+        self, upload_service: UploadService
+    ):
+        """Test that an I/O error in one file does not abort the batch."""
+
+        class BrokenStream(BytesIO):
+            def read(self, *args):
+                raise OSError("Error de lectura")
+
+        broken = UploadFile(
+            file=BrokenStream(),
+            filename="broken.jpg",
+            headers=Headers({"content-type": "image/jpeg"}),
+        )
+        files = [broken, make_upload(make_jpeg(), "photo.jpg", "image/jpeg")]
+
+        results = await upload_service.save_files(files, "projects")
+
+        assert [result["status"] for result in results] == ["error", "created"]
+        assert results[0]["error"] == "Error de lectura"
+        assert results[1]["file"].id is not None
+
+    def test_batch_upload_validates_folder_and_count(
+        self,
+        client: TestClient,
+        admin_headers: dict,
+        upload_dir: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Test that invalid folders and oversized batches are rejected."""
+        files = [("files", ("a.jpg", make_jpeg(), "image/jpeg"))]
+        response = client.post(
+            "/api/uploads/batch?folder=secret", headers=admin_headers, files=files
+        )
+        assert response.status_code == 400
+
+        monkeypatch.setattr(UploadService, "MAX_BATCH_FILES", 1)
+        response = client.post(
+            "/api/uploads/batch?folder=projects",
+            headers=admin_headers,
+            files=files * 2,
+        )
+        assert response.status_code == 400
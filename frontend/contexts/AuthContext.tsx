@@ -50,6 +50,11 @@ export function AuthProvider({ children }: { children: ReactNode }) {
   }
 
   const logout = () => {
+    // Revocar el token en el servidor; la sesión local se cierra igualmente
+    const token = localStorage.getItem('token')
+    if (token) {
+      authApi.logout(token).catch(() => {})
+    }
     localStorage.removeItem('token')
     setUser(null)
   }
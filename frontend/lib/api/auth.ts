@@ -15,6 +15,13 @@ export const authApi = {
     return response.data
   },
 
+  // Revoca el token en el servidor (se pasa explícito: el cliente lo borra a la vez)
+  logout: async (token: string): Promise<void> => {
+    await axiosInstance.post('/api/auth/logout', null, {
+      headers: { Authorization: `Bearer ${token}` },
+    })
+  },
+
   me: async (): Promise<User> => {
     const response = await axiosInstance.get('/api/auth/me')
     return response.data
@@ -12,7 +12,9 @@ export const profileApi = {
     return response.data
   },
 
-  uploadAvatar: async (file: File): Promise<{ message: string; avatar_url: string }> => {
+  uploadAvatar: async (
+    file: File
+  ): Promise<{ message: string; avatar_url: string; avatar_urls: User['avatar_urls'] }> => {
     const formData = new FormData()
     formData.append('file', file)
     
@@ -1,5 +1,25 @@
 import axiosInstance from "../axios";
 
+export interface ImageRendition {
+  width: number;
+  height: number;
+  format: string;
+  mime_type: string;
+  file_path: string;
+  file_size: number;
+}
+
+export interface RenditionSource {
+  type: string;
+  srcset: string;
+}
+
+export interface RenditionManifest {
+  id: number;
+  src: string;
+  sources: RenditionSource[];
+}
+
 export interface UploadedFile {
   id: number;
   filename: string;
@@ -9,10 +29,119 @@ export interface UploadedFile {
   mime_type: string;
   file_size: number;
   folder: string;
+  content_hash: string | null;
+  width: number | null;
+  height: number | null;
+  duration: number | null;
+  codec: string | null;
+  dominant_color: string | null;
+  blurhash: string | null;
+  lqip: string | null;
+  rendition_version: string | null;
+  thumbnail_url: string | null;
+  thumbnail_width: number | null;
+  thumbnail_height: number | null;
   uploaded_by: number | null;
   is_active: boolean;
   created_at: string;
   updated_at: string | null;
+  renditions: ImageRendition[];
+  sources: RenditionSource[];
+}
+
+export interface BatchUploadResult {
+  filename: string;
+  status: "created" | "duplicate" | "error";
+  file: UploadedFile | null;
+  error: string | null;
+}
+
+export interface BatchUploadResponse {
+  results: BatchUploadResult[];
+  created: number;
+  duplicates: number;
+  failed: number;
+}
+
+export interface UsageCounter {
+  files: number;
+  bytes: number;
+}
+
+export interface StorageUsageReport extends UsageCounter {
+  folders: (UsageCounter & {
+    folder: string;
+    quota: number | null;
+    by_type: Record<string, UsageCounter>;
+  })[];
+  users: (UsageCounter & {
+    user_id: number | null;
+    username: string | null;
+    quota: number | null;
+  })[];
+}
+
+export interface MediaGCReport {
+  dry_run: boolean;
+  grace_hours: number;
+  candidates: number;
+  purged: number;
+  bytes_reclaimed: number;
+  reindexed: number | null;
+  files: {
+    id: number;
+    file_path: string;
+    folder: string;
+    is_active: boolean;
+    bytes: number;
+  }[];
+  errors: { id: number; error: string }[];
+}
+
+export interface RenditionJob {
+  id: number;
+  folder: string;
+  spec: { size: [number, number]; widths: number[]; formats: string[] };
+  spec_version: string;
+  status: "pending" | "running" | "completed" | "failed";
+  total: number;
+  processed: number;
+  failed: number;
+  last_file_id: number;
+  error: string | null;
+  created_at: string;
+  updated_at: string | null;
+  finished_at: string | null;
+}
+
+export interface DirectUpload {
+  id: string;
+  folder: string;
+  filename: string;
+  mime_type: string;
+  total_size: number;
+  status: string;
+  expires_at: string;
+  upload: {
+    method: 'POST' | 'PUT';
+    url: string;
+    fields: Record<string, string>;
+    headers: Record<string, string>;
+  };
+}
+
+export interface MediaGCOptions {
+  dryRun?: boolean;
+  graceHours?: number;
+  batchSize?: number;
+  reindex?: boolean;
+}
+
+export interface ImageVariantOptions {
+  width?: number;
+  height?: number;
+  fit?: 'cover' | 'contain' | 'fill';
+  format?: 'jpeg' | 'png' | 'webp' | 'avif';
 }
 
 export interface UploadedFilesResponse {
@@ -22,6 +151,28 @@ export interface UploadedFilesResponse {
   limit: number;
 }
 
+// Listado compacto (?compact=true): solo lo necesario para una rejilla
+export type UploadedFileListItem = Pick<
+  UploadedFile,
+  | 'id'
+  | 'original_filename'
+  | 'file_type'
+  | 'mime_type'
+  | 'file_size'
+  | 'width'
+  | 'height'
+  | 'dominant_color'
+  | 'thumbnail_url'
+  | 'thumbnail_width'
+  | 'thumbnail_height'
+  | 'created_at'
+> & { url: string };
+
+export interface UploadedFilesGridResponse
+  extends Omit<UploadedFilesResponse, 'files'> {
+  files: UploadedFileListItem[];
+}
+
 const uploadsApi = {
   /**
    * Upload a file
@@ -42,6 +193,129 @@ const uploadsApi = {
     return response.data;
   },
 
+  /**
+   * Upload a file straight to storage with a signed URL, then register it
+   */
+  uploadDirect: async (file: File, folder: string): Promise<UploadedFile> => {
+    const { data: direct } = await axiosInstance.post<DirectUpload>(
+      "/uploads/direct",
+      {
+        folder,
+        filename: file.name,
+        mime_type: file.type,
+        total_size: file.size,
+      }
+    );
+
+    // Sin axiosInstance: el destino (bucket o PUT firmado) no lleva el token
+    const { method, url, fields, headers } = direct.upload;
+    let body: BodyInit = file;
+    if (method === "POST") {
+      const formData = new FormData();
+      Object.entries(fields).forEach(([key, value]) => formData.append(key, value));
+      formData.append("file", file);
+      body = formData;
+    }
+    const response = await fetch(url, { method, headers, body });
+    if (!response.ok) {
+      throw new Error(`Direct upload failed (${response.status})`);
+    }
+
+    const { data } = await axiosInstance.post<UploadedFile>(
+      `/uploads/sessions/${direct.id}/complete`
+    );
+    return data;
+  },
+
+  /**
+   * Upload several files in one request (max 50), processed concurrently
+   */
+  uploadBatch: async (
+    files: File[],
+    folder: string
+  ): Promise<BatchUploadResponse> => {
+    const formData = new FormData();
+    files.forEach((file) => formData.append("files", file));
+
+    const response = await axiosInstance.post<BatchUploadResponse>(
+      `/uploads/batch?folder=${folder}`,
+      formData,
+      {
+        headers: {
+          "Content-Type": "multipart/form-data",
+        },
+      }
+    );
+    return response.data;
+  },
+
+  /**
+   * Storage usage per folder (and type) and per user, with quotas
+   */
+  getUsage: async (): Promise<StorageUsageReport> => {
+    const response = await axiosInstance.get<StorageUsageReport>("/uploads/usage");
+    return response.data;
+  },
+
+  /**
+   * Report unreferenced files (dryRun, default) or purge them
+   */
+  collectGarbage: async (
+    options: MediaGCOptions = {}
+  ): Promise<MediaGCReport> => {
+    const response = await axiosInstance.post<MediaGCReport>("/uploads/gc", null, {
+      params: {
+        dry_run: options.dryRun ?? true,
+        grace_hours: options.graceHours,
+        batch_size: options.batchSize,
+        reindex: options.reindex ?? false,
+      },
+    });
+    return response.data;
+  },
+
+  /**
+   * Re-render every image of a folder with the current rendition spec
+   */
+  startRerender: async (folder: string): Promise<RenditionJob> => {
+    const response = await axiosInstance.post<RenditionJob>("/uploads/rerender", null, {
+      params: { folder },
+    });
+    return response.data;
+  },
+
+  /**
+   * Get the progress of a re-render job
+   */
+  getRerenderJob: async (jobId: number): Promise<RenditionJob> => {
+    const response = await axiosInstance.get<RenditionJob>(`/uploads/rerender/${jobId}`);
+    return response.data;
+  },
+
+  /**
+   * Resume an interrupted re-render job from its checkpoint
+   */
+  resumeRerender: async (jobId: number): Promise<RenditionJob> => {
+    const response = await axiosInstance.post<RenditionJob>(
+      `/uploads/rerender/${jobId}/resume`
+    );
+    return response.data;
+  },
+
+  /**
+   * Get files by folder as a thumbnail grid (compact listing)
+   */
+  getGridByFolder: async (
+    folder: string,
+    skip = 0,
+    limit = 100
+  ): Promise<UploadedFilesGridResponse> => {
+    const response = await axiosInstance.get<UploadedFilesGridResponse>(
+      `/uploads/${folder}?skip=${skip}&limit=${limit}&compact=true`
+    );
+    return response.data;
+  },
+
   /**
    * Get files by folder
    */
@@ -66,6 +340,16 @@ const uploadsApi = {
     return response.data;
   },
 
+  /**
+   * Get the srcset-ready rendition manifest of an image
+   */
+  getRenditions: async (fileId: number): Promise<RenditionManifest> => {
+    const response = await axiosInstance.get<RenditionManifest>(
+      `/uploads/file/${fileId}/renditions`
+    );
+    return response.data;
+  },
+
   /**
    * Delete a file
    */
@@ -94,6 +378,20 @@ const uploadsApi = {
     
     return `${baseUrl}${path}`;
   },
+
+  /**
+   * Get the URL of an on-demand image variant (format negotiated via Accept)
+   */
+  getImageUrl: (fileId: number, options: ImageVariantOptions = {}): string => {
+    const apiUrl = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000/api';
+    const params = new URLSearchParams();
+    if (options.width) params.set('w', String(options.width));
+    if (options.height) params.set('h', String(options.height));
+    if (options.fit) params.set('fit', options.fit);
+    if (options.format) params.set('format', options.format);
+    const query = params.toString();
+    return `${apiUrl}/images/${fileId}${query ? `?${query}` : ''}`;
+  },
 };
 
 export default uploadsApi;
@@ -8,6 +8,7 @@ export interface User {
   is_superuser: boolean
   phone?: string
   avatar_url?: string
+  avatar_urls?: Record<'32' | '64' | '256', string>  // WebP cuadrados (vacío en avatares antiguos)
   bio?: string
   timezone?: string
   language?: string
@@ -116,6 +117,7 @@ export interface AuditLog {
   created_at: string
   user_username?: string
   user_email?: string
+  user_avatar_url?: string  // avatar de 32px
 }
 
 export interface ProfileUpdate {
@@ -239,6 +241,25 @@ export interface ServiceUpdate {
   meta_description?: string
 }
 
+export interface VideoMetadata {
+  url: string
+  mime_type: string
+  width?: number | null
+  height?: number | null
+  duration?: number | null  // segundos
+  codec?: string | null  // p.ej. avc1.64001f
+}
+
+// Dimensiones y placeholder de una imagen subida (calculados al subir)
+export interface ImageMetadata {
+  url: string
+  width?: number | null
+  height?: number | null
+  dominant_color?: string | null  // #rrggbb
+  blurhash?: string | null
+  lqip?: string | null  // data:image/webp;base64,... (usable como background)
+}
+
 export interface Project {
   id: number
   title: string
@@ -253,6 +274,8 @@ export interface Project {
   featured_image?: string
   gallery?: string[]
   video_url?: string
+  video?: VideoMetadata | null  // solo si video_url apunta a un vídeo subido
+  images?: Record<string, ImageMetadata>  // featured_image y gallery por URL
   service_id?: number
   tags?: string[]
   duration?: string
@@ -482,6 +505,7 @@ export interface HeroImage {
   subtitle?: string
   description?: string
   image_url: string
+  image?: ImageMetadata | null  // solo si image_url apunta a una imagen subida
   alt_text: string
   button_text?: string
   button_url?: string